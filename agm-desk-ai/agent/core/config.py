@@ -14,11 +14,51 @@ class Settings(BaseSettings):
     BACKEND_URL: str = "http://localhost:8000"
     API_SECRET_KEY: str
     
+    # Backend HTTP Client Configuration
+    BACKEND_HTTP_MAX_CONNECTIONS: int = 100  # Máximo de conexiones simultáneas al backend
+    BACKEND_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20  # Conexiones inactivas que se mantienen abiertas para reutilizar
+    BACKEND_HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 30.0  # Tiempo tras el cual se cierra una conexión inactiva
+    BACKEND_HTTP2_ENABLED: bool = False  # Usar HTTP/2 (requiere pip install "httpx[http2]")
+    BACKEND_CONNECT_TIMEOUT_SECONDS: float = 5.0  # Timeout para establecer la conexión
+    BACKEND_READ_TIMEOUT_SECONDS: float = 30.0  # Timeout de lectura de la respuesta
+    BACKEND_WRITE_TIMEOUT_SECONDS: float = 10.0  # Timeout de envío del request
+    BACKEND_POOL_TIMEOUT_SECONDS: float = 5.0  # Espera máxima por una conexión libre del pool
+    BACKEND_POOL_SLOW_WAIT_MS: int = 100  # Espera en el pool a partir de la cual se registra una advertencia
+    BACKEND_PREWARM_CONNECTIONS: int = 4  # Conexiones que se abren al iniciar (0 = deshabilitado)
+    BACKEND_CACHE_INVALIDATION_ENABLED: bool = True  # Avisar al backend que invalide su cache tras actualizar una solicitud
+    BACKEND_CACHE_INVALIDATION_TIMEOUT_SECONDS: float = 2.0  # Timeout del aviso de invalidación (best-effort)
+    
+    # Action Batching / Async Jobs Configuration
+    ACTION_BATCHING_ENABLED: bool = False  # Agrupar acciones (de uno o varios tickets) en llamadas a /execute-actions
+    ACTION_BATCH_WINDOW_MS: int = 50  # Ventana en milisegundos durante la cual se agrupan acciones
+    ACTION_BATCH_MAX_SIZE: int = 50  # Máximo de acciones por lote (el backend acepta hasta 50)
+    ACTION_ASYNC_MODE_ENABLED: bool = False  # Ejecutar acciones con mode=async (202 + job_id) y obtener el resultado por long-poll
+    ACTION_JOB_POLL_WAIT_SECONDS: float = 25.0  # Espera máxima de cada consulta long-poll a /jobs/{job_id}
+    ACTION_JOB_TIMEOUT_SECONDS: float = 120.0  # Tiempo máximo total de espera del resultado de un job
+    
+    # Adaptive Concurrency Configuration (AIMD por dependencia: Gemini y backend)
+    ENABLE_ADAPTIVE_CONCURRENCY: bool = True  # Ajustar la concurrencia según 429, 5xx y latencia de cada dependencia
+    ADAPTIVE_BACKOFF_FACTOR: float = 0.5  # Factor por el que se multiplica el límite ante una sobrecarga
+    ADAPTIVE_MAX_WAIT_SECONDS: float = 30.0  # Espera máxima por capacidad antes de rechazar una llamada
+    GEMINI_CONCURRENCY_INITIAL: int = 4  # Llamadas concurrentes iniciales a Gemini
+    GEMINI_CONCURRENCY_MAX: int = 32  # Máximo de llamadas concurrentes a Gemini
+    GEMINI_LATENCY_THRESHOLD_MS: int = 15000  # Latencia de Gemini que se considera sobrecarga
+    GEMINI_RATE_LIMIT_PAUSE_SECONDS: float = 5.0  # Pausa ante un 429 de Gemini sin Retry-After
+    ACTION_CONCURRENCY_INITIAL: int = 10  # Llamadas concurrentes iniciales al backend
+    ACTION_CONCURRENCY_MAX: int = 100  # Máximo de llamadas concurrentes al backend
+    ACTION_LATENCY_THRESHOLD_MS: int = 10000  # Latencia del backend que se considera sobrecarga
+    
+    # Circuit Breaker Configuration (por dependencia: Gemini y backend)
+    ENABLE_CIRCUIT_BREAKERS: bool = True  # Cortar llamadas a una dependencia caída en lugar de esperar timeouts
+    CIRCUIT_FAILURE_THRESHOLD: int = 5  # Fallos consecutivos que abren el circuito
+    CIRCUIT_RECOVERY_SECONDS: float = 30.0  # Tiempo que el circuito permanece abierto antes de una llamada de prueba
+    
     # Gemini AI Configuration
     GEMINI_API_KEY: str
     GEMINI_MODEL: str = "gemini-2.5-flash"  # Recomendado para PoC (más económico y rápido)
     GEMINI_TEMPERATURE: float = 0.2
     GEMINI_MAX_TOKENS: int = 500
+    GEMINI_TIMEOUT_SECONDS: float = 30.0  # Timeout de cada llamada a Gemini (acotado al deadline del ticket)
     
     # Logging Configuration
     LOG_LEVEL: str = "INFO"
@@ -27,11 +67,40 @@ class Settings(BaseSettings):
     MAX_RETRIES: int = 3
     RETRY_DELAY: float = 2.0
     
+    # Ticket Deadline Configuration
+    TICKET_DEADLINE_SECONDS: float = 120.0  # Tiempo máximo para procesar un ticket (validación, clasificación, acciones y reintentos)
+    
+    # Retry Scheduler Configuration
+    ENABLE_RETRY_SCHEDULER: bool = True  # Reintentar solicitudes que fallan por errores transitorios
+    RETRY_SCHEDULER_MAX_ATTEMPTS: int = 5  # Reintentos por solicitud antes de moverla a dead-letter
+    RETRY_SCHEDULER_MAX_DELAY_SECONDS: float = 3600.0  # Espera máxima entre reintentos
+    RETRY_SCHEDULER_CONCURRENCY: int = 2  # Reintentos ejecutándose a la vez
+    RETRY_JOURNAL_PATH: str = "data/retry_journal.json"  # Journal persistente de reintentos pendientes
+    DEAD_LETTER_PATH: str = "data/dead_letter.jsonl"  # Solicitudes que agotaron sus reintentos
+    
+    # Checkpoint Resume Configuration
+    ENABLE_CHECKPOINT_RESUME: bool = True  # Retomar al iniciar los tickets que quedaron en TRAMITE
+    RESUME_SWEEP_CONCURRENCY: int = 4  # Tickets retomados a la vez durante el barrido inicial
+    RESUME_MAX_AGE_HOURS: Optional[int] = 24  # Tickets detenidos por más tiempo quedan para revisión humana (None = sin límite)
+    
     # Rate Limiting Configuration
     ENABLE_RATE_LIMITING: bool = True  # Habilitar/deshabilitar rate limiting (configurable via .env)
     MAX_REQUESTS_PER_USER: int = 5  # Número máximo de solicitudes por usuario en ventana de tiempo
     RATE_LIMIT_WINDOW_HOURS: int = 24  # Ventana de tiempo en horas para rate limiting
     MAX_REQUEST_AGE_HOURS: Optional[int] = None  # Opcional: horas máximas de antigüedad para procesar
+    RATE_LIMIT_RECONCILE_INTERVAL_SECONDS: int = 300  # Cada cuánto se reconcilia el contador en memoria con la BD
+    RATE_LIMIT_MAX_TRACKED_USERS: int = 10000  # Máximo de usuarios rastreados en memoria por el rate limiter
+    
+    # Category Catalog Cache Configuration
+    CATEGORY_CACHE_TTL_SECONDS: int = 3600  # Tiempo de vida del catálogo de categorías en memoria
+    
+    # Duplicate Detection Configuration
+    ENABLE_DUPLICATE_DETECTION: bool = True  # Rechazar solicitudes casi duplicadas y ráfagas antes de clasificar
+    DUPLICATE_WINDOW_MINUTES: int = 10  # Ventana de tiempo en minutos para buscar duplicados
+    DUPLICATE_HAMMING_THRESHOLD: int = 3  # Distancia de Hamming máxima (0-3) entre huellas SimHash para considerar dos textos casi iguales
+    DUPLICATE_FLOOD_THRESHOLD: int = 20  # Solicitudes casi iguales (de cualquier usuario) en la ventana que constituyen una ráfaga
+    DUPLICATE_INDEX_MAX_SIZE: int = 50000  # Máximo de huellas en el índice global en memoria
+    DUPLICATE_USER_HISTORY: int = 5  # Huellas recientes conservadas por usuario
     
     # Validation Configuration
     MIN_DESCRIPTION_LENGTH: int = 10
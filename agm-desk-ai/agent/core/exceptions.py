@@ -4,7 +4,10 @@ from typing import Optional
 
 class AgentError(Exception):
     """Excepción base para errores del agente"""
-    pass
+    # Si el error es transitorio y la solicitud puede reintentarse más tarde
+    retryable: bool = False
+    # Clase de error que define el backoff del programador de reintentos
+    retry_class: str = "permanent"
 
 
 class ConfigurationError(AgentError):
@@ -14,11 +17,15 @@ class ConfigurationError(AgentError):
 
 class SupabaseConnectionError(AgentError):
     """Error de conexión con Supabase"""
-    pass
+    retryable = True
+    retry_class = "unavailable"
 
 
 class BackendConnectionError(AgentError):
     """Error de conexión con backend"""
+    retryable = True
+    retry_class = "unavailable"
+    
     def __init__(
         self,
         user_message: str,
@@ -33,7 +40,8 @@ class BackendConnectionError(AgentError):
 
 class AIClassificationError(AgentError):
     """Error en clasificación de IA"""
-    pass
+    retryable = True
+    retry_class = "unavailable"
 
 
 class ActionExecutionError(AgentError):
@@ -50,6 +58,22 @@ class ActionExecutionError(AgentError):
         self.status_code = status_code
         self.technical_detail = technical_detail
         super().__init__(user_message)
+    
+    @property
+    def retryable(self) -> bool:
+        """Solo los errores de sobrecarga o del servidor (429, 5xx salvo 501) son transitorios"""
+        code = self.status_code
+        return code is not None and (code == 429 or (code >= 500 and code != 501))
+    
+    @property
+    def retry_class(self) -> str:
+        if not self.retryable:
+            return "permanent"
+        if self.status_code == 429:
+            return "rate_limited"
+        if self.status_code == 504:
+            return "timeout"
+        return "unavailable"
 
 
 class InvalidActionError(ActionExecutionError):
@@ -84,3 +108,49 @@ class RateLimitExceededError(ValidationError):
         self.action_suggestion = action_suggestion
         super().__init__(user_message)
 
+
+class ConcurrencyLimitError(AgentError):
+    """Error cuando una dependencia está saturada y no hay capacidad para una nueva llamada"""
+    retryable = True
+    retry_class = "rate_limited"
+    
+    def __init__(
+        self,
+        dependency: str,
+        limit: int,
+        retry_after: Optional[float] = None
+    ):
+        self.dependency = dependency
+        self.limit = limit
+        self.retry_after = retry_after
+        super().__init__(f"{dependency}: sin capacidad disponible (límite {limit})")
+
+
+class CircuitOpenError(AgentError):
+    """Error cuando el circuito de una dependencia está abierto y la llamada no se intenta"""
+    retryable = True
+    retry_class = "unavailable"
+    
+    def __init__(
+        self,
+        dependency: str,
+        retry_after: float
+    ):
+        self.dependency = dependency
+        self.retry_after = retry_after
+        super().__init__(f"{dependency}: circuito abierto (reintentar en {retry_after:.1f}s)")
+
+
+class DeadlineExceededError(AgentError):
+    """Error cuando se agota el presupuesto de tiempo del ticket"""
+    retryable = True
+    retry_class = "timeout"
+    
+    def __init__(
+        self,
+        stage: str,
+        budget_seconds: float
+    ):
+        self.stage = stage
+        self.budget_seconds = budget_seconds
+        super().__init__(f"Tiempo máximo del ticket ({budget_seconds:.0f}s) agotado en la etapa '{stage}'")
@@ -31,6 +31,7 @@ logger = structlog.get_logger(__name__)
 # Variable global para el listener (para shutdown graceful)
 realtime_listener: Optional[RealtimeListener] = None
 action_executor: Optional[ActionExecutor] = None
+request_validator: Optional[RequestValidator] = None
 
 
 def setup_signal_handlers():
@@ -42,6 +43,10 @@ def setup_signal_handlers():
         # Cerrar recursos
         if action_executor:
             asyncio.create_task(action_executor.close())
+        if request_validator:
+            asyncio.create_task(request_validator.close())
+        if realtime_listener:
+            asyncio.create_task(realtime_listener.close())
         
         logger.info("Agente AI detenido")
         print("✅ Agente AI detenido correctamente")
@@ -53,7 +58,7 @@ def setup_signal_handlers():
 
 async def main():
     """Función principal del Agente AI"""
-    global realtime_listener, action_executor
+    global realtime_listener, action_executor, request_validator
     
     try:
         # Cargar configuración
@@ -81,6 +86,15 @@ async def main():
         
         logger.info("Servicios inicializados correctamente")
         
+        # Precargar rate limiter en memoria desde la base de datos
+        await request_validator.start()
+        
+        # Abrir conexiones al backend antes de recibir solicitudes
+        await action_executor.warm_up()
+        
+        # Retomar reintentos pendientes del journal
+        await realtime_listener.start()
+        
         # Configurar handlers de señales
         setup_signal_handlers()
         
@@ -127,6 +141,10 @@ async def main():
         print("\n🛑 Interrupción por teclado. Cerrando...")
         if action_executor:
             await action_executor.close()
+        if request_validator:
+            await request_validator.close()
+        if realtime_listener:
+            await realtime_listener.close()
         sys.exit(0)
     
     except Exception as e:
@@ -0,0 +1,120 @@
+"""Agrupador de acciones individuales en lotes para /execute-actions"""
+import asyncio
+import structlog
+from typing import Dict, List, Tuple, Any, Callable, Awaitable
+
+from agent.core.exceptions import ActionExecutionError
+
+logger = structlog.get_logger(__name__)
+
+
+class ActionBatcher:
+    """
+    Agrupa acciones enviadas de forma individual (de uno o varios tickets)
+    en una sola llamada al endpoint de lote de cada aplicación.
+
+    La primera acción que llega para una aplicación abre una ventana de
+    `window_ms` milisegundos; todas las acciones que lleguen durante la
+    ventana se envían juntas. Si se alcanza `max_size` el lote se envía de
+    inmediato.
+    """
+
+    def __init__(
+        self,
+        send_batch: Callable[[str, List[Dict[str, Any]]], Awaitable[List[Dict[str, Any]]]],
+        window_ms: float,
+        max_size: int
+    ):
+        """
+        Inicializa el agrupador.
+
+        Args:
+            send_batch: Corrutina que envía un lote (app_type, items) y retorna un resultado por item
+            window_ms: Ventana de agrupación en milisegundos
+            max_size: Número máximo de acciones por lote
+        """
+        self._send_batch = send_batch
+        self.window_seconds = max(0.0, window_ms) / 1000
+        self.max_size = max(1, max_size)
+        self._pending: Dict[str, List[Tuple[Dict[str, Any], asyncio.Future]]] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._inflight: set = set()
+        self.batches_sent = 0
+        self.items_sent = 0
+
+    async def submit(self, app_type: str, item: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Encola una acción y espera su resultado.
+
+        Args:
+            app_type: Aplicación ("amerika" o "dominio")
+            item: Payload de la acción ({user_id, action_type, user_name})
+
+        Returns:
+            Resultado del item retornado por el endpoint de lote
+
+        Raises:
+            Exception: La excepción de envío del lote, si la llamada completa falló
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._pending.setdefault(app_type, [])
+        pending.append((item, future))
+
+        if len(pending) >= self.max_size:
+            self._flush(app_type)
+        elif app_type not in self._timers:
+            self._timers[app_type] = loop.call_later(self.window_seconds, self._flush, app_type)
+
+        return await future
+
+    def _flush(self, app_type: str):
+        timer = self._timers.pop(app_type, None)
+        if timer is not None:
+            timer.cancel()
+        entries = self._pending.pop(app_type, [])
+        if not entries:
+            return
+        task = asyncio.create_task(self._send(app_type, entries))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _send(self, app_type: str, entries: List[Tuple[Dict[str, Any], asyncio.Future]]):
+        self.batches_sent += 1
+        self.items_sent += len(entries)
+        logger.info("Enviando lote de acciones", app_type=app_type, size=len(entries))
+        try:
+            results = await self._send_batch(app_type, [item for item, _ in entries])
+        except Exception as e:
+            for _, future in entries:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(entries, results):
+            if not future.done():
+                future.set_result(result)
+
+        # El backend retornó menos resultados que items
+        for _, future in entries[len(results):]:
+            if not future.done():
+                future.set_exception(ActionExecutionError(
+                    user_message="El sistema retornó una respuesta inválida.",
+                    action_suggestion="Tu solicitud será reintentada automáticamente.",
+                    technical_detail=f"Lote de {len(entries)} acciones con {len(results)} resultados"
+                ))
+
+    async def close(self):
+        """Envía las acciones pendientes y espera los lotes en curso"""
+        for app_type in list(self._pending):
+            self._flush(app_type)
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna métricas del agrupador"""
+        return {
+            "batches_sent": self.batches_sent,
+            "items_sent": self.items_sent,
+            "avg_batch_size": round(self.items_sent / self.batches_sent, 2) if self.batches_sent else 0,
+        }
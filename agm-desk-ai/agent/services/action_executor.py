@@ -1,15 +1,23 @@
 """Ejecutor de acciones para comunicarse con el backend FastAPI"""
 import asyncio
 import structlog
-from typing import Optional, Literal, Callable, Any
+from typing import Optional, Literal, Callable, Any, List, Dict, Set
 import httpx
 from agent.core.config import Settings
 from agent.core.exceptions import (
     ActionExecutionError,
     BackendConnectionError,
     InvalidActionError,
-    AuthenticationError
+    AuthenticationError,
+    ConcurrencyLimitError,
+    CircuitOpenError,
+    DeadlineExceededError
 )
+from agent.services.action_batcher import ActionBatcher
+from agent.services.adaptive_limiter import AdaptiveLimiter, parse_retry_after
+from agent.services.circuit_breaker import CLOSED, CircuitBreaker
+from agent.services.deadline import DEADLINE_HEADER, Deadline
+from agent.services.http_pool import PoolMetrics, build_backend_client
 
 logger = structlog.get_logger(__name__)
 
@@ -18,6 +26,7 @@ async def retry_with_backoff(
     func: Callable,
     max_retries: int = 3,
     initial_delay: float = 2.0,
+    deadline: Optional[Deadline] = None,
     *args,
     **kwargs
 ) -> Any:
@@ -28,6 +37,7 @@ async def retry_with_backoff(
         func: Función async a ejecutar
         max_retries: Número máximo de reintentos
         initial_delay: Delay inicial en segundos
+        deadline: Deadline del ticket; no se reintenta si la espera no cabe en el tiempo restante
         *args, **kwargs: Argumentos para la función
     
     Returns:
@@ -44,6 +54,14 @@ async def retry_with_backoff(
             return await func(*args, **kwargs)
         except (httpx.HTTPStatusError, httpx.RequestError, httpx.TimeoutException, httpx.ConnectError) as e:
             last_exception = e
+            if deadline is not None and deadline.remaining() <= delay:
+                logger.warning(
+                    "Sin tiempo restante para reintentar",
+                    attempt=attempt + 1,
+                    remaining_seconds=round(deadline.remaining(), 2),
+                    error_type=type(e).__name__
+                )
+                raise
             if attempt < max_retries - 1:
                 logger.warning(
                     "Reintentando después de error",
@@ -116,6 +134,10 @@ def get_http_status_fallback_message(status_code: int) -> tuple[str, str]:
             "El servicio está temporalmente no disponible. Tu solicitud será reintentada automáticamente.",
             "No es necesario hacer nada. El sistema reintentará automáticamente."
         ),
+        504: (
+            "El sistema no alcanzó a completar la acción en el tiempo disponible.",
+            "Tu solicitud será reintentada automáticamente."
+        ),
     }
     
     return fallback_messages.get(
@@ -127,6 +149,48 @@ def get_http_status_fallback_message(status_code: int) -> tuple[str, str]:
     )
 
 
+def build_action_error(status_code: Optional[int], error_data: Optional[dict]) -> ActionExecutionError:
+    """
+    Construye la excepción apropiada para un error del backend según el código HTTP.
+    
+    Args:
+        status_code: Código HTTP del error
+        error_data: Respuesta de error estándar del backend (dict)
+    
+    Returns:
+        AuthenticationError (401), InvalidActionError (400) o ActionExecutionError
+    """
+    user_message, action_suggestion, technical_detail = extract_backend_error_message(error_data or {})
+    
+    # Si no hay mensaje del backend, usar fallback según código HTTP
+    if not user_message or user_message == "Ocurrió un error al procesar la solicitud.":
+        user_message, action_suggestion = get_http_status_fallback_message(status_code or 500)
+    
+    if status_code == 401:
+        error_class = AuthenticationError
+    elif status_code == 400:
+        error_class = InvalidActionError
+    else:
+        error_class = ActionExecutionError
+    return error_class(
+        user_message=user_message,
+        action_suggestion=action_suggestion,
+        status_code=status_code,
+        technical_detail=technical_detail
+    )
+
+
+def build_idempotency_key(codpeticiones: Any, app_type: str, action_type: str) -> str:
+    """
+    Construye la clave de idempotencia de una acción de un ticket.
+    
+    La clave es estable entre reintentos (del mismo proceso o tras reiniciar
+    el agente), de modo que el backend ejecute cada acción del ticket una sola
+    vez y retorne la respuesta original a los reintentos.
+    """
+    return f"ticket-{codpeticiones}:{app_type}:{action_type}"
+
+
 def sanitize_password_for_logging(password: Optional[str]) -> str:
     """Sanitiza contraseña para logging (no loggear contraseñas reales)"""
     if password:
@@ -146,13 +210,160 @@ class ActionExecutor:
         """
         self.settings = settings
         self.base_url = settings.BACKEND_URL.rstrip("/")
-        self.client = httpx.AsyncClient(timeout=30.0)
+        self.pool_metrics = PoolMetrics(slow_wait_ms=settings.BACKEND_POOL_SLOW_WAIT_MS)
+        self.client = build_backend_client(settings, self.pool_metrics)
+        
+        # Concurrencia adaptativa hacia el backend (independiente de la de Gemini)
+        self.limiter = AdaptiveLimiter(
+            "backend",
+            initial_limit=settings.ACTION_CONCURRENCY_INITIAL,
+            min_limit=1,
+            max_limit=settings.ACTION_CONCURRENCY_MAX,
+            latency_threshold_ms=settings.ACTION_LATENCY_THRESHOLD_MS,
+            backoff=settings.ADAPTIVE_BACKOFF_FACTOR,
+            max_wait_seconds=settings.ADAPTIVE_MAX_WAIT_SECONDS,
+            enabled=settings.ENABLE_ADAPTIVE_CONCURRENCY
+        )
+        
+        # Circuito del backend: con el backend caído las acciones fallan de inmediato
+        # (la saturación local del limitador o del pool no cuenta como fallo)
+        self.breaker = CircuitBreaker(
+            "backend",
+            failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+            recovery_seconds=settings.CIRCUIT_RECOVERY_SECONDS,
+            ignored_exceptions=(ConcurrencyLimitError, httpx.PoolTimeout, DeadlineExceededError),
+            enabled=settings.ENABLE_CIRCUIT_BREAKERS
+        )
+        
+        # Avisos de invalidación de cache en segundo plano, coalescidos por ticket
+        self._invalidation_tasks: Dict[int, asyncio.Task] = {}
+        self._invalidation_dirty: Set[int] = set()
+        self.invalidations_sent = 0
+        self.invalidations_coalesced = 0
+        self.invalidations_skipped = 0
+        
+        # Agrupación opcional de acciones (de uno o varios tickets) en lotes
+        self.batcher: Optional[ActionBatcher] = None
+        if settings.ACTION_BATCHING_ENABLED:
+            self.batcher = ActionBatcher(
+                self.execute_actions_batch,
+                window_ms=settings.ACTION_BATCH_WINDOW_MS,
+                max_size=settings.ACTION_BATCH_MAX_SIZE
+            )
         logger.info(
             "ActionExecutor inicializado",
             backend_url=self.base_url,
-            timeout=30.0
+            max_connections=settings.BACKEND_HTTP_MAX_CONNECTIONS,
+            connect_timeout=settings.BACKEND_CONNECT_TIMEOUT_SECONDS,
+            read_timeout=settings.BACKEND_READ_TIMEOUT_SECONDS,
+            pool_timeout=settings.BACKEND_POOL_TIMEOUT_SECONDS,
+            batching=self.batcher is not None
         )
     
+    async def warm_up(self) -> int:
+        """
+        Abre conexiones al backend antes de procesar solicitudes.
+        
+        Envía BACKEND_PREWARM_CONNECTIONS consultas concurrentes a /health para
+        que las primeras acciones reutilicen conexiones ya establecidas. Un
+        fallo no impide el inicio del agente.
+        
+        Returns:
+            Número de conexiones abiertas correctamente
+        """
+        count = min(
+            self.settings.BACKEND_PREWARM_CONNECTIONS,
+            self.settings.BACKEND_HTTP_MAX_KEEPALIVE_CONNECTIONS
+        )
+        if count <= 0:
+            return 0
+        
+        started_at = asyncio.get_running_loop().time()
+        results = await asyncio.gather(
+            *(self.client.get(f"{self.base_url}/health") for _ in range(count)),
+            return_exceptions=True
+        )
+        warmed = sum(1 for result in results if isinstance(result, httpx.Response))
+        errors = [str(result) for result in results if isinstance(result, Exception)]
+        if errors:
+            logger.warning("No se pudieron precalentar todas las conexiones al backend", requested=count, warmed=warmed, error=errors[0])
+        logger.info(
+            "Conexiones al backend precalentadas",
+            warmed=warmed,
+            elapsed_ms=round((asyncio.get_running_loop().time() - started_at) * 1000, 1),
+            connections_opened=self.pool_metrics.connections_opened
+        )
+        return warmed
+    
+    def notify_request_updated(self, codpeticiones: int):
+        """
+        Avisa al backend que una solicitud se actualizó fuera de su API.
+        
+        El backend cachea GET /api/requests y GET /api/requests/{id}; el agente
+        escribe directo en Supabase, así que tras cada actualización pide invalidar
+        el cache del dueño. Es best-effort y no bloquea al ticket: el aviso se
+        envía en una tarea en segundo plano. Si ya hay un aviso en curso para
+        el ticket, las actualizaciones siguientes se coalescen en un solo aviso
+        al terminar. Con el circuito del backend abierto no se envía (el cache
+        del backend expira por TTL).
+        """
+        if not self.settings.BACKEND_CACHE_INVALIDATION_ENABLED:
+            return
+        if self.breaker.state != CLOSED:
+            self.invalidations_skipped += 1
+            return
+        if codpeticiones in self._invalidation_tasks:
+            self._invalidation_dirty.add(codpeticiones)
+            self.invalidations_coalesced += 1
+            return
+        self._invalidation_tasks[codpeticiones] = asyncio.create_task(self._run_invalidation(codpeticiones))
+    
+    async def _run_invalidation(self, codpeticiones: int):
+        """Envía el aviso de invalidación y, si hubo actualizaciones mientras tanto, uno más"""
+        try:
+            while True:
+                self._invalidation_dirty.discard(codpeticiones)
+                await self._send_invalidation(codpeticiones)
+                if codpeticiones not in self._invalidation_dirty or self.breaker.state != CLOSED:
+                    break
+        finally:
+            self._invalidation_dirty.discard(codpeticiones)
+            self._invalidation_tasks.pop(codpeticiones, None)
+    
+    async def _send_invalidation(self, codpeticiones: int) -> bool:
+        """
+        POST /api/requests/{id}/cache/invalidate (un fallo solo se registra).
+        
+        Returns:
+            True si el backend confirmó la invalidación
+        """
+        try:
+            response = await self.client.post(
+                f"{self.base_url}/api/requests/{codpeticiones}/cache/invalidate",
+                headers=self._get_headers(),
+                timeout=self.settings.BACKEND_CACHE_INVALIDATION_TIMEOUT_SECONDS
+            )
+            response.raise_for_status()
+            self.invalidations_sent += 1
+            return True
+        except httpx.HTTPError as e:
+            logger.warning("No se pudo invalidar el cache del backend", codpeticiones=codpeticiones, error=str(e))
+            return False
+    
+    def stats(self) -> Dict[str, Any]:
+        """Retorna métricas del cliente HTTP (espera en el pool), del limitador, del circuito y del agrupador"""
+        stats = self.pool_metrics.stats()
+        stats.update({f"concurrency_{key}": value for key, value in self.limiter.stats().items() if key != "dependency"})
+        stats.update({f"circuit_{key}": value for key, value in self.breaker.stats().items() if key != "dependency"})
+        if self.batcher is not None:
+            stats.update(self.batcher.stats())
+        stats.update({
+            "cache_invalidations_sent": self.invalidations_sent,
+            "cache_invalidations_coalesced": self.invalidations_coalesced,
+            "cache_invalidations_skipped": self.invalidations_skipped,
+        })
+        return stats
+    
     def _get_headers(self) -> dict:
         """Retorna headers necesarios para las solicitudes HTTP"""
         return {
@@ -164,7 +375,9 @@ class ActionExecutor:
         self,
         method: str,
         endpoint: str,
-        payload: Optional[dict] = None
+        payload: Optional[dict] = None,
+        idempotency_key: Optional[str] = None,
+        deadline: Optional[Deadline] = None
     ) -> dict:
         """
         Realiza una solicitud HTTP al backend.
@@ -173,6 +386,8 @@ class ActionExecutor:
             method: Método HTTP (GET, POST, etc.)
             endpoint: Endpoint relativo (ej: /api/apps/amerika/execute-action)
             payload: Payload JSON opcional
+            idempotency_key: Clave enviada en el header Idempotency-Key (la misma en cada reintento)
+            deadline: Deadline del ticket; acota los timeouts y se envía en el header X-Request-Deadline
         
         Returns:
             Respuesta parseada como dict
@@ -180,18 +395,55 @@ class ActionExecutor:
         Raises:
             BackendConnectionError: Error de conexión
             ActionExecutionError: Error en la ejecución
+            DeadlineExceededError: Si el deadline del ticket venció antes o durante la llamada
         """
         url = f"{self.base_url}{endpoint}"
         headers = self._get_headers()
+        if idempotency_key:
+            headers["Idempotency-Key"] = idempotency_key
+        timeout = self.client.timeout
+        if deadline is not None:
+            deadline.check(endpoint)
+        
+        # Modo asíncrono: el backend retorna 202 con un job_id y el resultado se obtiene por long-poll
+        params = None
+        if self.settings.ACTION_ASYNC_MODE_ENABLED and method == "POST" and endpoint.endswith("/execute-action"):
+            params = {"mode": "async"}
         
         try:
-            response = await self.client.request(
-                method=method,
-                url=url,
-                headers=headers,
-                json=payload,
-                timeout=30.0
-            )
+            max_wait = deadline.remaining() if deadline is not None else None
+            async with self.breaker.guard() as call, self.limiter.slot(max_wait) as permit:
+                # Timeout y X-Request-Deadline con el tiempo que queda tras esperar capacidad
+                if deadline is not None:
+                    deadline.check(endpoint)
+                    headers[DEADLINE_HEADER] = deadline.header_value()
+                    timeout = deadline.http_timeout(timeout)
+                try:
+                    response = await self.client.request(
+                        method=method,
+                        url=url,
+                        headers=headers,
+                        json=payload,
+                        params=params,
+                        timeout=timeout
+                    )
+                except (httpx.ConnectTimeout, httpx.ReadTimeout, httpx.WriteTimeout):
+                    if deadline is not None and deadline.expired:
+                        # El timeout lo impuso el deadline del ticket: no cuenta como sobrecarga ni fallo
+                        logger.error("Deadline del ticket agotado esperando al backend", endpoint=endpoint)
+                        raise DeadlineExceededError(stage=endpoint, budget_seconds=deadline.budget_seconds)
+                    permit.overloaded()
+                    raise
+                # Un 504 por el deadline enviado refleja el presupuesto del ticket, no la salud del backend
+                backend_error = response.status_code >= 500 and not (
+                    response.status_code == 504 and deadline is not None
+                )
+                if response.status_code == 429 or backend_error:
+                    permit.overloaded(retry_after=parse_retry_after(response.headers.get("Retry-After")))
+                if backend_error:
+                    call.failure()
+            if params and response.status_code == 202:
+                response = await self._wait_for_job(response, headers, deadline)
             response.raise_for_status()  # Lanza HTTPStatusError si status >= 400
             return response.json()
         except httpx.ConnectError as e:
@@ -201,12 +453,51 @@ class ActionExecutor:
                 action_suggestion="Tu solicitud será reintentada automáticamente cuando el servicio se recupere.",
                 technical_detail=str(e)
             )
+        except DeadlineExceededError:
+            raise
+        except CircuitOpenError:
+            # Se propaga sin reintentos: el llamador difiere el ticket
+            logger.warning("Circuito del backend abierto, solicitud no enviada", endpoint=endpoint)
+            raise
+        except ConcurrencyLimitError as e:
+            if deadline is not None and deadline.expired:
+                # La espera por capacidad agotó el tiempo del ticket
+                raise DeadlineExceededError(stage=endpoint, budget_seconds=deadline.budget_seconds)
+            logger.error(
+                "Backend saturado, solicitud rechazada por el limitador de concurrencia",
+                endpoint=endpoint,
+                **self.limiter.stats()
+            )
+            raise BackendConnectionError(
+                user_message="El sistema está procesando muchas solicitudes en este momento.",
+                action_suggestion="Tu solicitud será reintentada automáticamente.",
+                technical_detail=str(e)
+            )
+        except httpx.PoolTimeout as e:
+            # Todas las conexiones del pool estaban ocupadas: el backend no llegó a recibir la solicitud
+            self.pool_metrics.pool_timeouts += 1
+            logger.error(
+                "Sin conexiones disponibles en el pool del backend",
+                endpoint=endpoint,
+                pool_timeout=self.settings.BACKEND_POOL_TIMEOUT_SECONDS,
+                max_connections=self.settings.BACKEND_HTTP_MAX_CONNECTIONS
+            )
+            raise BackendConnectionError(
+                user_message="El sistema está procesando muchas solicitudes en este momento.",
+                action_suggestion="Tu solicitud será reintentada automáticamente.",
+                technical_detail=f"Pool timeout después de {self.settings.BACKEND_POOL_TIMEOUT_SECONDS} segundos: {str(e)}"
+            )
         except httpx.TimeoutException as e:
-            logger.error("Timeout en solicitud al backend", endpoint=endpoint, timeout=30.0)
+            logger.error(
+                "Timeout en solicitud al backend",
+                endpoint=endpoint,
+                timeout_type=type(e).__name__,
+                read_timeout=self.settings.BACKEND_READ_TIMEOUT_SECONDS
+            )
             raise BackendConnectionError(
                 user_message="La solicitud tardó demasiado en procesarse.",
                 action_suggestion="Tu solicitud será reintentada automáticamente.",
-                technical_detail=f"Timeout después de 30 segundos: {str(e)}"
+                technical_detail=f"{type(e).__name__}: {str(e)}"
             )
         except httpx.HTTPStatusError as e:
             # Manejar en métodos específicos con extract_backend_error_message()
@@ -233,10 +524,75 @@ class ActionExecutor:
                 technical_detail=str(e)
             )
     
+    async def _wait_for_job(
+        self,
+        accepted: httpx.Response,
+        headers: dict,
+        deadline: Optional[Deadline] = None
+    ) -> httpx.Response:
+        """
+        Espera el resultado de un job asíncrono consultando GET /jobs/{job_id}?wait=N.
+        
+        Retorna una respuesta equivalente a la del endpoint síncrono (mismo
+        código HTTP y cuerpo), de modo que el manejo de errores existente
+        aplica sin cambios.
+        
+        Args:
+            accepted: Respuesta 202 del endpoint de acción
+            headers: Headers de autenticación
+            deadline: Deadline del ticket (acota la espera total)
+        
+        Returns:
+            Respuesta reconstruida con el resultado del job
+        
+        Raises:
+            httpx.TimeoutException: Si el job no termina dentro de ACTION_JOB_TIMEOUT_SECONDS
+        """
+        status_url = f"{self.base_url}{accepted.json()['status_url']}"
+        wait = self.settings.ACTION_JOB_POLL_WAIT_SECONDS
+        loop = asyncio.get_running_loop()
+        job_timeout = self.settings.ACTION_JOB_TIMEOUT_SECONDS
+        if deadline is not None:
+            job_timeout = deadline.timeout(job_timeout)
+        wait_until = loop.time() + job_timeout
+        
+        while True:
+            remaining = wait_until - loop.time()
+            if remaining <= 0:
+                raise httpx.ReadTimeout(
+                    f"El job no terminó en {job_timeout:.1f} segundos",
+                    request=accepted.request
+                )
+            poll = await self.client.get(
+                status_url,
+                headers=headers,
+                params={"wait": min(wait, remaining)},
+                # La lectura debe cubrir la espera del long-poll
+                timeout=httpx.Timeout(
+                    connect=self.client.timeout.connect,
+                    read=min(wait, remaining) + 10.0,
+                    write=self.client.timeout.write,
+                    pool=self.client.timeout.pool
+                )
+            )
+            poll.raise_for_status()
+            job = poll.json()
+            if job.get("status") in ("succeeded", "failed"):
+                break
+        
+        body = job.get("response") if job.get("status") == "succeeded" else {"detail": job.get("error")}
+        return httpx.Response(
+            status_code=job.get("status_code") or 500,
+            json=body,
+            request=accepted.request
+        )
+    
     async def execute_amerika_action(
         self,
         user_id: str,
-        action_type: Literal["generate_password", "unlock_account", "lock_account"]
+        action_type: Literal["generate_password", "unlock_account", "lock_account"],
+        idempotency_key: Optional[str] = None,
+        deadline: Optional[Deadline] = None
     ) -> dict:
         """
         Ejecuta una acción de Amerika.
@@ -244,6 +600,8 @@ class ActionExecutor:
         Args:
             user_id: ID del usuario
             action_type: Tipo de acción a ejecutar
+            idempotency_key: Clave de idempotencia (ver build_idempotency_key)
+            deadline: Deadline del ticket (opcional)
         
         Returns:
             Respuesta parseada según esquema AmerikaActionResponse
@@ -267,14 +625,20 @@ class ActionExecutor:
             endpoint=endpoint
         )
         
+        if self.batcher is not None:
+            if idempotency_key:
+                payload["idempotency_key"] = idempotency_key
+            return await self._execute_via_batcher("amerika", payload, deadline)
+        
         async def _execute():
-            return await self._make_request("POST", endpoint, payload)
+            return await self._make_request("POST", endpoint, payload, idempotency_key=idempotency_key, deadline=deadline)
         
         try:
             response = await retry_with_backoff(
                 _execute,
                 max_retries=self.settings.MAX_RETRIES,
-                initial_delay=self.settings.RETRY_DELAY
+                initial_delay=self.settings.RETRY_DELAY,
+                deadline=deadline
             )
             
             # Sanitizar contraseña para logging
@@ -338,7 +702,9 @@ class ActionExecutor:
         self,
         user_id: str,
         action_type: Literal["find_user", "change_password", "unlock_account"],
-        user_name: Optional[str] = None
+        user_name: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+        deadline: Optional[Deadline] = None
     ) -> dict:
         """
         Ejecuta una acción de Dominio.
@@ -347,6 +713,8 @@ class ActionExecutor:
             user_id: ID del usuario
             action_type: Tipo de acción a ejecutar
             user_name: Nombre de usuario (requerido para find_user)
+            idempotency_key: Clave de idempotencia (ver build_idempotency_key)
+            deadline: Deadline del ticket (opcional)
         
         Returns:
             Respuesta parseada según esquema DominioActionResponse
@@ -382,14 +750,20 @@ class ActionExecutor:
             endpoint=endpoint
         )
         
+        if self.batcher is not None:
+            if idempotency_key:
+                payload["idempotency_key"] = idempotency_key
+            return await self._execute_via_batcher("dominio", payload, deadline)
+        
         async def _execute():
-            return await self._make_request("POST", endpoint, payload)
+            return await self._make_request("POST", endpoint, payload, idempotency_key=idempotency_key, deadline=deadline)
         
         try:
             response = await retry_with_backoff(
                 _execute,
                 max_retries=self.settings.MAX_RETRIES,
-                initial_delay=self.settings.RETRY_DELAY
+                initial_delay=self.settings.RETRY_DELAY,
+                deadline=deadline
             )
             
             # Sanitizar contraseña para logging
@@ -451,8 +825,136 @@ class ActionExecutor:
                     technical_detail=technical_detail
                 )
     
+    async def execute_actions_batch(
+        self,
+        app_type: Literal["amerika", "dominio"],
+        items: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Ejecuta varias acciones de una aplicación en una sola llamada a /execute-actions.
+        
+        Los lotes más grandes que ACTION_BATCH_MAX_SIZE se dividen y se envían
+        concurrentemente.
+        
+        Args:
+            app_type: Aplicación ("amerika" o "dominio")
+            items: Acciones ({user_id, action_type, user_name})
+        
+        Returns:
+            Resultado de cada item en el mismo orden ({index, status_code,
+            success, response, error})
+        
+        Raises:
+            BackendConnectionError: Error de conexión
+            ActionExecutionError: Si la llamada completa falla
+        """
+        endpoint = f"/api/apps/{app_type}/execute-actions"
+        max_size = max(1, self.settings.ACTION_BATCH_MAX_SIZE)
+        chunks = [items[i:i + max_size] for i in range(0, len(items), max_size)]
+        
+        async def _send(chunk: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            async def _execute():
+                return await self._make_request("POST", endpoint, {"items": chunk})
+            
+            try:
+                response = await retry_with_backoff(
+                    _execute,
+                    max_retries=self.settings.MAX_RETRIES,
+                    initial_delay=self.settings.RETRY_DELAY
+                )
+            except httpx.HTTPStatusError as e:
+                try:
+                    error_data = e.response.json() if e.response else {}
+                except (ValueError, AttributeError):
+                    error_data = {}
+                status_code = e.response.status_code if e.response else None
+                logger.error(
+                    "Error al ejecutar lote de acciones",
+                    app_type=app_type,
+                    size=len(chunk),
+                    status_code=status_code
+                )
+                # FastAPI envuelve la respuesta de error estándar en "detail"
+                detail = error_data.get("detail") if isinstance(error_data, dict) else None
+                raise build_action_error(status_code, detail if isinstance(detail, dict) else error_data)
+            return response.get("results", [])
+        
+        results = await asyncio.gather(*(_send(chunk) for chunk in chunks))
+        flattened = [result for chunk_results in results for result in chunk_results]
+        logger.info(
+            "Lote de acciones ejecutado",
+            app_type=app_type,
+            size=len(items),
+            requests=len(chunks),
+            failed=sum(1 for result in flattened if not result.get("success"))
+        )
+        return flattened
+    
+    async def _execute_via_batcher(self, app_type: str, payload: dict, deadline: Optional[Deadline] = None) -> dict:
+        """
+        Envía una acción a través del agrupador y la convierte en la respuesta
+        (o excepción) que habría producido /execute-action.
+        
+        El lote es compartido por varios tickets, así que el deadline del
+        ticket solo acota la espera de su propio resultado. Un item con 5xx se
+        reenvía con la misma política de reintentos que /execute-action (la
+        idempotency_key evita ejecutarlo dos veces).
+        """
+        endpoint = f"/api/apps/{app_type}/execute-actions"
+        
+        async def _execute():
+            if deadline is None:
+                result = await self.batcher.submit(app_type, payload)
+            else:
+                deadline.check(endpoint)
+                try:
+                    result = await asyncio.wait_for(self.batcher.submit(app_type, payload), timeout=deadline.remaining())
+                except asyncio.TimeoutError:
+                    raise DeadlineExceededError(stage=endpoint, budget_seconds=deadline.budget_seconds)
+            status_code = result.get("status_code")
+            if status_code is not None and status_code >= 500:
+                request = httpx.Request("POST", f"{self.base_url}{endpoint}")
+                raise httpx.HTTPStatusError(
+                    f"Item del lote con status {status_code}",
+                    request=request,
+                    response=httpx.Response(status_code, json=result.get("error"), request=request)
+                )
+            return result
+        
+        try:
+            result = await retry_with_backoff(
+                _execute,
+                max_retries=self.settings.MAX_RETRIES,
+                initial_delay=self.settings.RETRY_DELAY,
+                deadline=deadline
+            )
+        except httpx.HTTPStatusError as e:
+            result = {"status_code": e.response.status_code, "error": e.response.json() if e.response.content else None}
+        if result.get("status_code") == 200 and result.get("response") is not None:
+            return result["response"]
+        
+        error = build_action_error(result.get("status_code"), result.get("error"))
+        logger.error(
+            "Error al ejecutar acción en lote",
+            app_type=app_type,
+            user_id=payload.get("user_id"),
+            action_type=payload.get("action_type"),
+            status_code=result.get("status_code"),
+            technical_detail=error.technical_detail
+        )
+        raise error
+    
     async def close(self):
         """Cierra el cliente HTTP"""
+        if self.batcher is not None:
+            await self.batcher.close()
+        # Los avisos pendientes se descartan (el cache del backend expira por TTL)
+        invalidations = list(self._invalidation_tasks.values())
+        for task in invalidations:
+            task.cancel()
+        await asyncio.gather(*invalidations, return_exceptions=True)
+        self._invalidation_tasks.clear()
+        self._invalidation_dirty.clear()
         await self.client.aclose()
-        logger.info("ActionExecutor cerrado")
+        logger.info("ActionExecutor cerrado", **self.stats())
 
@@ -0,0 +1,151 @@
+"""Plan de ejecución de acciones como grafo de dependencias"""
+import asyncio
+import time
+import structlog
+from datetime import datetime
+from typing import Optional, Dict, List, Any, Callable, Awaitable
+
+logger = structlog.get_logger(__name__)
+
+# Acción de Dominio de la que dependen las demás acciones de Dominio
+FIND_USER_ACTION = "find_user"
+
+
+class ActionNode:
+    """Acción del plan con sus dependencias"""
+
+    __slots__ = ("key", "app_type", "action_type", "role", "depends_on", "sequence")
+
+    def __init__(
+        self,
+        app_type: str,
+        action_type: str,
+        role: str,
+        sequence: int,
+        depends_on: Optional[List[str]] = None
+    ):
+        """
+        Args:
+            app_type: Aplicación ("amerika" o "dominio")
+            action_type: Acción a ejecutar
+            role: "primary" o "secondary"
+            sequence: Posición de la acción en el orden secuencial original
+            depends_on: Claves de las acciones que deben completarse antes
+        """
+        self.key = f"{role}:{app_type}:{action_type}"
+        self.app_type = app_type
+        self.action_type = action_type
+        self.role = role
+        self.sequence = sequence
+        self.depends_on = depends_on or []
+
+
+def build_action_plan(app_type: str, execution_params: Dict[str, Any]) -> List[ActionNode]:
+    """
+    Construye el grafo de acciones de la aplicación principal y secundaria.
+
+    Reglas:
+    - Dominio: find_user siempre se ejecuta y las demás acciones de Dominio
+      dependen de él.
+    - Amerika: las acciones no tienen dependencias.
+    - Las aplicaciones principal y secundaria son ramas independientes.
+
+    Args:
+        app_type: Aplicación principal
+        execution_params: Parámetros de ejecución validados
+
+    Returns:
+        Nodos del plan en el orden secuencial original
+    """
+    apps = [("primary", app_type, execution_params.get("mapped_actions", execution_params.get("primary_actions", [])))]
+    if execution_params.get("requires_secondary_app", False):
+        apps.append((
+            "secondary",
+            execution_params.get("secondary_app"),
+            execution_params.get("secondary_app_actions", [])
+        ))
+
+    plan: List[ActionNode] = []
+    for role, app, actions in apps:
+        depends_on: List[str] = []
+        if app == "dominio":
+            find_user = ActionNode(app, FIND_USER_ACTION, role, len(plan))
+            plan.append(find_user)
+            depends_on = [find_user.key]
+
+        seen = set()
+        for action in actions or []:
+            if (app == "dominio" and action == FIND_USER_ACTION) or action in seen:
+                continue
+            seen.add(action)
+            plan.append(ActionNode(app, action, role, len(plan), depends_on))
+    return plan
+
+
+async def run_action_plan(
+    plan: List[ActionNode],
+    execute: Callable[[ActionNode], Awaitable[Dict[str, Any]]],
+    allows_dependents: Callable[[Dict[str, Any]], bool]
+) -> List[Dict[str, Any]]:
+    """
+    Ejecuta el plan: cada acción empieza en cuanto terminan sus dependencias.
+
+    Las acciones cuya dependencia no las habilita (por ejemplo, find_user no
+    encontró al usuario) no se ejecutan. Si una acción lanza una excepción,
+    se cancelan las demás y la excepción se propaga.
+
+    Args:
+        plan: Nodos del plan
+        execute: Corrutina que ejecuta una acción y retorna su entrada de actions_executed
+        allows_dependents: Indica si el resultado de una acción permite ejecutar sus dependientes
+
+    Returns:
+        Entradas de actions_executed en el orden secuencial original, con
+        sequence, depends_on, started_at, finished_at y duration_ms
+    """
+    tasks: Dict[str, asyncio.Task] = {}
+    plan_started = time.perf_counter()
+
+    async def run_node(node: ActionNode) -> Optional[Dict[str, Any]]:
+        for dependency in node.depends_on:
+            entry = await tasks[dependency]
+            if entry is None or not allows_dependents(entry):
+                logger.info(
+                    "Acción omitida por dependencia no satisfecha",
+                    action=node.key,
+                    dependency=dependency
+                )
+                return None
+
+        started_at = datetime.utcnow()
+        started = time.perf_counter()
+        entry = await execute(node)
+        finished = time.perf_counter()
+        entry.update({
+            "sequence": node.sequence,
+            "depends_on": node.depends_on,
+            "started_at": started_at.isoformat(),
+            "finished_at": datetime.utcnow().isoformat(),
+            "start_offset_ms": round((started - plan_started) * 1000, 2),
+            "duration_ms": round((finished - started) * 1000, 2)
+        })
+        return entry
+
+    for node in plan:
+        tasks[node.key] = asyncio.create_task(run_node(node))
+
+    try:
+        results = await asyncio.gather(*tasks.values())
+    except BaseException:
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        raise
+
+    logger.info(
+        "Plan de acciones ejecutado",
+        actions=[node.key for node in plan],
+        executed=sum(1 for entry in results if entry is not None),
+        elapsed_ms=round((time.perf_counter() - plan_started) * 1000, 2)
+    )
+    return [entry for entry in results if entry is not None]
@@ -0,0 +1,229 @@
+"""Limitador adaptativo de concurrencia (AIMD) para dependencias externas"""
+import asyncio
+import time
+import structlog
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional, Dict, Any
+
+from agent.core.exceptions import ConcurrencyLimitError
+
+logger = structlog.get_logger(__name__)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Interpreta un header Retry-After (segundos o fecha HTTP).
+
+    Returns:
+        Segundos de espera, o None si el valor no es válido
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class AdaptiveLimiter:
+    """
+    Limita las llamadas concurrentes a una dependencia ajustando el límite
+    según su comportamiento (AIMD):
+
+    - Cada llamada exitosa con latencia menor a `latency_threshold_ms`
+      aumenta el límite en 1/limite (≈ +1 por cada ronda completa de llamadas).
+    - Una sobrecarga (429, 5xx, timeout o latencia mayor al umbral) multiplica
+      el límite por `backoff` (como máximo una vez por `decrease_cooldown`
+      segundos, para que una ráfaga de errores simultáneos cuente como una).
+    - Un Retry-After pausa las nuevas llamadas hasta que se cumpla.
+
+    Las llamadas que no obtienen capacidad dentro de `max_wait_seconds` (o de
+    la espera máxima de la llamada, si es menor) se rechazan con
+    ConcurrencyLimitError.
+
+    Uso:
+        async with limiter.slot() as permit:
+            response = await llamada()
+            if response.status_code == 429:
+                permit.overloaded(retry_after=...)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        latency_threshold_ms: float,
+        backoff: float = 0.5,
+        max_wait_seconds: float = 30.0,
+        decrease_cooldown: float = 1.0,
+        enabled: bool = True
+    ):
+        """
+        Inicializa el limitador.
+
+        Args:
+            name: Nombre de la dependencia (para logs y métricas)
+            initial_limit: Límite inicial de llamadas concurrentes
+            min_limit: Límite mínimo
+            max_limit: Límite máximo
+            latency_threshold_ms: Latencia a partir de la cual una llamada cuenta como sobrecarga
+            backoff: Factor multiplicativo aplicado al límite ante una sobrecarga
+            max_wait_seconds: Espera máxima por capacidad antes de rechazar la llamada
+            decrease_cooldown: Segundos mínimos entre dos reducciones del límite
+            enabled: Si es False, no limita ni ajusta (solo cuenta llamadas)
+        """
+        self.name = name
+        self.enabled = enabled
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(max(initial_limit, self.min_limit), self.max_limit))
+        self.latency_threshold = max(0.0, latency_threshold_ms) / 1000
+        self.backoff = min(max(backoff, 0.1), 0.95)
+        self.max_wait_seconds = max(0.0, max_wait_seconds)
+        self.decrease_cooldown = decrease_cooldown
+
+        self.in_flight = 0
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._condition: Optional[asyncio.Condition] = None
+
+        self.completed = 0
+        self.overloads = 0
+        self.rejected = 0
+        self.decreases = 0
+
+    @property
+    def current_limit(self) -> int:
+        return int(self.limit)
+
+    def slot(self, max_wait: Optional[float] = None) -> "_Permit":
+        """
+        Retorna un context manager asíncrono que reserva capacidad para una llamada.
+
+        Args:
+            max_wait: Espera máxima de esta llamada (ej: el tiempo restante del
+                ticket); se aplica si es menor que `max_wait_seconds`
+        """
+        return _Permit(self, max_wait)
+
+    def _get_condition(self) -> asyncio.Condition:
+        # Se crea de forma perezosa para quedar ligada al event loop en ejecución
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    async def _acquire(self, max_wait: Optional[float] = None):
+        condition = self._get_condition()
+        wait = self.max_wait_seconds if max_wait is None else min(self.max_wait_seconds, max(0.0, max_wait))
+        deadline = time.monotonic() + wait
+        async with condition:
+            while True:
+                now = time.monotonic()
+                pause = self._paused_until - now
+                if not self.enabled or (pause <= 0 and self.in_flight < self.current_limit):
+                    break
+                remaining = deadline - now
+                if remaining <= 0 or pause > remaining:
+                    self.rejected += 1
+                    raise ConcurrencyLimitError(
+                        dependency=self.name,
+                        limit=self.current_limit,
+                        retry_after=pause if pause > 0 else None
+                    )
+                try:
+                    await asyncio.wait_for(condition.wait(), timeout=pause if pause > 0 else remaining)
+                except asyncio.TimeoutError:
+                    pass
+            self.in_flight += 1
+
+    async def _release(self, latency: float, overloaded: bool, retry_after: Optional[float], failed: bool):
+        condition = self._get_condition()
+        async with condition:
+            self.in_flight -= 1
+            self.completed += 1
+            if not self.enabled:
+                return
+            if overloaded or (not failed and self.latency_threshold and latency > self.latency_threshold):
+                self._on_overload(latency, retry_after)
+            elif not failed:
+                self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+            condition.notify_all()
+
+    def _on_overload(self, latency: float, retry_after: Optional[float]):
+        self.overloads += 1
+        now = time.monotonic()
+        if retry_after:
+            self._paused_until = max(self._paused_until, now + retry_after)
+        if now - self._last_decrease < self.decrease_cooldown:
+            return
+
+        previous = self.current_limit
+        self.limit = max(float(self.min_limit), self.limit * self.backoff)
+        self._last_decrease = now
+        self.decreases += 1
+        logger.warning(
+            "Dependencia sobrecargada, reduciendo concurrencia",
+            dependency=self.name,
+            previous_limit=previous,
+            limit=self.current_limit,
+            latency_ms=round(latency * 1000, 1),
+            retry_after=retry_after
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna métricas del limitador"""
+        return {
+            "dependency": self.name,
+            "limit": self.current_limit,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "overloads": self.overloads,
+            "decreases": self.decreases,
+            "rejected": self.rejected,
+            "paused_seconds": round(max(0.0, self._paused_until - time.monotonic()), 2),
+        }
+
+
+class _Permit:
+    """Capacidad reservada para una llamada; registra el resultado al salir"""
+
+    __slots__ = ("_limiter", "_max_wait", "_started_at", "_overloaded", "_retry_after")
+
+    def __init__(self, limiter: AdaptiveLimiter, max_wait: Optional[float] = None):
+        self._limiter = limiter
+        self._max_wait = max_wait
+        self._started_at = 0.0
+        self._overloaded = False
+        self._retry_after: Optional[float] = None
+
+    def overloaded(self, retry_after: Optional[float] = None):
+        """Marca la llamada como rechazada por sobrecarga (429, 5xx, timeout)"""
+        self._overloaded = True
+        if retry_after is not None:
+            self._retry_after = retry_after
+
+    async def __aenter__(self) -> "_Permit":
+        await self._limiter._acquire(self._max_wait)
+        self._started_at = time.monotonic()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        # Otros errores (conexión, validación) no ajustan el límite
+        await self._limiter._release(
+            latency=time.monotonic() - self._started_at,
+            overloaded=self._overloaded,
+            retry_after=self._retry_after,
+            failed=exc_type is not None
+        )
+        return False
@@ -15,8 +15,17 @@ except ImportError:
 from pydantic import BaseModel, Field, field_validator
 
 from agent.core.config import Settings
-from agent.core.exceptions import AIClassificationError, ValidationError
+from agent.core.exceptions import (
+    AIClassificationError,
+    ValidationError,
+    ConcurrencyLimitError,
+    CircuitOpenError,
+    DeadlineExceededError
+)
 from agent.prompts.system_prompts import get_system_prompt
+from agent.services.adaptive_limiter import AdaptiveLimiter, parse_retry_after
+from agent.services.circuit_breaker import CircuitBreaker
+from agent.services.deadline import Deadline
 
 logger = structlog.get_logger(__name__)
 
@@ -91,6 +100,27 @@ class AIProcessor:
         self.classification_prompt_base = get_system_prompt("classification_base")
         self.classification_prompt_with_examples = get_system_prompt("classification_with_examples")
         
+        # Concurrencia adaptativa hacia Gemini (independiente de la del backend)
+        self.limiter = AdaptiveLimiter(
+            "gemini",
+            initial_limit=settings.GEMINI_CONCURRENCY_INITIAL,
+            min_limit=1,
+            max_limit=settings.GEMINI_CONCURRENCY_MAX,
+            latency_threshold_ms=settings.GEMINI_LATENCY_THRESHOLD_MS,
+            backoff=settings.ADAPTIVE_BACKOFF_FACTOR,
+            max_wait_seconds=settings.ADAPTIVE_MAX_WAIT_SECONDS,
+            enabled=settings.ENABLE_ADAPTIVE_CONCURRENCY
+        )
+        
+        # Circuito de Gemini: con Gemini caído se usa la clasificación de respaldo de inmediato
+        self.breaker = CircuitBreaker(
+            "gemini",
+            failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+            recovery_seconds=settings.CIRCUIT_RECOVERY_SECONDS,
+            ignored_exceptions=(ConcurrencyLimitError, DeadlineExceededError),
+            enabled=settings.ENABLE_CIRCUIT_BREAKERS
+        )
+        
         logger.info(
             "AIProcessor inicializado",
             model=settings.GEMINI_MODEL,
@@ -112,6 +142,82 @@ class AIProcessor:
         
         return config
     
+    @staticmethod
+    def _is_rate_limit_error(error: Exception) -> bool:
+        """Indica si el error de Gemini es un rate limit (429)"""
+        return getattr(error, 'code', None) == 429 or "rate limit" in str(error).lower()
+    
+    @staticmethod
+    def _get_retry_after(error: Exception) -> Optional[float]:
+        """Extrae el Retry-After de la respuesta HTTP asociada al error, si existe"""
+        headers = getattr(getattr(error, 'response', None), 'headers', None)
+        if not headers:
+            return None
+        return parse_retry_after(headers.get("Retry-After"))
+    
+    async def _generate_content(
+        self,
+        model,
+        user_message_text: str,
+        generation_config: dict,
+        deadline: Optional[Deadline] = None
+    ):
+        """
+        Llama a Gemini a través del circuit breaker y del limitador de concurrencia.
+        
+        Un 429 (respetando Retry-After), un 5xx o un timeout reducen la
+        concurrencia permitida hacia Gemini. Cualquier error de la llamada
+        cuenta como fallo para el circuito. La espera por capacidad se acota al
+        tiempo restante del ticket; el timeout (GEMINI_TIMEOUT_SECONDS acotado al
+        tiempo restante) se calcula una vez obtenida la capacidad.
+        
+        Raises:
+            DeadlineExceededError: Si el deadline del ticket venció antes de la llamada
+            TimeoutError: Si Gemini no responde dentro del timeout
+            CircuitOpenError: Si el circuito de Gemini está abierto
+            ConcurrencyLimitError: Si no hay capacidad dentro de ADAPTIVE_MAX_WAIT_SECONDS
+        """
+        timeout = self.settings.GEMINI_TIMEOUT_SECONDS
+        max_wait = None
+        if deadline is not None:
+            deadline.check("classification")
+            max_wait = deadline.remaining()
+        
+        try:
+            async with self.breaker.guard(), self.limiter.slot(max_wait) as permit:
+                if deadline is not None:
+                    deadline.check("classification")
+                    timeout = deadline.timeout(timeout)
+                try:
+                    return await asyncio.wait_for(
+                        model.generate_content_async(
+                            user_message_text,
+                            generation_config=generation_config,
+                            request_options={"timeout": timeout}
+                        ),
+                        timeout=timeout
+                    )
+                except Exception as e:
+                    error_code = getattr(e, 'code', None)
+                    if self._is_rate_limit_error(e):
+                        permit.overloaded(
+                            retry_after=self._get_retry_after(e) or self.settings.GEMINI_RATE_LIMIT_PAUSE_SECONDS
+                        )
+                    elif isinstance(e, TimeoutError) or (isinstance(error_code, int) and error_code >= 500):
+                        permit.overloaded()
+                    raise
+        except ConcurrencyLimitError:
+            if deadline is not None and deadline.expired:
+                # La espera por capacidad agotó el tiempo del ticket
+                raise DeadlineExceededError(stage="classification", budget_seconds=deadline.budget_seconds)
+            raise
+    
+    def stats(self) -> dict:
+        """Retorna métricas del limitador de concurrencia y del circuito de Gemini"""
+        stats = self.limiter.stats()
+        stats.update({f"circuit_{key}": value for key, value in self.breaker.stats().items() if key != "dependency"})
+        return stats
+    
     def _sanitize_user_input(self, description: str) -> str:
         """
         Sanitiza y optimiza la descripción del usuario.
@@ -365,7 +471,8 @@ class AIProcessor:
         self,
         description: str,
         codcategoria: int,
-        ususolicita: str
+        ususolicita: str,
+        deadline: Optional[Deadline] = None
     ) -> ClassificationResult:
         """
         Clasifica una solicitud usando Gemini AI.
@@ -374,12 +481,14 @@ class AIProcessor:
             description: Descripción de la solicitud
             codcategoria: Categoría seleccionada
             ususolicita: Usuario que solicita
+            deadline: Deadline del ticket (acota el timeout de Gemini)
         
         Returns:
             ClassificationResult validado
         
         Raises:
             AIClassificationError: Si la clasificación falla definitivamente
+            DeadlineExceededError: Si el deadline del ticket venció antes de llamar a Gemini
         """
         start_time = datetime.utcnow()
         
@@ -434,10 +543,7 @@ class AIProcessor:
             )
             
             # Usar generate_content_async sin system_instruction (ya está en el modelo)
-            response = await model.generate_content_async(
-                user_message_text,
-                generation_config=generation_config
-            )
+            response = await self._generate_content(model, user_message_text, generation_config, deadline)
             
             # LOGGING: Después de recibir respuesta de Gemini
             logger.debug(
@@ -465,13 +571,23 @@ class AIProcessor:
             
             return result
             
+        except DeadlineExceededError:
+            raise
+        
+        except CircuitOpenError as e:
+            logger.warning("Circuito de Gemini abierto, usando fallback", retry_after=round(e.retry_after, 1))
+            return self._get_fallback_classification(codcategoria, ususolicita)
+        
+        except ConcurrencyLimitError as e:
+            logger.error("Gemini saturado, usando fallback", error=str(e), **self.limiter.stats())
+            return self._get_fallback_classification(codcategoria, ususolicita)
+        
         except APIError as e:
             error_code = getattr(e, 'code', None)
             
-            # Rate limit: Reintentar una vez
-            if error_code == 429 or "rate limit" in str(e).lower():
-                logger.warning("Rate limit de Gemini, reintentando...", attempt=1)
-                await asyncio.sleep(5)  # Esperar 5 segundos
+            # Rate limit: Reintentar una vez (el limitador retiene el reintento hasta que venza el Retry-After)
+            if self._is_rate_limit_error(e):
+                logger.warning("Rate limit de Gemini, reintentando...", attempt=1, **self.limiter.stats())
                 try:
                     # Reintentar una vez
                     system_prompt, user_message = self._build_classification_prompt(sanitized_desc, codcategoria)
@@ -488,12 +604,11 @@ class AIProcessor:
                         user_message_full=user_message_text
                     )
                     
-                    response = await model.generate_content_async(
-                        user_message_text,
-                        generation_config=self._get_generation_config()
-                    )
+                    response = await self._generate_content(model, user_message_text, self._get_generation_config(), deadline)
                     classification_data = self._parse_classification_response(response)
                     return ClassificationResult(**classification_data)
+                except DeadlineExceededError:
+                    raise
                 except Exception:
                     logger.error("Reintento falló, usando fallback", error=str(e))
                     return self._get_fallback_classification(codcategoria, ususolicita)
@@ -515,7 +630,12 @@ class AIProcessor:
             return self._get_fallback_classification(codcategoria, ususolicita)
         
         except TimeoutError as e:
-            logger.error("Timeout en llamada a Gemini", timeout=30.0, error=str(e))
+            logger.error(
+                "Timeout en llamada a Gemini",
+                timeout=self.settings.GEMINI_TIMEOUT_SECONDS,
+                remaining_seconds=round(deadline.remaining(), 2) if deadline is not None else None,
+                error=str(e)
+            )
             return self._get_fallback_classification(codcategoria, ususolicita)
         
         except ConnectionError as e:
@@ -0,0 +1,139 @@
+"""Cache en memoria del catálogo de categorías (HLP_CATEGORIAS)"""
+import asyncio
+import time
+import structlog
+from typing import Optional, Dict, Callable, Awaitable, Any
+
+logger = structlog.get_logger(__name__)
+
+
+class CategoryCatalog:
+    """
+    Catálogo de categorías cargado en memoria.
+
+    Se recarga cuando expira el TTL, cuando se invalida (eventos Realtime de
+    HLP_CATEGORIAS) o cuando se consulta una categoría desconocida. Las
+    recargas concurrentes se agrupan en una sola consulta (single-flight).
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], Awaitable[Dict[int, str]]],
+        ttl_seconds: float,
+        miss_refresh_seconds: float = 30.0
+    ):
+        """
+        Inicializa el catálogo.
+
+        Args:
+            loader: Corrutina que retorna {CODCATEGORIA: CATEGORIA}
+            ttl_seconds: Tiempo de vida del catálogo en segundos
+            miss_refresh_seconds: Tiempo mínimo entre recargas provocadas por categorías desconocidas
+        """
+        self._loader = loader
+        self.ttl_seconds = ttl_seconds
+        self.miss_refresh_seconds = miss_refresh_seconds
+        self._categories: Optional[Dict[int, str]] = None
+        self._loaded_at: float = 0.0
+        self._stale = False
+        self._inflight: Optional[asyncio.Future] = None
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._categories is not None
+
+    def _is_expired(self) -> bool:
+        return (
+            not self.is_loaded
+            or self._stale
+            or (time.monotonic() - self._loaded_at) > self.ttl_seconds
+        )
+
+    def invalidate(self):
+        """Marca el catálogo como expirado (se recarga en la próxima consulta)"""
+        self._stale = True
+
+    async def refresh(self) -> Dict[int, str]:
+        """
+        Recarga el catálogo. Si ya hay una recarga en curso, espera su resultado.
+
+        Si la recarga compartida se cancela (se canceló la tarea que la hacía)
+        y quien espera no fue cancelado, vuelve a intentarlo con una recarga propia.
+
+        Returns:
+            Catálogo {CODCATEGORIA: CATEGORIA}
+        """
+        while self._inflight is not None:
+            inflight = self._inflight
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled() or asyncio.current_task().cancelling():
+                    raise
+
+        self._inflight = asyncio.get_running_loop().create_future()
+        try:
+            categories = await self._loader()
+            self._categories = categories
+            self._loaded_at = time.monotonic()
+            self._stale = False
+            self.loads += 1
+            self._inflight.set_result(categories)
+            logger.info("Catálogo de categorías cargado", categories=sorted(categories))
+            return categories
+        except asyncio.CancelledError:
+            self._inflight.cancel()
+            raise
+        except Exception as e:
+            self._inflight.set_exception(e)
+            # Evitar "Future exception was never retrieved" si nadie más esperaba
+            self._inflight.exception()
+            raise
+        finally:
+            self._inflight = None
+
+    async def get(self, codcategoria: int) -> Optional[str]:
+        """
+        Busca una categoría en el catálogo.
+
+        Args:
+            codcategoria: Código de categoría
+
+        Returns:
+            Nombre de la categoría o None si no existe
+
+        Raises:
+            Exception: Si el catálogo no está cargado y la consulta falla
+        """
+        if self._is_expired():
+            try:
+                await self.refresh()
+            except Exception:
+                if not self.is_loaded:
+                    raise
+                logger.warning("No se pudo recargar el catálogo, usando versión anterior")
+
+        name = self._categories.get(codcategoria)
+        if name is not None:
+            self.hits += 1
+            return name
+
+        # Categoría desconocida: puede haberse creado recientemente
+        self.misses += 1
+        if (time.monotonic() - self._loaded_at) > self.miss_refresh_seconds:
+            await self.refresh()
+            return self._categories.get(codcategoria)
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna métricas del catálogo"""
+        return {
+            "loaded": self.is_loaded,
+            "size": len(self._categories) if self._categories else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "loads": self.loads,
+        }
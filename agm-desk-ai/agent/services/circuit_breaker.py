@@ -0,0 +1,178 @@
+"""Circuit breaker por dependencia externa (Gemini, backend)"""
+import time
+import structlog
+from typing import Optional, Dict, Any, Tuple, Type
+
+from agent.core.exceptions import CircuitOpenError
+
+logger = structlog.get_logger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Corta las llamadas a una dependencia que está fallando.
+
+    - closed: las llamadas pasan; `failure_threshold` fallos consecutivos
+      abren el circuito.
+    - open: las llamadas se rechazan de inmediato con CircuitOpenError
+      durante `recovery_seconds`.
+    - half_open: pasado ese tiempo se permite una sola llamada de prueba;
+      si tiene éxito el circuito se cierra, si falla se vuelve a abrir.
+
+    Uso:
+        async with breaker.guard() as call:
+            response = await llamada()
+            if response.status_code >= 500:
+                call.failure()
+
+    Las excepciones lanzadas dentro del bloque cuentan como fallo, salvo
+    las de `ignored_exceptions` (errores locales que no indican que la
+    dependencia esté caída).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        recovery_seconds: float,
+        ignored_exceptions: Tuple[Type[BaseException], ...] = (),
+        enabled: bool = True
+    ):
+        """
+        Inicializa el circuit breaker.
+
+        Args:
+            name: Nombre de la dependencia (para logs y métricas)
+            failure_threshold: Fallos consecutivos que abren el circuito
+            recovery_seconds: Tiempo que el circuito permanece abierto antes de la llamada de prueba
+            ignored_exceptions: Excepciones que no cuentan como fallo de la dependencia
+            enabled: Si es False, todas las llamadas pasan (solo se cuentan fallos)
+        """
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_seconds = max(0.0, recovery_seconds)
+        self.ignored_exceptions = ignored_exceptions
+        self.enabled = enabled
+
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.consecutive_failures = 0
+
+        self.times_opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.recovery_seconds:
+            return HALF_OPEN
+        return self._state
+
+    def retry_after(self) -> float:
+        """Segundos que faltan para la próxima llamada de prueba (0 si el circuito no está abierto)"""
+        if self._state != OPEN:
+            return 0.0
+        return max(0.0, self.recovery_seconds - (time.monotonic() - self._opened_at))
+
+    def guard(self) -> "_BreakerCall":
+        """Retorna un context manager asíncrono que protege una llamada"""
+        return _BreakerCall(self)
+
+    def _before_call(self) -> bool:
+        """
+        Verifica si la llamada puede hacerse.
+
+        Returns:
+            True si la llamada es la prueba del estado half_open
+
+        Raises:
+            CircuitOpenError: Si el circuito está abierto o ya hay una prueba en curso
+        """
+        if not self.enabled:
+            return False
+        state = self.state
+        if state == CLOSED:
+            return False
+        if state == HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            logger.info("Circuito en prueba (half-open)", dependency=self.name)
+            return True
+        self.rejected += 1
+        raise CircuitOpenError(dependency=self.name, retry_after=self.retry_after())
+
+    def _on_success(self, probe: bool):
+        if probe:
+            self._probe_in_flight = False
+        self.consecutive_failures = 0
+        if self._state != CLOSED:
+            self._state = CLOSED
+            logger.info("Circuito cerrado, dependencia recuperada", dependency=self.name)
+
+    def _on_failure(self, probe: bool, error: Optional[str]):
+        if probe:
+            self._probe_in_flight = False
+        self.consecutive_failures += 1
+        if not self.enabled:
+            return
+        if probe or (self._state == CLOSED and self.consecutive_failures >= self.failure_threshold):
+            self._state = OPEN
+            self._opened_at = time.monotonic()
+            self.times_opened += 1
+            logger.warning(
+                "Circuito abierto, llamadas suspendidas",
+                dependency=self.name,
+                consecutive_failures=self.consecutive_failures,
+                recovery_seconds=self.recovery_seconds,
+                error=error
+            )
+
+    def _on_abort(self, probe: bool):
+        # Llamada cancelada o con error local: no dice nada sobre la dependencia
+        if probe:
+            self._probe_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna el estado y las métricas del circuito"""
+        return {
+            "dependency": self.name,
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+            "retry_after_seconds": round(self.retry_after(), 2),
+        }
+
+
+class _BreakerCall:
+    """Llamada protegida por el circuito; registra el resultado al salir"""
+
+    __slots__ = ("_breaker", "_probe", "_failed")
+
+    def __init__(self, breaker: CircuitBreaker):
+        self._breaker = breaker
+        self._probe = False
+        self._failed = False
+
+    def failure(self):
+        """Marca la llamada como fallida aunque no haya lanzado excepción (ej: respuesta 5xx)"""
+        self._failed = True
+
+    async def __aenter__(self) -> "_BreakerCall":
+        self._probe = self._breaker._before_call()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        breaker = self._breaker
+        if exc_type is not None and not issubclass(exc_type, Exception):
+            breaker._on_abort(self._probe)
+        elif exc_type is not None and issubclass(exc_type, breaker.ignored_exceptions):
+            breaker._on_abort(self._probe)
+        elif exc_type is not None or self._failed:
+            breaker._on_failure(self._probe, str(exc) if exc is not None else None)
+        else:
+            breaker._on_success(self._probe)
+        return False
@@ -0,0 +1,71 @@
+"""Presupuesto de tiempo (deadline) de un ticket, compartido por todas sus etapas"""
+import time
+from typing import Optional
+
+import httpx
+
+from agent.core.exceptions import DeadlineExceededError
+
+DEADLINE_HEADER = "X-Request-Deadline"
+
+
+class Deadline:
+    """
+    Momento límite para terminar de procesar un ticket.
+
+    Se crea al recibir el ticket y se pasa a cada etapa (clasificación,
+    acciones, reintentos). Cada llamada externa usa como timeout el menor
+    entre su timeout propio y el tiempo restante, de modo que ninguna etapa
+    espera más de lo que le queda al ticket.
+    """
+
+    __slots__ = ("budget_seconds", "started_at", "expires_at")
+
+    def __init__(self, budget_seconds: float):
+        """
+        Args:
+            budget_seconds: Tiempo total disponible para el ticket
+        """
+        self.budget_seconds = budget_seconds
+        self.started_at = time.monotonic()
+        self.expires_at = self.started_at + budget_seconds
+
+    def remaining(self) -> float:
+        """Segundos restantes (0 si ya venció)"""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def elapsed(self) -> float:
+        """Segundos transcurridos desde la creación"""
+        return time.monotonic() - self.started_at
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def check(self, stage: str):
+        """
+        Verifica que quede tiempo antes de iniciar una etapa.
+
+        Raises:
+            DeadlineExceededError: Si el deadline ya venció
+        """
+        if self.expired:
+            raise DeadlineExceededError(stage=stage, budget_seconds=self.budget_seconds)
+
+    def timeout(self, cap: Optional[float]) -> float:
+        """Timeout de una llamada: el menor entre `cap` y el tiempo restante"""
+        remaining = self.remaining()
+        return remaining if cap is None else min(cap, remaining)
+
+    def http_timeout(self, base: httpx.Timeout) -> httpx.Timeout:
+        """Acota cada fase de un httpx.Timeout al tiempo restante"""
+        return httpx.Timeout(
+            connect=self.timeout(base.connect),
+            read=self.timeout(base.read),
+            write=self.timeout(base.write),
+            pool=self.timeout(base.pool),
+        )
+
+    def header_value(self) -> str:
+        """Milisegundos restantes, para el header X-Request-Deadline"""
+        return str(int(self.remaining() * 1000))
@@ -0,0 +1,382 @@
+"""Detección de solicitudes casi duplicadas y ráfagas mediante huellas SimHash"""
+import re
+import struct
+import time
+from collections import Counter, OrderedDict, deque
+from itertools import islice
+from typing import Optional, Dict, List, Deque, Tuple, Any
+
+FINGERPRINT_BITS = 64
+BAND_BITS = 16
+BANDS = FINGERPRINT_BITS // BAND_BITS
+LANE_BITS = 16
+LANE_MASK = (1 << LANE_BITS) - 1
+HASH_MASK = (1 << FINGERPRINT_BITS) - 1
+# Máximo de candidatos revisados por banda, los de actividad más reciente
+# (mantiene la búsqueda en tiempo constante)
+MAX_CANDIDATES_PER_BAND = 32
+
+TOKEN_RE = re.compile(r"\w+")
+
+
+def _build_lane_tables() -> List[List[int]]:
+    """
+    Precalcula, para cada byte de la huella, la expansión de sus 8 bits a
+    carriles de 16 bits. Sumar expansiones equivale a contar, bit por bit,
+    cuántas características tienen ese bit encendido.
+    """
+    tables = []
+    for byte_index in range(FINGERPRINT_BITS // 8):
+        table = []
+        for value in range(256):
+            expanded = 0
+            for bit in range(8):
+                if value >> bit & 1:
+                    expanded |= 1 << ((byte_index * 8 + bit) * LANE_BITS)
+            table.append(expanded)
+        tables.append(table)
+    return tables
+
+
+_LANE_TABLES = _build_lane_tables()
+
+
+def simhash(text: str) -> int:
+    """
+    Calcula la huella SimHash de 64 bits de un texto.
+
+    Las características son palabras y pares de palabras consecutivas (en
+    minúsculas), así que textos que solo difieren en unas pocas palabras
+    producen huellas a poca distancia de Hamming.
+
+    Args:
+        text: Texto a procesar
+
+    Returns:
+        Huella de 64 bits (0 si el texto no tiene palabras)
+    """
+    words = TOKEN_RE.findall(text.lower())
+    if not words:
+        return 0
+    features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    # Los carriles de 16 bits soportan hasta 65535 características
+    features = features[:LANE_MASK]
+
+    # hash() de str (SipHash, cacheado por el intérprete) basta porque las
+    # huellas solo viven en la memoria de este proceso. Se cuentan los valores
+    # de cada byte de los hashes con Counter (en C) y solo al final se expanden
+    # a carriles: a lo sumo 8 x 256 sumas, sin importar la longitud del texto
+    digests = struct.pack(f"<{len(features)}Q", *(hash(feature) & HASH_MASK for feature in features))
+    counts = 0
+    for byte_index, table in enumerate(_LANE_TABLES):
+        for value, occurrences in Counter(digests[byte_index::8]).items():
+            counts += table[value] * occurrences
+
+    half = len(features) / 2
+    fingerprint = 0
+    for bit in range(FINGERPRINT_BITS):
+        if (counts >> (bit * LANE_BITS) & LANE_MASK) > half:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class _Cluster:
+    """Grupo de solicitudes con huellas casi idénticas"""
+
+    __slots__ = ("fingerprint", "first_codpeticiones", "hits")
+
+    def __init__(self, fingerprint: int, first_codpeticiones: Optional[int], flood_threshold: int):
+        self.fingerprint = fingerprint
+        self.first_codpeticiones = first_codpeticiones
+        # Solo interesa saber si se alcanzó el umbral: basta con las últimas N
+        self.hits: Deque[Tuple[float, Optional[int]]] = deque(maxlen=flood_threshold)
+
+
+class DuplicateDetector:
+    """
+    Índice acotado en memoria de huellas SimHash de descripciones recientes.
+
+    Detecta dos situaciones antes de cualquier trabajo de BD o IA:
+    - Duplicado del mismo usuario: la descripción está a distancia de Hamming
+      <= umbral de una de sus últimas solicitudes de la misma categoría
+      dentro de la ventana.
+    - Ráfaga global: el mismo texto (o casi) llegó desde cualquier usuario
+      `flood_threshold` veces o más dentro de la ventana.
+
+    Global: las huellas se dividen en 4 bandas de 16 bits. Dos huellas a
+    distancia <= 3 coinciden en al menos una banda, así que basta revisar
+    los buckets de las 4 bandas. Las huellas cercanas se agrupan en un mismo
+    cluster, por lo que una ráfaga de textos idénticos ocupa una sola entrada
+    y los buckets no crecen con ella.
+
+    Por usuario y categoría: anillo acotado con las últimas `user_history` huellas.
+
+    Solo se registran las solicitudes aceptadas (check_and_record al final
+    de la validación); forget() retira las que terminan con error.
+    """
+
+    def __init__(
+        self,
+        window_seconds: float,
+        hamming_threshold: int = 3,
+        flood_threshold: int = 20,
+        max_size: int = 50000,
+        user_history: int = 5,
+        max_users: int = 10000
+    ):
+        """
+        Inicializa el detector.
+
+        Args:
+            window_seconds: Ventana de tiempo en la que se buscan duplicados
+            hamming_threshold: Distancia de Hamming máxima para considerar dos textos casi iguales (0-3)
+            flood_threshold: Solicitudes casi iguales (de cualquier usuario) que constituyen una ráfaga
+            max_size: Número máximo de clusters en el índice global
+            user_history: Número de huellas recientes conservadas por usuario y categoría
+            max_users: Número máximo de pares (usuario, categoría) rastreados
+        """
+        self.window_seconds = window_seconds
+        # Por encima de BANDS - 1 la búsqueda por bandas deja de ser exacta
+        self.hamming_threshold = max(0, min(hamming_threshold, BANDS - 1))
+        self.flood_threshold = max(2, flood_threshold)
+        self.max_size = max(1, max_size)
+        self.user_history = max(1, user_history)
+        self.max_users = max(1, max_users)
+
+        self._clusters: "OrderedDict[int, _Cluster]" = OrderedDict()
+        # Banda → clusters en orden de actividad (el más reciente al final)
+        self._buckets: "Dict[Tuple[int, int], OrderedDict[int, None]]" = {}
+        self._next_cluster_id = 0
+        self._users: "OrderedDict[Tuple[str, Optional[int]], Deque[Tuple[float, int, Optional[int]]]]" = OrderedDict()
+        # codpeticiones registrado → (anillo de usuario y categoría, cluster), para forget()
+        self._recorded: "OrderedDict[int, Tuple[Optional[Tuple[str, Optional[int]]], int]]" = OrderedDict()
+
+        self.user_duplicates = 0
+        self.floods = 0
+
+    @staticmethod
+    def _bands(fingerprint: int) -> List[Tuple[int, int]]:
+        return [
+            (band, (fingerprint >> (band * BAND_BITS)) & ((1 << BAND_BITS) - 1))
+            for band in range(BANDS)
+        ]
+
+    def _remove_cluster(self, cluster_id: int):
+        cluster = self._clusters.pop(cluster_id)
+        for key in self._bands(cluster.fingerprint):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.pop(cluster_id, None)
+                if not bucket:
+                    del self._buckets[key]
+
+    def _evict(self, now: float):
+        """Elimina clusters sin actividad dentro de la ventana o por exceso de tamaño"""
+        window_start = now - self.window_seconds
+        while self._clusters:
+            cluster_id, cluster = next(iter(self._clusters.items()))
+            if len(self._clusters) <= self.max_size and cluster.hits[-1][0] >= window_start:
+                break
+            self._remove_cluster(cluster_id)
+
+    def _find_cluster(self, fingerprint: int) -> Optional[int]:
+        best_id, best_distance = None, None
+        for key in self._bands(fingerprint):
+            bucket = self._buckets.get(key)
+            if not bucket:
+                continue
+            for cluster_id in islice(reversed(bucket), MAX_CANDIDATES_PER_BAND):
+                distance = hamming_distance(fingerprint, self._clusters[cluster_id].fingerprint)
+                if distance <= self.hamming_threshold and (best_distance is None or distance < best_distance):
+                    best_id, best_distance = cluster_id, distance
+                    if distance == 0:
+                        return best_id
+        return best_id
+
+    def _user_ring(self, key: Tuple[str, Optional[int]]) -> Deque[Tuple[float, int, Optional[int]]]:
+        ring = self._users.get(key)
+        if ring is None:
+            ring = deque(maxlen=self.user_history)
+            self._users[key] = ring
+            if len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+        else:
+            self._users.move_to_end(key)
+        return ring
+
+    def check(
+        self,
+        user: Optional[str],
+        description: str,
+        codcategoria: Optional[int] = None,
+        codpeticiones: Optional[int] = None,
+        timestamp: Optional[float] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Verifica si la descripción es un duplicado, sin registrarla.
+
+        Volver a verificar una solicitud ya registrada (mismo codpeticiones,
+        por ejemplo al retomarla) no la marca como duplicado de sí misma.
+
+        Args:
+            user: Usuario que solicita
+            description: Descripción sanitizada
+            codcategoria: Categoría de la solicitud (los duplicados del usuario se buscan por categoría)
+            codpeticiones: ID de la solicitud
+            timestamp: Fecha de la solicitud (segundos epoch, por defecto ahora)
+
+        Returns:
+            None si no es duplicado. Si lo es, dict con "kind" ("user_duplicate"
+            o "flood") y los datos de la coincidencia.
+        """
+        now = time.time() if timestamp is None else timestamp
+        return self._check(simhash(description), user, codcategoria, codpeticiones, now)
+
+    def _check(
+        self,
+        fingerprint: int,
+        user: Optional[str],
+        codcategoria: Optional[int],
+        codpeticiones: Optional[int],
+        now: float
+    ) -> Optional[Dict[str, Any]]:
+        window_start = now - self.window_seconds
+
+        # Duplicado del mismo usuario en la misma categoría
+        ring = self._users.get((user, codcategoria)) if user else None
+        for ts, previous, previous_cod in reversed(ring or ()):
+            if ts < window_start or (codpeticiones is not None and previous_cod == codpeticiones):
+                continue
+            distance = hamming_distance(fingerprint, previous)
+            if distance <= self.hamming_threshold:
+                self.user_duplicates += 1
+                return {
+                    "kind": "user_duplicate",
+                    "original_codpeticiones": previous_cod,
+                    "distance": distance,
+                }
+
+        # Ráfaga global: esta solicitud más las ya registradas del mismo cluster
+        self._evict(now)
+        cluster_id = self._find_cluster(fingerprint)
+        if cluster_id is None:
+            return None
+        cluster = self._clusters[cluster_id]
+        recent = 1 + sum(
+            1 for ts, cod in cluster.hits
+            if ts >= window_start and (codpeticiones is None or cod != codpeticiones)
+        )
+        if recent >= self.flood_threshold:
+            self.floods += 1
+            return {
+                "kind": "flood",
+                "original_codpeticiones": cluster.first_codpeticiones,
+                "count": recent,
+            }
+        return None
+
+    def check_and_record(
+        self,
+        user: Optional[str],
+        description: str,
+        codcategoria: Optional[int] = None,
+        codpeticiones: Optional[int] = None,
+        timestamp: Optional[float] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Verifica la descripción y, si no es duplicado, la registra en el índice.
+
+        Se llama solo con solicitudes que pasaron las demás validaciones: una
+        solicitud rechazada no bloquea su reenvío corregido. La verificación
+        y el registro no ceden el control, así que de dos envíos simultáneos
+        solo pasa uno. Volver a registrar la misma solicitud (mismo
+        codpeticiones) no la cuenta dos veces.
+
+        Args:
+            user: Usuario que solicita
+            description: Descripción sanitizada
+            codcategoria: Categoría de la solicitud
+            codpeticiones: ID de la solicitud
+            timestamp: Fecha de la solicitud (segundos epoch, por defecto ahora)
+
+        Returns:
+            Igual que check(); la solicitud solo se registra si retorna None
+        """
+        now = time.time() if timestamp is None else timestamp
+        fingerprint = simhash(description)
+        result = self._check(fingerprint, user, codcategoria, codpeticiones, now)
+        if result is not None:
+            return result
+
+        user_key = (user, codcategoria) if user else None
+        if user_key:
+            ring = self._user_ring(user_key)
+            if codpeticiones is None or all(cod != codpeticiones for _, _, cod in ring):
+                ring.append((now, fingerprint, codpeticiones))
+
+        cluster_id = self._find_cluster(fingerprint)
+        if cluster_id is None:
+            cluster_id = self._next_cluster_id
+            self._next_cluster_id += 1
+            cluster = _Cluster(fingerprint, codpeticiones, self.flood_threshold)
+            self._clusters[cluster_id] = cluster
+            for key in self._bands(fingerprint):
+                self._buckets.setdefault(key, OrderedDict())[cluster_id] = None
+        else:
+            cluster = self._clusters[cluster_id]
+            self._clusters.move_to_end(cluster_id)
+            for key in self._bands(cluster.fingerprint):
+                self._buckets[key].move_to_end(cluster_id)
+        if codpeticiones is None or all(cod != codpeticiones for _, cod in cluster.hits):
+            cluster.hits.append((now, codpeticiones))
+
+        if codpeticiones is not None:
+            self._recorded[codpeticiones] = (user_key, cluster_id)
+            self._recorded.move_to_end(codpeticiones)
+            if len(self._recorded) > self.max_size:
+                self._recorded.popitem(last=False)
+        return None
+
+    def forget(self, codpeticiones: Optional[int]) -> bool:
+        """
+        Retira del índice una solicitud registrada (por ejemplo, si terminó
+        con error), para que el usuario pueda volver a enviarla.
+
+        Returns:
+            bool: True si la solicitud estaba registrada
+        """
+        entry = self._recorded.pop(codpeticiones, None) if codpeticiones is not None else None
+        if entry is None:
+            return False
+        user_key, cluster_id = entry
+
+        ring = self._users.get(user_key) if user_key else None
+        if ring:
+            kept = [item for item in ring if item[2] != codpeticiones]
+            ring.clear()
+            ring.extend(kept)
+
+        cluster = self._clusters.get(cluster_id)
+        if cluster is not None:
+            kept_hits = [hit for hit in cluster.hits if hit[1] != codpeticiones]
+            if kept_hits:
+                cluster.hits.clear()
+                cluster.hits.extend(kept_hits)
+                if cluster.first_codpeticiones == codpeticiones:
+                    cluster.first_codpeticiones = kept_hits[0][1]
+            else:
+                self._remove_cluster(cluster_id)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna métricas del detector"""
+        return {
+            "clusters": len(self._clusters),
+            "tracked_users": len(self._users),
+            "user_duplicates": self.user_duplicates,
+            "floods": self.floods,
+        }
@@ -0,0 +1,124 @@
+"""Cliente HTTP del backend con pool configurable y métricas de espera por conexión"""
+import time
+import structlog
+from typing import Dict, Any, Optional
+import httpx
+
+from agent.core.config import Settings
+
+logger = structlog.get_logger(__name__)
+
+
+class PoolMetrics:
+    """
+    Mide cuánto espera cada solicitud por una conexión del pool.
+
+    Usa la extensión "trace" de httpx: el primer evento de una solicitud
+    (conexión TCP nueva o envío de headers por una conexión reutilizada) se
+    emite apenas el pool entrega una conexión, de modo que el tiempo desde
+    el envío hasta ese evento es la espera en el pool. Así se distingue un
+    pool agotado (espera alta) de un backend lento (espera baja, respuesta
+    lenta).
+    """
+
+    def __init__(self, slow_wait_ms: float):
+        """
+        Args:
+            slow_wait_ms: Espera en el pool a partir de la cual se registra una advertencia
+        """
+        self.slow_wait_seconds = max(0.0, slow_wait_ms) / 1000
+        self.requests = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.slow_waits = 0
+        self.connections_opened = 0
+        self.total_connect = 0.0
+        self.pool_timeouts = 0
+
+    async def on_request(self, request: httpx.Request):
+        """Hook de request de httpx: instala el trace de la solicitud"""
+        started_at = time.perf_counter()
+        state = {"checked_out": False, "connect_started": 0.0}
+
+        async def trace(event_name: str, info: Dict[str, Any]):
+            now = time.perf_counter()
+            if not state["checked_out"]:
+                state["checked_out"] = True
+                self._record_wait(request, now - started_at)
+            if event_name == "connection.connect_tcp.started":
+                state["connect_started"] = now
+            elif event_name == "connection.connect_tcp.complete":
+                self.connections_opened += 1
+                self.total_connect += now - state["connect_started"]
+
+        request.extensions["trace"] = trace
+
+    def _record_wait(self, request: httpx.Request, wait: float):
+        self.requests += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        if self.slow_wait_seconds and wait >= self.slow_wait_seconds:
+            self.slow_waits += 1
+            logger.warning(
+                "Espera prolongada por una conexión del pool",
+                url=str(request.url.copy_with(query=None)),
+                pool_wait_ms=round(wait * 1000, 1)
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna métricas acumuladas del pool"""
+        return {
+            "pool_requests": self.requests,
+            "pool_wait_avg_ms": round(self.total_wait / self.requests * 1000, 2) if self.requests else 0,
+            "pool_wait_max_ms": round(self.max_wait * 1000, 2),
+            "pool_slow_waits": self.slow_waits,
+            "pool_timeouts": self.pool_timeouts,
+            "connections_opened": self.connections_opened,
+            "connect_avg_ms": round(self.total_connect / self.connections_opened * 1000, 2) if self.connections_opened else 0,
+        }
+
+
+def build_backend_timeout(settings: Settings) -> httpx.Timeout:
+    """Timeouts por fase de las solicitudes al backend"""
+    return httpx.Timeout(
+        connect=settings.BACKEND_CONNECT_TIMEOUT_SECONDS,
+        read=settings.BACKEND_READ_TIMEOUT_SECONDS,
+        write=settings.BACKEND_WRITE_TIMEOUT_SECONDS,
+        pool=settings.BACKEND_POOL_TIMEOUT_SECONDS,
+    )
+
+
+def build_backend_client(settings: Settings, metrics: Optional[PoolMetrics] = None) -> httpx.AsyncClient:
+    """
+    Construye el cliente HTTP del backend según la configuración del pool.
+
+    HTTP/2 requiere el paquete opcional `h2` (pip install "httpx[http2]");
+    si no está instalado se usa HTTP/1.1 y se registra una advertencia.
+
+    Args:
+        settings: Configuración del agente
+        metrics: Métricas de espera del pool (opcional)
+
+    Returns:
+        Cliente HTTP asíncrono
+    """
+    limits = httpx.Limits(
+        max_connections=settings.BACKEND_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.BACKEND_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.BACKEND_HTTP_KEEPALIVE_EXPIRY_SECONDS,
+    )
+    http2 = settings.BACKEND_HTTP2_ENABLED
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("HTTP/2 habilitado pero el paquete 'h2' no está instalado; se usará HTTP/1.1")
+            http2 = False
+
+    event_hooks = {"request": [metrics.on_request]} if metrics is not None else None
+    return httpx.AsyncClient(
+        timeout=build_backend_timeout(settings),
+        limits=limits,
+        http2=http2,
+        event_hooks=event_hooks,
+    )
@@ -0,0 +1,67 @@
+"""Escáner de múltiples patrones compilado una sola vez para los filtros de seguridad"""
+from typing import Dict, List, Iterable, Tuple
+
+
+class MultiPatternScanner:
+    """
+    Detecta en una sola pasada todos los patrones (por categoría) presentes en un texto.
+
+    Los patrones se normalizan (minúsculas, sin espacios extremos) y se
+    deduplican entre categorías al construir el escáner. Además se calcula,
+    para cada patrón, qué otros patrones son subcadenas suyas: si
+    "ejecuta" no aparece en el texto, tampoco pueden aparecer "ejecutar" ni
+    "por favor ejecuta", así que no se buscan.
+
+    Cada búsqueda individual usa `in` (búsqueda de subcadenas en C), que en
+    CPython es más rápida que una expresión regular con alternación o un
+    autómata Aho-Corasick escrito en Python para la cantidad de patrones
+    que manejan los filtros.
+    """
+
+    def __init__(self, patterns_by_category: Dict[str, Iterable[str]]):
+        """
+        Construye el escáner.
+
+        Args:
+            patterns_by_category: {categoría: patrones en orden de reporte}
+        """
+        self._categories: List[Tuple[str, List[Tuple[str, str]]]] = []
+        unique = set()
+        for category, patterns in patterns_by_category.items():
+            entries = []
+            for pattern in patterns:
+                normalized = pattern.strip().lower()
+                if normalized:
+                    entries.append((pattern.strip(), normalized))
+                    unique.add(normalized)
+            self._categories.append((category, entries))
+
+        # Patrones cortos primero: sus resultados podan la búsqueda de los largos
+        self._patterns = sorted(unique, key=lambda p: (len(p), p))
+        self._required = {
+            pattern: tuple(other for other in self._patterns if other != pattern and other in pattern)
+            for pattern in self._patterns
+        }
+
+    def scan(self, text_lower: str) -> Dict[str, List[str]]:
+        """
+        Busca todos los patrones en el texto.
+
+        Args:
+            text_lower: Texto ya convertido a minúsculas
+
+        Returns:
+            {categoría: patrones encontrados (tal como fueron configurados)}
+        """
+        found = set()
+        for pattern in self._patterns:
+            required = self._required[pattern]
+            if required and not all(sub in found for sub in required):
+                continue
+            if pattern in text_lower:
+                found.add(pattern)
+
+        return {
+            category: [original for original, normalized in entries if normalized in found]
+            for category, entries in self._categories
+        }
@@ -0,0 +1,164 @@
+"""Rate limiter en memoria con ventana deslizante por usuario"""
+import time
+import structlog
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from typing import Optional, Dict, Deque, Tuple, Iterable, Any
+
+logger = structlog.get_logger(__name__)
+
+
+def to_epoch(value: Any) -> Optional[float]:
+    """
+    Convierte un timestamp (datetime o string ISO8601) a segundos epoch UTC.
+
+    Args:
+        value: datetime (naive se asume UTC) o string ISO8601
+
+    Returns:
+        Segundos epoch o None si no se puede interpretar
+    """
+    if value is None:
+        return None
+    try:
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        if isinstance(value, datetime):
+            if value.tzinfo is None:
+                value = value.replace(tzinfo=timezone.utc)
+            return value.timestamp()
+    except (ValueError, TypeError):
+        return None
+    return None
+
+
+class SlidingWindowRateLimiter:
+    """
+    Contador de solicitudes por usuario con ventana deslizante.
+
+    Cada usuario tiene un anillo acotado (deque con maxlen) de pares
+    (timestamp, codpeticiones). Como solo interesa saber si se alcanzó el
+    límite, basta con conservar las últimas `limit` entradas. Los usuarios
+    sin actividad dentro de la ventana se eliminan en `evict_idle()` y el
+    número total de usuarios rastreados está acotado (LRU).
+    """
+
+    def __init__(self, limit: int, window_seconds: float, max_users: int = 10000):
+        """
+        Inicializa el rate limiter.
+
+        Args:
+            limit: Número máximo de solicitudes por usuario en la ventana
+            window_seconds: Duración de la ventana en segundos
+            max_users: Número máximo de usuarios rastreados en memoria
+        """
+        self.limit = max(1, limit)
+        self.window_seconds = window_seconds
+        self.max_users = max(1, max_users)
+        self._rings: "OrderedDict[str, Deque[Tuple[float, Optional[int]]]]" = OrderedDict()
+        self.warmed = False
+        self.last_reconcile: Optional[float] = None
+
+    def _ring(self, user: str) -> Deque[Tuple[float, Optional[int]]]:
+        ring = self._rings.get(user)
+        if ring is None:
+            ring = deque(maxlen=self.limit)
+            self._rings[user] = ring
+            if len(self._rings) > self.max_users:
+                self._rings.popitem(last=False)
+        else:
+            self._rings.move_to_end(user)
+        return ring
+
+    def record(self, user: str, timestamp: float, codpeticiones: Optional[int] = None) -> bool:
+        """
+        Registra una solicitud del usuario.
+
+        Args:
+            user: Usuario que solicita
+            timestamp: Fecha de la solicitud (segundos epoch)
+            codpeticiones: ID de la solicitud (para evitar contar dos veces el mismo evento)
+
+        Returns:
+            True si se registró, False si ya estaba registrada
+        """
+        ring = self._ring(user)
+        if codpeticiones is not None and any(entry[1] == codpeticiones for entry in ring):
+            return False
+
+        # Mantener el anillo ordenado por timestamp (los eventos pueden llegar desordenados)
+        if ring and ring[-1][0] > timestamp:
+            entries = sorted([*ring, (timestamp, codpeticiones)])
+            ring.clear()
+            ring.extend(entries[-self.limit:])
+        else:
+            ring.append((timestamp, codpeticiones))
+        return True
+
+    def count(self, user: str, now: Optional[float] = None) -> Tuple[int, Optional[float]]:
+        """
+        Cuenta las solicitudes del usuario dentro de la ventana.
+
+        Args:
+            user: Usuario que solicita
+            now: Instante de referencia (segundos epoch, por defecto ahora)
+
+        Returns:
+            Tupla (current_count, oldest_timestamp_in_window)
+        """
+        ring = self._rings.get(user)
+        if not ring:
+            return 0, None
+        now = time.time() if now is None else now
+        window_start = now - self.window_seconds
+        in_window = [entry[0] for entry in ring if entry[0] >= window_start]
+        return len(in_window), (in_window[0] if in_window else None)
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """
+        Elimina usuarios cuya solicitud más reciente quedó fuera de la ventana.
+
+        Returns:
+            Número de usuarios eliminados
+        """
+        now = time.time() if now is None else now
+        window_start = now - self.window_seconds
+        idle = [user for user, ring in self._rings.items() if not ring or ring[-1][0] < window_start]
+        for user in idle:
+            del self._rings[user]
+        return len(idle)
+
+    def load(self, rows: Iterable[Tuple[str, float, Optional[int]]], since: Optional[float] = None):
+        """
+        Reemplaza el estado con una instantánea de la base de datos.
+
+        Las entradas registradas en memoria con timestamp >= `since` (llegadas
+        mientras se ejecutaba la consulta) se conservan.
+
+        Args:
+            rows: Tuplas (usuario, timestamp, codpeticiones)
+            since: Instante en que se inició la consulta de la instantánea
+        """
+        recent = []
+        if since is not None:
+            for user, ring in self._rings.items():
+                recent.extend((user, ts, cod) for ts, cod in ring if ts >= since)
+
+        self._rings = OrderedDict()
+        for user, ts, cod in sorted(rows, key=lambda row: row[1]):
+            self.record(user, ts, cod)
+        for user, ts, cod in recent:
+            self.record(user, ts, cod)
+
+        self.warmed = True
+        self.last_reconcile = time.time()
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna métricas del rate limiter"""
+        return {
+            "tracked_users": len(self._rings),
+            "limit": self.limit,
+            "window_seconds": self.window_seconds,
+            "warmed": self.warmed,
+            "last_reconcile": self.last_reconcile,
+        }
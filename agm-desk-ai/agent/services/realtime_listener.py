@@ -1,7 +1,8 @@
 """Listener de Realtime para procesar nuevas solicitudes automáticamente"""
 import asyncio
+import time
 import structlog
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Optional, Dict, List, Any
 from supabase import create_async_client, AsyncClient
 from realtime import AsyncRealtimeChannel
@@ -12,14 +13,56 @@ from agent.core.exceptions import (
     RateLimitExceededError,
     AIClassificationError,
     ActionExecutionError,
-    SupabaseConnectionError
+    SupabaseConnectionError,
+    CircuitOpenError,
+    DeadlineExceededError
 )
-from agent.services.action_executor import ActionExecutor
+from agent.services.action_executor import ActionExecutor, build_idempotency_key
+from agent.services.action_plan import ActionNode, build_action_plan, run_action_plan
 from agent.services.ai_processor import AIProcessor, ClassificationResult
+from agent.services.deadline import Deadline
 from agent.services.request_validator import RequestValidator
+from agent.services.retry_scheduler import RetryScheduler, RetryEntry, classify_error
 
 logger = structlog.get_logger(__name__)
 
+# Etapas del pipeline registradas en AI_CLASSIFICATION_DATA["checkpoint"];
+# permiten retomar un ticket interrumpido desde la última etapa completada
+STEP_VALIDATED = "validated"
+STEP_CLASSIFIED = "classified"
+STEP_EXECUTING = "executing"
+STEP_COMPLETED = "completed"
+
+# processing_status que el agente asigna antes de ejecutar acciones. Un
+# ticket en TRAMITE sin checkpoint (anterior a los checkpoints) solo se
+# reprocesa desde el inicio si tiene uno de estos estados: no hay acciones
+# que repetir. El resto de los tickets en TRAMITE sin checkpoint los movió
+# una persona (PATCH /api/requests/{id}) o no es seguro repetirlos, y el
+# barrido inicial no los toca.
+AGENT_PRE_ACTION_STATUSES = frozenset({
+    "validated",
+    "classifying",
+    "validating",
+})
+
+# Campos de AI_CLASSIFICATION_DATA con los que se reconstruye la clasificación al retomar
+CLASSIFICATION_FIELDS = (
+    "app_type",
+    "confidence",
+    "detected_actions",
+    "reasoning",
+    "extracted_params",
+    "requires_secondary_app",
+    "secondary_app_actions",
+    "raw_classification",
+    "classification_timestamp"
+)
+
+USER_NOT_FOUND_MESSAGE = (
+    "No se encontró el usuario especificado en el sistema. "
+    "Por favor, verifique el nombre de usuario o contacte al soporte para aclaración."
+)
+
 
 def create_empty_ai_classification_data() -> Dict[str, Any]:
     """Crea estructura vacía de AI_CLASSIFICATION_DATA"""
@@ -48,7 +91,8 @@ def create_empty_ai_classification_data() -> Dict[str, Any]:
         "ignore_reason": None,
         "requires_human_review": None,
         "auto_processing_skipped": None,
-        "ignored_at": None
+        "ignored_at": None,
+        "checkpoint": None
     }
 
 
@@ -64,6 +108,46 @@ def update_ai_classification_data(
     return result
 
 
+def _parse_utc(value: Any) -> Optional[datetime]:
+    """Convierte un timestamp ISO 8601 (con o sin zona) a datetime UTC sin zona"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _last_agent_activity(row: Dict[str, Any]) -> Optional[datetime]:
+    """Última escritura del agente en el ticket (checkpoint, progreso o, en su defecto, FESOLICITA)"""
+    ai_data = row.get("AI_CLASSIFICATION_DATA") or {}
+    candidates = [
+        _parse_utc((ai_data.get("checkpoint") or {}).get("updated_at")),
+        _parse_utc(ai_data.get("last_update")),
+    ]
+    candidates = [candidate for candidate in candidates if candidate is not None]
+    return max(candidates) if candidates else _parse_utc(row.get("FESOLICITA"))
+
+
+def build_checkpoint(step: str, previous: Optional[Dict[str, Any]] = None, **fields) -> Dict[str, Any]:
+    """
+    Construye el checkpoint de una etapa del pipeline.
+    
+    Args:
+        step: Etapa completada (STEP_*)
+        previous: Checkpoint anterior (se conservan sus campos)
+        **fields: Campos a actualizar (codcategoria, execution_params, completed_actions)
+    """
+    checkpoint = dict(previous or {})
+    checkpoint.update(fields)
+    checkpoint["step"] = step
+    checkpoint["updated_at"] = datetime.utcnow().isoformat()
+    return checkpoint
+
+
 class RealtimeListener:
     """Listener de Realtime para procesar nuevas solicitudes automáticamente"""
     
@@ -88,6 +172,13 @@ class RealtimeListener:
         self.ai_processor = ai_processor
         self.request_validator = request_validator
         
+        # Reintentos persistentes de tickets que fallaron por errores transitorios
+        self.retry_scheduler = RetryScheduler(settings, self._run_scheduled_retry)
+        
+        # Barrido de tickets interrumpidos (TRAMITE) al iniciar
+        self._resume_task: Optional[asyncio.Task] = None
+        self.recovery_stats: Dict[str, Any] = {}
+        
         # Crear cliente asíncrono de Supabase (requerido para Realtime)
         self.supabase: Optional[AsyncClient] = None
         self._supabase_url = settings.SUPABASE_URL
@@ -178,7 +269,19 @@ class RealtimeListener:
                 filter="CODESTADO=eq.1",  # Solo solicitudes PENDIENTES
                 callback=sync_callback
             )
-            
+
+            # Invalidar catálogo de categorías ante cualquier cambio en HLP_CATEGORIAS
+            def categories_callback(payload: Dict[str, Any]):
+                """Invalida el catálogo en memoria del validador"""
+                self.request_validator.invalidate_categories()
+
+            channel.on_postgres_changes(
+                event="*",
+                schema="public",
+                table="HLP_CATEGORIAS",
+                callback=categories_callback
+            )
+
             # Suscribir canal
             await channel.subscribe()
             
@@ -400,6 +503,9 @@ class RealtimeListener:
                 )
                 return
             
+            # Registrar la solicitud en el rate limiter en memoria
+            self.request_validator.register_request(request_data)
+            
             # Procesar solicitud
             await self.process_new_request(request_data)
             
@@ -413,6 +519,22 @@ class RealtimeListener:
             # NO lanzar excepción para no detener el listener
             await self._handle_processing_error(request_data, e)
     
+    async def start(self):
+        """
+        Inicia el programador de reintentos (retoma los reintentos pendientes
+        del journal) y, en segundo plano, el barrido de tickets interrumpidos.
+        """
+        await self.retry_scheduler.start()
+        if self.settings.ENABLE_CHECKPOINT_RESUME:
+            self._resume_task = asyncio.create_task(self.resume_interrupted_requests())
+    
+    async def close(self):
+        """Detiene los reintentos en curso; los pendientes quedan en el journal"""
+        if self._resume_task is not None:
+            self._resume_task.cancel()
+        await self.retry_scheduler.close()
+        logger.info("RealtimeListener cerrado", retry_scheduler=self.retry_scheduler.stats())
+    
     def _validate_request_payload(self, request_data: Dict[str, Any]) -> bool:
         """Valida que el payload tenga campos requeridos"""
         required_fields = ["CODPETICIONES", "CODCATEGORIA", "DESCRIPTION", "USUSOLICITA", "CODESTADO"]
@@ -420,37 +542,290 @@ class RealtimeListener:
     
     async def _handle_processing_error(self, request_data: Dict[str, Any], error: Exception):
         """Maneja errores durante el procesamiento"""
+        await self._fail_or_schedule_retry(
+            request_data,
+            error,
+            "Ocurrió un error inesperado al procesar tu solicitud. Nuestro equipo ha sido notificado."
+        )
+    
+    async def _fail_or_schedule_retry(
+        self,
+        request_data: Dict[str, Any],
+        error: Exception,
+        user_message: str
+    ):
+        """
+        Programa el reintento de un ticket que falló o lo cierra con error.
+        
+        Los errores transitorios (según `retryable` de la excepción) dejan el
+        ticket en TRAMITE con el próximo intento programado. Los errores
+        permanentes, y los transitorios que agotaron sus intentos (movidos a
+        dead-letter), cierran el ticket con error.
+        """
         codpeticiones = request_data.get("CODPETICIONES")
+        entry = self.retry_scheduler.schedule(codpeticiones, request_data, error)
         try:
-            await self.update_request(
-                codpeticiones,
-                {
-                    "CODESTADO": 3,  # SOLUCIONADO
-                    "SOLUCION": "Ocurrió un error inesperado al procesar tu solicitud. Nuestro equipo ha sido notificado.",
-                    "CODUSOLUCION": "AGENTE-MS",
-                    "FESOLUCION": datetime.utcnow().isoformat(),
-                    "AI_CLASSIFICATION_DATA": update_ai_classification_data(
-                        create_empty_ai_classification_data(),
-                        {
-                            "processing_status": "error",
-                            "current_step": "Error durante el procesamiento",
-                            "progress_percentage": 0,
-                            "last_update": datetime.utcnow().isoformat(),
-                            "error_details": {
-                                "error_type": "processing_error",
-                                "user_message": "Ocurrió un error inesperado al procesar tu solicitud.",
-                                "action_suggestion": "Tu solicitud será reintentada automáticamente. Si el problema persiste, contacta al soporte.",
-                                "technical_detail": str(error)
-                            }
-                        }
-                    )
-                }
-            )
+            if entry is not None:
+                await self._update_request_with_retry(entry, user_message, error)
+            elif self.retry_scheduler.enabled and classify_error(error) is not None:
+                await self._update_request_with_error(
+                    codpeticiones,
+                    "No fue posible completar tu solicitud después de varios intentos.",
+                    "Nuestro equipo revisará tu solicitud. Si es urgente, contacta al soporte.",
+                    error_type="retries_exhausted"
+                )
+            else:
+                await self._update_request_with_error(
+                    codpeticiones,
+                    user_message,
+                    "Si el problema persiste, contacta al soporte."
+                )
         except Exception as update_error:
+            # El reintento ya quedó registrado en el journal
             logger.error(
                 "Error al actualizar solicitud con error de procesamiento",
                 codpeticiones=codpeticiones,
-                error=str(update_error)
+                error=str(update_error),
+                retry_scheduled=entry is not None
+            )
+    
+    async def _run_scheduled_retry(self, entry: RetryEntry):
+        """
+        Reprocesa un ticket con reintento vencido.
+        
+        Si el ticket tiene checkpoint se retoma desde la última etapa
+        completada; si no, se reprocesa desde el inicio. Si mientras tanto el
+        ticket fue cerrado (por ejemplo, por un agente humano) el reintento se
+        descarta.
+        """
+        row = await self._fetch_request(entry.codpeticiones)
+        if not row or row.get("CODESTADO") not in (1, 2):
+            logger.info(
+                "Reintento descartado, la solicitud ya no está pendiente",
+                codpeticiones=entry.codpeticiones,
+                codestado=row.get("CODESTADO") if row else None
+            )
+            return
+        
+        await self.resume_request(row)
+    
+    async def _fetch_request(self, codpeticiones: int) -> Optional[Dict[str, Any]]:
+        """Obtiene la fila actual de una solicitud"""
+        if not self.supabase:
+            self.supabase = await create_async_client(
+                self._supabase_url,
+                self._supabase_key
+            )
+        
+        result = await self.supabase.table("HLP_PETICIONES")\
+            .select("*")\
+            .eq("CODPETICIONES", codpeticiones)\
+            .execute()
+        return result.data[0] if result.data else None
+    
+    async def resume_interrupted_requests(self, page_size: int = 1000) -> Dict[str, Any]:
+        """
+        Retoma los tickets que quedaron en TRAMITE al detenerse el agente.
+        
+        Solo se retoman los tickets del agente (con checkpoint o con un
+        processing_status de AGENT_PRE_ACTION_STATUSES): los que una persona
+        pasó a TRAMITE no se tocan. Se omiten también los que esperan
+        revisión humana y los que tienen un reintento pendiente en el
+        journal (los retoma el programador de reintentos). Los que llevan
+        detenidos más de RESUME_MAX_AGE_HOURS se marcan para revisión humana
+        en lugar de retomarse. Los demás se retoman desde su checkpoint con
+        concurrencia acotada, sin bloquear la recepción de solicitudes
+        nuevas. Supone una sola instancia del agente procesando la tabla.
+        
+        Returns:
+            Métricas de recuperación (también en self.recovery_stats)
+        """
+        started = time.perf_counter()
+        now = datetime.utcnow()
+        try:
+            if not self.supabase:
+                self.supabase = await create_async_client(
+                    self._supabase_url,
+                    self._supabase_key
+                )
+            
+            rows: List[Dict[str, Any]] = []
+            offset = 0
+            while True:
+                result = await self.supabase.table("HLP_PETICIONES")\
+                    .select("*")\
+                    .eq("CODESTADO", 2)\
+                    .order("CODPETICIONES")\
+                    .range(offset, offset + page_size - 1)\
+                    .execute()
+                page = result.data or []
+                rows.extend(page)
+                if len(page) < page_size:
+                    break
+                offset += page_size
+        except Exception as e:
+            logger.error("Error al buscar tickets interrumpidos", error=str(e), exc_info=True)
+            return {}
+        
+        max_age = self.settings.RESUME_MAX_AGE_HOURS
+        pending = []
+        expired = []
+        not_owned = 0
+        stalled_seconds = []
+        for row in rows:
+            ai_data = row.get("AI_CLASSIFICATION_DATA") or {}
+            processing_status = ai_data.get("processing_status")
+            if not ai_data.get("checkpoint") and processing_status not in AGENT_PRE_ACTION_STATUSES:
+                not_owned += 1
+                continue
+            if processing_status in ("ignored", "resume_expired"):
+                continue
+            if self.retry_scheduler.is_pending(row.get("CODPETICIONES")):
+                continue
+            last_activity = _last_agent_activity(row)
+            stalled = (now - last_activity).total_seconds() if last_activity else None
+            if max_age and (stalled is None or stalled > max_age * 3600):
+                expired.append(row)
+                continue
+            pending.append(row)
+            if stalled is not None:
+                stalled_seconds.append(stalled)
+        
+        for row in expired:
+            await self._mark_resume_expired(row)
+        
+        semaphore = asyncio.Semaphore(max(1, self.settings.RESUME_SWEEP_CONCURRENCY))
+        
+        async def resume(row: Dict[str, Any]):
+            async with semaphore:
+                await self.resume_request(row)
+        
+        await asyncio.gather(*(resume(row) for row in pending))
+        
+        self.recovery_stats = {
+            "tramite_found": len(rows),
+            "resumed": len(pending),
+            "expired": len(expired),
+            "not_owned": not_owned,
+            "skipped": len(rows) - len(pending) - len(expired),
+            "max_stalled_seconds": round(max(stalled_seconds), 1) if stalled_seconds else 0.0,
+            "recovery_seconds": round(time.perf_counter() - started, 3),
+        }
+        logger.info("Barrido de tickets interrumpidos completado", **self.recovery_stats)
+        return self.recovery_stats
+    
+    async def _mark_resume_expired(self, row: Dict[str, Any]):
+        """
+        Deja para revisión humana un ticket del agente detenido por más de
+        RESUME_MAX_AGE_HOURS. Sigue en TRAMITE y los barridos siguientes lo omiten.
+        """
+        codpeticiones = row.get("CODPETICIONES")
+        ai_data = update_ai_classification_data(
+            create_empty_ai_classification_data(),
+            {
+                **(row.get("AI_CLASSIFICATION_DATA") or {}),
+                "processing_status": "resume_expired",
+                "requires_human_review": True,
+                "current_step": "Procesamiento interrumpido, requiere revisión humana",
+                "last_update": datetime.utcnow().isoformat()
+            }
+        )
+        try:
+            await self.update_request(codpeticiones, {"AI_CLASSIFICATION_DATA": ai_data})
+            logger.warning(
+                "Ticket interrumpido demasiado antiguo, se deja para revisión humana",
+                codpeticiones=codpeticiones,
+                max_age_hours=self.settings.RESUME_MAX_AGE_HOURS
+            )
+        except Exception as e:
+            logger.error(
+                "No se pudo marcar ticket interrumpido para revisión humana",
+                codpeticiones=codpeticiones,
+                error=str(e)
+            )
+    
+    async def resume_request(self, row: Dict[str, Any]):
+        """
+        Retoma un ticket desde su último checkpoint.
+        
+        - Sin checkpoint (el ticket no alcanzó a validarse): se reprocesa desde el inicio.
+        - validated: se repite la clasificación.
+        - classified / executing: se ejecutan las acciones que faltan, sin
+          volver a clasificar ni repetir las acciones ya registradas.
+        
+        Args:
+            row: Fila actual de HLP_PETICIONES
+        """
+        codpeticiones = row.get("CODPETICIONES")
+        ai_data = row.get("AI_CLASSIFICATION_DATA") or {}
+        checkpoint = ai_data.get("checkpoint") or {}
+        step = checkpoint.get("step")
+        
+        if row.get("CODESTADO") == 1 or step is None:
+            await self.process_new_request({**row, "CODESTADO": 1})
+            return
+        
+        logger.info(
+            "Retomando ticket desde checkpoint",
+            codpeticiones=codpeticiones,
+            step=step,
+            completed_actions=list((checkpoint.get("completed_actions") or {}).keys()),
+            checkpoint_at=checkpoint.get("updated_at")
+        )
+        deadline = Deadline(self.settings.TICKET_DEADLINE_SECONDS)
+        request_data = {key: value for key, value in row.items() if key != "AI_CLASSIFICATION_DATA"}
+        ai_data = update_ai_classification_data(
+            create_empty_ai_classification_data(),
+            {**ai_data, "resumed_at": datetime.utcnow().isoformat()}
+        )
+        
+        try:
+            if step in (STEP_CLASSIFIED, STEP_EXECUTING):
+                classification_result = ClassificationResult.model_construct(
+                    **{field: ai_data.get(field) for field in CLASSIFICATION_FIELDS}
+                )
+                await self._execute_actions(
+                    codpeticiones,
+                    ai_data.get("app_type"),
+                    checkpoint.get("execution_params") or {},
+                    classification_result,
+                    ai_data,
+                    deadline
+                )
+            else:
+                description = self.request_validator.sanitize_description(row.get("DESCRIPTION") or "")
+                await self._orchestrate_processing(
+                    codpeticiones,
+                    checkpoint.get("codcategoria") or row.get("CODCATEGORIA"),
+                    description,
+                    row.get("USUSOLICITA"),
+                    ai_data,
+                    deadline
+                )
+        
+        except DeadlineExceededError as e:
+            await self._fail_or_schedule_retry(request_data, e, "Tu solicitud tardó más de lo esperado en procesarse.")
+        
+        except CircuitOpenError as e:
+            logger.warning(
+                "Circuito del backend abierto, ticket reprogramado",
+                codpeticiones=codpeticiones,
+                retry_after=round(e.retry_after, 1)
+            )
+            await self._fail_or_schedule_retry(request_data, e, "El sistema no está disponible temporalmente.")
+        
+        except Exception as e:
+            logger.error(
+                "Error al retomar ticket desde checkpoint",
+                codpeticiones=codpeticiones,
+                step=step,
+                error=str(e),
+                exc_info=True
+            )
+            await self._fail_or_schedule_retry(
+                request_data,
+                e,
+                "Ocurrió un error inesperado al procesar tu solicitud. Nuestro equipo ha sido notificado."
             )
     
     async def process_new_request(self, request_data: Dict[str, Any]):
@@ -460,6 +835,9 @@ class RealtimeListener:
         Args:
             request_data: Datos de la solicitud del evento
         """
+        # Presupuesto de tiempo del ticket, compartido por todas las etapas
+        deadline = Deadline(self.settings.TICKET_DEADLINE_SECONDS)
+        
         codpeticiones = request_data.get("CODPETICIONES")
         codcategoria = request_data.get("CODCATEGORIA")
         description = request_data.get("DESCRIPTION", "")
@@ -505,89 +883,18 @@ class RealtimeListener:
             fesolicita = datetime.utcnow()
         
         try:
-            # Paso 1: Validación inicial
-            is_valid, errors = self.request_validator.validate_request_data(request_data)
-            if not is_valid:
-                logger.warning("Solicitud rechazada por validación", codpeticiones=codpeticiones, errors=errors)
-                await self._update_request_with_rejection(
-                    codpeticiones,
-                    "Los datos de la solicitud no son válidos. " + "; ".join(errors)
-                )
-                return
-            
-            # Sanitizar descripción
-            description_before_sanitize = description
-            try:
-                description = self.request_validator.sanitize_description(description)
-                logger.info(
-                    "🧹 Descripción sanitizada",
-                    codpeticiones=codpeticiones,
-                    description_before=description_before_sanitize,
-                    description_after=description,
-                    length_before=len(description_before_sanitize) if description_before_sanitize else 0,
-                    length_after=len(description) if description else 0
-                )
-            except ValidationError as e:
-                await self._update_request_with_rejection(
-                    codpeticiones,
-                    self.request_validator.generate_rejection_message("invalid_description")
-                )
-                return
-            
-            # Validar categoría
-            is_valid_category, category_error = await self.request_validator.validate_category(codcategoria)
-            if not is_valid_category:
-                await self._update_request_with_rejection(
-                    codpeticiones,
-                    self.request_validator.generate_rejection_message("invalid_category")
-                )
-                return
-            
-            # Validar usuario
-            is_valid_user, user_error = self.request_validator.validate_user(ususolicita)
-            if not is_valid_user:
-                await self._update_request_with_rejection(
-                    codpeticiones,
-                    f"Usuario inválido: {user_error}"
-                )
-                return
-            
-            # Paso 2: Validación de seguridad (CRÍTICO - antes de enviar a IA)
-            is_safe, risk_level, detected_patterns = self.request_validator.validate_security(description)
-            if not is_safe and risk_level in ["HIGH", "CRITICAL"]:
-                logger.warning(
-                    "Solicitud rechazada por seguridad",
-                    codpeticiones=codpeticiones,
-                    risk_level=risk_level,
-                    detected_patterns=detected_patterns
-                )
-                rejection_message = self.request_validator.generate_security_rejection_message(
-                    risk_level,
-                    detected_patterns
-                )
-                await self._update_request_with_rejection(codpeticiones, rejection_message, security_rejection=True)
-                return
-            
-            # Paso 3: Validación de rate limiting
-            within_limit, current_count, limit, window_hours = await self.request_validator.check_rate_limit(
-                ususolicita,
-                codcategoria
+            # Pasos 1-4: Validaciones (estructura, descripción y seguridad, categoría,
+            # usuario, rate limiting y edad). Las ramas independientes se ejecutan
+            # concurrentemente y el primer rechazo cancela el resto.
+            rejection, description = await self.request_validator.run_validation_stage(
+                request_data,
+                fesolicita
             )
-            if not within_limit:
-                rate_limit_info = await self.request_validator.get_rate_limit_info(ususolicita)
-                rejection_message = self.request_validator.generate_rejection_message(
-                    "rate_limit_exceeded",
-                    rate_limit_info
-                )
-                await self._update_request_with_rejection(codpeticiones, rejection_message)
-                return
-            
-            # Paso 4: Validación de edad de solicitud
-            is_valid_age, age_reason = self.request_validator.validate_request_age(fesolicita)
-            if not is_valid_age:
+            if rejection:
                 await self._update_request_with_rejection(
                     codpeticiones,
-                    self.request_validator.generate_rejection_message("request_too_old")
+                    rejection["message"],
+                    security_rejection=rejection["security_rejection"]
                 )
                 return
             
@@ -601,7 +908,8 @@ class RealtimeListener:
                     "processing_status": "validated",
                     "current_step": "Clasificando solicitud con inteligencia artificial...",
                     "progress_percentage": 10,
-                    "last_update": datetime.utcnow().isoformat()
+                    "last_update": datetime.utcnow().isoformat(),
+                    "checkpoint": build_checkpoint(STEP_VALIDATED, codcategoria=codcategoria)
                 }
             )
             
@@ -620,9 +928,34 @@ class RealtimeListener:
                 codcategoria,
                 description,
                 ususolicita,
-                ai_data
+                ai_data,
+                deadline
             )
             
+        except DeadlineExceededError as e:
+            logger.error(
+                "Deadline del ticket agotado",
+                codpeticiones=codpeticiones,
+                stage=e.stage,
+                elapsed_seconds=round(deadline.elapsed(), 2)
+            )
+            await self._fail_or_schedule_retry(
+                request_data,
+                e,
+                "Tu solicitud tardó más de lo esperado en procesarse."
+            )
+            return
+        
+        except CircuitOpenError as e:
+            # Backend caído: el ticket queda en TRAMITE y se reintenta cuando el circuito lo permita
+            logger.warning(
+                "Circuito del backend abierto, ticket reprogramado",
+                codpeticiones=codpeticiones,
+                retry_after=round(e.retry_after, 1)
+            )
+            await self._fail_or_schedule_retry(request_data, e, "El sistema no está disponible temporalmente.")
+            return
+        
         except ValidationError as e:
             logger.warning("Solicitud rechazada por validación", codpeticiones=codpeticiones, error=str(e))
             await self._update_request_with_rejection(codpeticiones, str(e))
@@ -640,10 +973,10 @@ class RealtimeListener:
                 error=str(e),
                 exc_info=True
             )
-            await self._update_request_with_error(
-                codpeticiones,
-                "Ocurrió un error inesperado al procesar tu solicitud. Nuestro equipo ha sido notificado.",
-                "Tu solicitud será reintentada automáticamente. Si el problema persiste, contacta al soporte."
+            await self._fail_or_schedule_retry(
+                request_data,
+                e,
+                "Ocurrió un error inesperado al procesar tu solicitud. Nuestro equipo ha sido notificado."
             )
             return
     
@@ -653,7 +986,8 @@ class RealtimeListener:
         codcategoria: int,
         description: str,
         ususolicita: str,
-        ai_data: Dict[str, Any]
+        ai_data: Dict[str, Any],
+        deadline: Optional[Deadline] = None
     ):
         """Orquesta el procesamiento completo de la solicitud"""
         # Paso 7.1: Clasificación con IA
@@ -688,8 +1022,11 @@ class RealtimeListener:
             classification_result = await self.ai_processor.classify_request(
                 description,
                 codcategoria,
-                ususolicita
+                ususolicita,
+                deadline=deadline
             )
+        except DeadlineExceededError:
+            raise
         except Exception as e:
             logger.error("Error en clasificación, usando fallback", codpeticiones=codpeticiones, error=str(e))
             classification_result = self.ai_processor._get_fallback_classification(codcategoria, ususolicita)
@@ -776,6 +1113,7 @@ class RealtimeListener:
                 app_type=app_type,
                 errors=errors
             )
+            self.request_validator.forget_duplicate(codpeticiones)
             ai_data = update_ai_classification_data(
                 ai_data,
                 {
@@ -804,7 +1142,19 @@ class RealtimeListener:
             )
             return
         
-        # Paso 7.2: Validación y Extracción
+        # Paso 7.2: Validación y Extracción (checkpoint: la clasificación no se repite al retomar)
+        ai_data = update_ai_classification_data(
+            ai_data,
+            {
+                "checkpoint": build_checkpoint(
+                    STEP_CLASSIFIED,
+                    ai_data.get("checkpoint"),
+                    codcategoria=codcategoria,
+                    execution_params=execution_params,
+                    completed_actions={}
+                )
+            }
+        )
         await self.update_request_progress(
             codpeticiones,
             "validating",
@@ -819,7 +1169,8 @@ class RealtimeListener:
             app_type,
             execution_params,
             classification_result,
-            ai_data
+            ai_data,
+            deadline
         )
     
     async def _execute_actions(
@@ -828,52 +1179,80 @@ class RealtimeListener:
         app_type: str,
         execution_params: Dict[str, Any],
         classification_result: ClassificationResult,
-        ai_data: Dict[str, Any]
+        ai_data: Dict[str, Any],
+        deadline: Optional[Deadline] = None
     ):
-        """Ejecuta las acciones detectadas"""
-        actions_executed = []
+        """
+        Ejecuta las acciones detectadas como un grafo de dependencias.
         
-        # Determinar aplicaciones a procesar
-        requires_secondary = execution_params.get("requires_secondary_app", False)
+        Las acciones de la aplicación principal y de la secundaria son ramas
+        independientes que se ejecutan concurrentemente. En Dominio, find_user
+        se ejecuta antes que las demás acciones de Dominio.
         
-        # Procesar aplicación principal
-        primary_actions = execution_params.get("mapped_actions", execution_params.get("primary_actions", []))
-        await self._execute_app_actions(
-            codpeticiones,
-            app_type,
-            primary_actions,
-            execution_params,
-            actions_executed,
-            ai_data,
-            is_primary=True
-        )
+        Cada acción exitosa se registra en el checkpoint del ticket; al
+        retomar un ticket interrumpido, las acciones ya registradas no se
+        vuelven a ejecutar.
+        """
+        plan = build_action_plan(app_type, execution_params)
+        checkpoint = ai_data.get("checkpoint") or {}
+        completed: Dict[str, Dict[str, Any]] = dict(checkpoint.get("completed_actions") or {})
+        progress = {"started": 0, "lock": asyncio.Lock(), "ai_data": ai_data}
         
-        # Procesar aplicación secundaria si aplica
-        if requires_secondary:
-            secondary_app = execution_params.get("secondary_app")
-            secondary_actions = execution_params.get("secondary_app_actions", [])
-            await self._execute_app_actions(
-                codpeticiones,
-                secondary_app,
-                secondary_actions,
-                execution_params,
-                actions_executed,
-                ai_data,
-                is_primary=False
-            )
+        async def execute(node: ActionNode) -> Dict[str, Any]:
+            if node.key in completed:
+                logger.info(
+                    "Acción ya ejecutada según checkpoint, se omite",
+                    codpeticiones=codpeticiones,
+                    action=node.key
+                )
+                return {**completed[node.key], "from_checkpoint": True}
+            
+            async with progress["lock"]:
+                progress["started"] += 1
+                await self.update_request_progress(
+                    codpeticiones,
+                    "executing_actions",
+                    self._get_action_message(node.app_type, node.action_type),
+                    70 + int(progress["started"] / len(plan) * 20),
+                    progress["ai_data"]
+                )
+            entry = await self._execute_single_action(codpeticiones, node, execution_params, deadline)
+            if entry["success"]:
+                async with progress["lock"]:
+                    completed[node.key] = entry
+                    await self._save_actions_checkpoint(codpeticiones, progress, completed)
+            return entry
+        
+        # Con el circuito del backend abierto, CircuitOpenError se propaga y el
+        # ticket pasa al programador de reintentos (retoma desde el checkpoint)
+        actions_executed = await run_action_plan(plan, execute, self._allows_dependent_actions)
         
         # Paso 7.4: Finalización
         ai_data = update_ai_classification_data(
-            ai_data,
+            progress["ai_data"],
             {
                 "actions_executed": actions_executed,
                 "processing_status": "completed",
                 "progress_percentage": 100,
                 "completed_at": datetime.utcnow().isoformat(),
-                "last_update": datetime.utcnow().isoformat()
+                "last_update": datetime.utcnow().isoformat(),
+                "checkpoint": build_checkpoint(STEP_COMPLETED, progress["ai_data"].get("checkpoint"))
             }
         )
         
+        # Usuario de Dominio no encontrado: las acciones dependientes no se ejecutaron
+        if any(self._is_user_not_found(action) for action in actions_executed):
+            ai_data = update_ai_classification_data(
+                ai_data,
+                {
+                    "error_details": {
+                        "error_type": "user_not_found",
+                        "user_message": USER_NOT_FOUND_MESSAGE,
+                        "action_suggestion": "Verifique que el nombre de usuario sea correcto o contacte al soporte para asistencia."
+                    }
+                }
+            )
+        
         # Generar mensaje final
         solucion_text = self._generate_final_solution_message(
             app_type,
@@ -895,130 +1274,107 @@ class RealtimeListener:
             }
         )
     
-    async def _execute_app_actions(
+    async def _save_actions_checkpoint(
         self,
         codpeticiones: int,
-        app_type: str,
-        actions: List[str],
-        execution_params: Dict[str, Any],
-        actions_executed: List[Dict[str, Any]],
-        ai_data: Dict[str, Any],
-        is_primary: bool
+        progress: Dict[str, Any],
+        completed: Dict[str, Dict[str, Any]]
     ):
-        """Ejecuta acciones para una aplicación específica"""
+        """Registra en el checkpoint las acciones completadas (best-effort: un fallo no detiene el plan)"""
+        ai_data = update_ai_classification_data(
+            progress["ai_data"],
+            {
+                "checkpoint": build_checkpoint(
+                    STEP_EXECUTING,
+                    progress["ai_data"].get("checkpoint"),
+                    completed_actions=dict(completed)
+                )
+            }
+        )
+        progress["ai_data"] = ai_data
+        try:
+            await self.update_request(codpeticiones, {"AI_CLASSIFICATION_DATA": ai_data})
+        except Exception as e:
+            logger.warning(
+                "No se pudo guardar el checkpoint de acciones",
+                codpeticiones=codpeticiones,
+                error=str(e)
+            )
+    
+    async def _execute_single_action(
+        self,
+        codpeticiones: Any,
+        node: ActionNode,
+        execution_params: Dict[str, Any],
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, Any]:
+        """
+        Ejecuta una acción del plan y retorna su entrada de actions_executed.
+        
+        La acción se envía con una clave de idempotencia derivada del ticket:
+        los reintentos (incluido el reprocesamiento del ticket) no repiten
+        acciones como generate_password o change_password en el backend.
+        """
         user_id = execution_params.get("user_id")
+        endpoint = f"/api/apps/{node.app_type}/execute-action"
+        idempotency_key = build_idempotency_key(codpeticiones, node.app_type, node.action_type)
         
-        # Para Dominio: SIEMPRE ejecutar find_user PRIMERO
-        if app_type == "dominio":
-            user_name = execution_params.get("user_name")
-            await self.update_request_progress(
-                codpeticiones,
-                "executing_actions",
-                "Buscando información del usuario en el sistema...",
-                70,
-                ai_data
-            )
-            
-            try:
-                print(f"🔌 Invocando API: /api/apps/dominio/execute-action | Acción: find_user | Usuario: {user_id} | Nombre: {user_name}")
+        try:
+            if node.app_type == "amerika":
+                result = await self.action_executor.execute_amerika_action(
+                    user_id,
+                    node.action_type,
+                    idempotency_key=idempotency_key,
+                    deadline=deadline
+                )
+            else:  # dominio
                 result = await self.action_executor.execute_dominio_action(
                     user_id,
-                    "find_user",
-                    user_name
+                    node.action_type,
+                    execution_params.get("user_name"),
+                    idempotency_key=idempotency_key,
+                    deadline=deadline
                 )
-                
-                actions_executed.append({
-                    "app_type": "primary" if is_primary else "secondary",
-                    "action_type": "find_user",
-                    "endpoint": "/api/apps/dominio/execute-action",
-                    "success": result.get("success", False),
-                    "result": result.get("result", {}),
-                    "timestamp": datetime.utcnow().isoformat()
-                })
-                
-                if not result.get("result", {}).get("found", False):
-                    # Usuario no encontrado
-                    solucion_text = "No se encontró el usuario especificado en el sistema. Por favor, verifique el nombre de usuario o contacte al soporte para aclaración."
-                    ai_data = update_ai_classification_data(
-                        ai_data,
-                        {
-                            "actions_executed": actions_executed,
-                            "error_details": {
-                                "error_type": "user_not_found",
-                                "user_message": solucion_text,
-                                "action_suggestion": "Verifique que el nombre de usuario sea correcto o contacte al soporte para asistencia."
-                            }
-                        }
-                    )
-                    await self.update_request(
-                        codpeticiones,
-                        {
-                            "CODESTADO": 3,
-                            "SOLUCION": solucion_text,
-                            "CODUSOLUCION": "AGENTE-MS",
-                            "FESOLUCION": datetime.utcnow().isoformat(),
-                            "AI_CLASSIFICATION_DATA": ai_data
-                        }
-                    )
-                    return
-                
-            except ActionExecutionError as e:
-                actions_executed.append({
-                    "app_type": "primary" if is_primary else "secondary",
-                    "action_type": "find_user",
-                    "endpoint": "/api/apps/dominio/execute-action",
-                    "success": False,
-                    "result": {"error": e.user_message},
-                    "timestamp": datetime.utcnow().isoformat()
-                })
-                # Continuar con acciones siguientes aunque find_user falle (depende de la lógica de negocio)
-        
-        # Ejecutar acciones restantes
-        for idx, action in enumerate(actions):
-            if app_type == "dominio" and action == "find_user":
-                continue  # Ya se ejecutó
             
-            progress = 70 + int((idx + 1) / len(actions) * 20)
-            action_message = self._get_action_message(app_type, action)
-            await self.update_request_progress(
-                codpeticiones,
-                "executing_actions",
-                action_message,
-                progress,
-                ai_data
-            )
-            
-            try:
-                endpoint = f"/api/apps/{app_type}/execute-action"
-                if app_type == "amerika":
-                    print(f"🔌 Invocando API: {endpoint} | Acción: {action} | Usuario: {user_id}")
-                    result = await self.action_executor.execute_amerika_action(user_id, action)
-                else:  # dominio
-                    user_name = execution_params.get("user_name")
-                    print(f"🔌 Invocando API: {endpoint} | Acción: {action} | Usuario: {user_id} | Nombre: {user_name}")
-                    result = await self.action_executor.execute_dominio_action(user_id, action, user_name)
-                
-                actions_executed.append({
-                    "app_type": "primary" if is_primary else "secondary",
-                    "action_type": action,
-                    "endpoint": endpoint,
-                    "success": result.get("success", False),
-                    "result": result.get("result", {}),
-                    "generated_password": result.get("generated_password"),
-                    "timestamp": datetime.utcnow().isoformat()
-                })
-                
-            except ActionExecutionError as e:
-                endpoint = f"/api/apps/{app_type}/execute-action"
-                actions_executed.append({
-                    "app_type": "primary" if is_primary else "secondary",
-                    "action_type": action,
-                    "endpoint": endpoint,
-                    "success": False,
-                    "result": {"error": e.user_message, "action_suggestion": e.action_suggestion},
-                    "timestamp": datetime.utcnow().isoformat()
-                })
-                # Continuar con siguiente acción
+            return {
+                "app_type": node.role,
+                "action_type": node.action_type,
+                "endpoint": endpoint,
+                "success": result.get("success", False),
+                "result": result.get("result", {}),
+                "generated_password": result.get("generated_password"),
+                "timestamp": datetime.utcnow().isoformat()
+            }
+        
+        except ActionExecutionError as e:
+            # Continuar con las demás acciones aunque esta falle
+            return {
+                "app_type": node.role,
+                "action_type": node.action_type,
+                "endpoint": endpoint,
+                "success": False,
+                "result": {"error": e.user_message, "action_suggestion": e.action_suggestion},
+                "timestamp": datetime.utcnow().isoformat()
+            }
+    
+    @staticmethod
+    def _is_user_not_found(action: Dict[str, Any]) -> bool:
+        """Indica si la acción es un find_user exitoso que no encontró al usuario"""
+        return (
+            action.get("action_type") == "find_user"
+            and action.get("success", False)
+            and not (action.get("result") or {}).get("found", False)
+        )
+    
+    def _allows_dependent_actions(self, action: Dict[str, Any]) -> bool:
+        """
+        Indica si el resultado de una acción permite ejecutar las acciones que dependen de ella.
+        
+        Si find_user no encontró al usuario no se ejecutan las demás acciones
+        de Dominio. Si find_user falló por error, se continúa (depende de la
+        lógica de negocio).
+        """
+        return not self._is_user_not_found(action)
     
     def _get_action_message(self, app_type: str, action: str) -> str:
         """Retorna mensaje descriptivo para una acción"""
@@ -1085,6 +1441,9 @@ class RealtimeListener:
         action_type = action.get("action_type")
         result = action.get("result", {})
         
+        if self._is_user_not_found(action):
+            return USER_NOT_FOUND_MESSAGE
+        
         if action_type in ["generate_password", "change_password"]:
             # Buscar contraseña primero en el nivel superior de action, luego en result
             password = action.get("generated_password") or result.get("generated_password") or result.get("password")
@@ -1113,6 +1472,8 @@ class RealtimeListener:
                 .update(updates)\
                 .eq("CODPETICIONES", codpeticiones)\
                 .execute()
+            # En segundo plano: el ticket no espera al backend
+            self.action_executor.notify_request_updated(codpeticiones)
             return result
         except Exception as e:
             logger.error(
@@ -1156,6 +1517,8 @@ class RealtimeListener:
         security_rejection: bool = False
     ):
         """Actualiza solicitud con mensaje de rechazo"""
+        # El usuario puede volver a enviar la solicitud corregida
+        self.request_validator.forget_duplicate(codpeticiones)
         ai_data = update_ai_classification_data(
             create_empty_ai_classification_data(),
             {
@@ -1182,13 +1545,62 @@ class RealtimeListener:
             }
         )
     
+    async def _update_request_with_retry(
+        self,
+        entry: RetryEntry,
+        user_message: str,
+        error: Exception
+    ):
+        """
+        Mantiene la solicitud en TRAMITE con el próximo reintento programado.
+        
+        Se conserva el checkpoint del ticket para que el reintento lo retome
+        desde la última etapa completada.
+        """
+        next_attempt_at = self.retry_scheduler.next_attempt_at(entry).isoformat()
+        try:
+            row = await self._fetch_request(entry.codpeticiones)
+            current = (row or {}).get("AI_CLASSIFICATION_DATA") or {}
+        except Exception:
+            current = {}
+        action_suggestion = "Tu solicitud será reintentada automáticamente. No es necesario crear una nueva."
+        ai_data = update_ai_classification_data(
+            update_ai_classification_data(create_empty_ai_classification_data(), current),
+            {
+                "processing_status": "retry_scheduled",
+                "current_step": "Ocurrió un problema temporal. Su solicitud será reintentada automáticamente.",
+                "progress_percentage": 0,
+                "retry_attempt": entry.attempt,
+                "next_retry_at": next_attempt_at,
+                "last_update": datetime.utcnow().isoformat(),
+                "error_details": {
+                    "error_type": entry.error_class,
+                    "user_message": user_message,
+                    "action_suggestion": action_suggestion,
+                    "technical_detail": str(error)
+                }
+            }
+        )
+        
+        await self.update_request(
+            entry.codpeticiones,
+            {
+                "CODESTADO": 2,  # TRAMITE
+                "SOLUCION": f"{user_message} {action_suggestion}",
+                "AI_CLASSIFICATION_DATA": ai_data
+            }
+        )
+    
     async def _update_request_with_error(
         self,
         codpeticiones: int,
         user_message: str,
-        action_suggestion: Optional[str] = None
+        action_suggestion: Optional[str] = None,
+        error_type: str = "processing_error"
     ):
         """Actualiza solicitud con mensaje de error"""
+        # La solicitud ya no está siendo atendida: no bloquea su reenvío
+        self.request_validator.forget_duplicate(codpeticiones)
         ai_data = update_ai_classification_data(
             create_empty_ai_classification_data(),
             {
@@ -1197,7 +1609,7 @@ class RealtimeListener:
                 "progress_percentage": 0,
                 "last_update": datetime.utcnow().isoformat(),
                 "error_details": {
-                    "error_type": "processing_error",
+                    "error_type": error_type,
                     "user_message": user_message,
                     "action_suggestion": action_suggestion
                 }
@@ -0,0 +1,372 @@
+"""Programador persistente de reintentos de tickets y área de dead-letter"""
+import asyncio
+import json
+import os
+import random
+import time
+import structlog
+from datetime import datetime
+from typing import Optional, Dict, Any, Callable, Awaitable
+
+import httpx
+
+from agent.core.config import Settings
+
+logger = structlog.get_logger(__name__)
+
+# Retardo base (segundos) del primer reintento según la clase de error;
+# se duplica en cada intento siguiente hasta RETRY_SCHEDULER_MAX_DELAY_SECONDS
+RETRY_BASE_DELAYS: Dict[str, float] = {
+    "rate_limited": 60.0,
+    "unavailable": 30.0,
+    "timeout": 120.0,
+}
+
+JOURNAL_VERSION = 1
+
+
+def classify_error(error: BaseException) -> Optional[str]:
+    """
+    Determina la clase de reintento de un error.
+
+    Las excepciones del agente declaran `retryable` y `retry_class`. De las
+    demás solo se reintentan los timeouts y los errores de transporte (red o
+    Supabase no envueltos); cualquier otra (ValueError, KeyError, TypeError...)
+    es un fallo de programación o de datos que no se corrige reintentando.
+
+    Returns:
+        Clase de error para el backoff, o None si el error no se reintenta
+    """
+    retryable = getattr(error, "retryable", None)
+    if retryable is not None:
+        return error.retry_class if retryable else None
+    if isinstance(error, (asyncio.TimeoutError, httpx.TimeoutException)):
+        return "timeout"
+    if isinstance(error, (httpx.TransportError, ConnectionError)):
+        return "unavailable"
+    return None
+
+
+class RetryEntry:
+    """Ticket pendiente de reintento"""
+
+    __slots__ = (
+        "codpeticiones",
+        "request_data",
+        "attempt",
+        "error_class",
+        "last_error",
+        "first_failed_at",
+        "next_attempt_at"
+    )
+
+    def __init__(
+        self,
+        codpeticiones: int,
+        request_data: Dict[str, Any],
+        attempt: int,
+        error_class: str,
+        last_error: str,
+        first_failed_at: float,
+        next_attempt_at: float
+    ):
+        self.codpeticiones = codpeticiones
+        self.request_data = request_data
+        self.attempt = attempt
+        self.error_class = error_class
+        self.last_error = last_error
+        self.first_failed_at = first_failed_at
+        self.next_attempt_at = next_attempt_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RetryEntry":
+        return cls(**{slot: data[slot] for slot in cls.__slots__})
+
+
+class RetryScheduler:
+    """
+    Reintenta tickets que fallaron por errores transitorios.
+
+    Cada reintento pendiente se guarda en un journal JSON local (reescrito de
+    forma atómica en cada cambio), de modo que sobrevive a reinicios del
+    agente. El retardo crece exponencialmente según la clase de error y
+    respeta el `retry_after` del error si es mayor. Tras
+    RETRY_SCHEDULER_MAX_ATTEMPTS reintentos el ticket pasa al archivo de
+    dead-letter para revisión manual.
+
+    Un worker en segundo plano ejecuta los reintentos vencidos con
+    concurrencia acotada, sin bloquear el procesamiento de solicitudes nuevas.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        handler: Callable[[RetryEntry], Awaitable[None]]
+    ):
+        """
+        Inicializa el programador.
+
+        Args:
+            settings: Configuración del agente
+            handler: Corrutina que reprocesa el ticket de una entrada vencida
+        """
+        self.enabled = settings.ENABLE_RETRY_SCHEDULER
+        self.max_attempts = max(0, settings.RETRY_SCHEDULER_MAX_ATTEMPTS)
+        self.max_delay = settings.RETRY_SCHEDULER_MAX_DELAY_SECONDS
+        self.journal_path = settings.RETRY_JOURNAL_PATH
+        self.dead_letter_path = settings.DEAD_LETTER_PATH
+        self._handler = handler
+        self._semaphore = asyncio.Semaphore(max(1, settings.RETRY_SCHEDULER_CONCURRENCY))
+
+        self._entries: Dict[int, RetryEntry] = {}
+        self._running: set = set()
+        self._tasks: set = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+
+        self.scheduled = 0
+        self.completed = 0
+        self.dead_lettered = 0
+
+    async def start(self):
+        """Carga el journal e inicia el worker de reintentos"""
+        if not self.enabled:
+            logger.info("Programador de reintentos deshabilitado")
+            return
+        self._load_journal()
+        self._wakeup = asyncio.Event()
+        self._worker = asyncio.create_task(self._run())
+        logger.info(
+            "Programador de reintentos iniciado",
+            pending=len(self._entries),
+            journal=self.journal_path,
+            max_attempts=self.max_attempts
+        )
+
+    async def close(self):
+        """Detiene el worker (los reintentos pendientes quedan en el journal)"""
+        tasks = [task for task in (self._worker, *self._tasks) if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._worker = None
+
+    def retry_delay(self, error_class: str, attempt: int) -> float:
+        """
+        Calcula el retardo de un reintento.
+
+        Args:
+            error_class: Clase de error (ver RETRY_BASE_DELAYS)
+            attempt: Número de reintento (1 = primero)
+
+        Returns:
+            Segundos hasta el reintento (con ±20% de jitter)
+        """
+        base = RETRY_BASE_DELAYS.get(error_class, RETRY_BASE_DELAYS["timeout"])
+        delay = min(self.max_delay, base * 2 ** (attempt - 1))
+        return delay * random.uniform(0.8, 1.2)
+
+    def schedule(
+        self,
+        codpeticiones: int,
+        request_data: Dict[str, Any],
+        error: BaseException
+    ) -> Optional[RetryEntry]:
+        """
+        Programa el reintento de un ticket que falló.
+
+        Si el ticket ya tenía un reintento programado (el error ocurrió
+        durante un reintento) se programa el siguiente intento. Si se
+        alcanzó el máximo de intentos, el ticket pasa a dead-letter.
+
+        Args:
+            codpeticiones: ID de la solicitud
+            request_data: Datos originales de la solicitud (se reprocesan tal cual)
+            error: Error que causó el fallo
+
+        Returns:
+            Entrada programada, o None si el error no se reintenta o se agotaron los intentos
+        """
+        error_class = classify_error(error)
+        if not self.enabled or error_class is None:
+            self._forget(codpeticiones)
+            return None
+
+        previous = self._entries.get(codpeticiones)
+        attempt = previous.attempt + 1 if previous else 1
+        delay = self.retry_delay(error_class, attempt)
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after:
+            delay = max(delay, retry_after)
+
+        now = time.time()
+        entry = RetryEntry(
+            codpeticiones=codpeticiones,
+            request_data=request_data,
+            attempt=attempt,
+            error_class=error_class,
+            last_error=f"{type(error).__name__}: {error}",
+            first_failed_at=previous.first_failed_at if previous else now,
+            next_attempt_at=now + delay
+        )
+        if attempt > self.max_attempts:
+            self._dead_letter(entry)
+            return None
+
+        self._entries[codpeticiones] = entry
+        self._save_journal()
+        self.scheduled += 1
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+        logger.warning(
+            "Reintento de ticket programado",
+            codpeticiones=codpeticiones,
+            attempt=attempt,
+            max_attempts=self.max_attempts,
+            error_class=error_class,
+            retry_in_seconds=round(delay, 1)
+        )
+        return entry
+
+    def is_pending(self, codpeticiones: int) -> bool:
+        """Indica si la solicitud tiene un reintento programado"""
+        return codpeticiones in self._entries
+
+    def next_attempt_at(self, entry: RetryEntry) -> datetime:
+        """Fecha (UTC) del próximo intento de una entrada"""
+        return datetime.utcfromtimestamp(entry.next_attempt_at)
+
+    async def _run(self):
+        """Lanza los reintentos vencidos y duerme hasta el siguiente"""
+        while True:
+            now = time.time()
+            for entry in list(self._entries.values()):
+                if entry.next_attempt_at <= now and entry.codpeticiones not in self._running:
+                    self._running.add(entry.codpeticiones)
+                    task = asyncio.create_task(self._execute(entry))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+
+            waiting = [
+                entry.next_attempt_at for entry in self._entries.values()
+                if entry.codpeticiones not in self._running
+            ]
+            timeout = max(0.0, min(waiting) - time.time()) if waiting else None
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _execute(self, entry: RetryEntry):
+        """Reprocesa el ticket de una entrada vencida"""
+        try:
+            async with self._semaphore:
+                logger.info(
+                    "Reintentando ticket",
+                    codpeticiones=entry.codpeticiones,
+                    attempt=entry.attempt,
+                    error_class=entry.error_class
+                )
+                try:
+                    await self._handler(entry)
+                except Exception as e:
+                    logger.error(
+                        "Error al reintentar ticket",
+                        codpeticiones=entry.codpeticiones,
+                        attempt=entry.attempt,
+                        error=str(e)
+                    )
+                    self.schedule(entry.codpeticiones, entry.request_data, e)
+        finally:
+            self._running.discard(entry.codpeticiones)
+            # Si el handler no programó un nuevo intento, el ticket quedó resuelto
+            if self._entries.get(entry.codpeticiones) is entry:
+                self.completed += 1
+                self._forget(entry.codpeticiones)
+            if self._wakeup is not None:
+                self._wakeup.set()
+
+    def _forget(self, codpeticiones: int):
+        if self._entries.pop(codpeticiones, None) is not None:
+            self._save_journal()
+
+    def _dead_letter(self, entry: RetryEntry):
+        """Mueve un ticket sin más intentos al archivo de dead-letter"""
+        record = {
+            **entry.to_dict(),
+            "attempts": entry.attempt - 1,
+            "dead_lettered_at": datetime.utcnow().isoformat()
+        }
+        del record["attempt"], record["next_attempt_at"]
+        try:
+            self._ensure_directory(self.dead_letter_path)
+            with open(self.dead_letter_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        except OSError as e:
+            logger.error("Error al escribir dead-letter", codpeticiones=entry.codpeticiones, error=str(e))
+
+        self.dead_lettered += 1
+        self._forget(entry.codpeticiones)
+        logger.error(
+            "Ticket movido a dead-letter tras agotar reintentos",
+            codpeticiones=entry.codpeticiones,
+            attempts=entry.attempt - 1,
+            error_class=entry.error_class,
+            dead_letter=self.dead_letter_path
+        )
+
+    def _load_journal(self):
+        try:
+            with open(self.journal_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.error("Journal de reintentos ilegible, se ignora", journal=self.journal_path, error=str(e))
+            return
+
+        for raw in data.get("entries", []):
+            try:
+                entry = RetryEntry.from_dict(raw)
+            except (KeyError, TypeError):
+                logger.warning("Entrada inválida en journal de reintentos", entry=raw)
+                continue
+            self._entries[entry.codpeticiones] = entry
+
+    def _save_journal(self):
+        """Reescribe el journal de forma atómica (archivo temporal + rename)"""
+        payload = {
+            "version": JOURNAL_VERSION,
+            "entries": [entry.to_dict() for entry in self._entries.values()]
+        }
+        tmp_path = f"{self.journal_path}.tmp"
+        try:
+            self._ensure_directory(self.journal_path)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False, default=str)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.journal_path)
+        except OSError as e:
+            logger.error("Error al guardar journal de reintentos", journal=self.journal_path, error=str(e))
+
+    @staticmethod
+    def _ensure_directory(path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna métricas del programador"""
+        return {
+            "pending": len(self._entries),
+            "running": len(self._running),
+            "scheduled": self.scheduled,
+            "completed": self.completed,
+            "dead_lettered": self.dead_lettered,
+        }
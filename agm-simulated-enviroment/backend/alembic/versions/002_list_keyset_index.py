@@ -0,0 +1,45 @@
+"""Composite index for keyset pagination of GET /api/requests
+
+Revision ID: 002_list_keyset_index
+Revises: 001_initial
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+from sqlalchemy import text
+
+# revision identifiers, used by Alembic.
+revision: str = "002_list_keyset_index"
+down_revision: Union[str, None] = "001_initial"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX_NAME = "ix_HLP_PETICIONES_USUSOLICITA_FESOLICITA_CODPETICIONES"
+
+
+def upgrade() -> None:
+    # Índice del listado por usuario: WHERE USUSOLICITA = ? ORDER BY FESOLICITA DESC, CODPETICIONES DESC.
+    # Resuelve tanto la primera página como la condición de cursor
+    # (FESOLICITA, CODPETICIONES) < (?, ?) sin ordenar ni recorrer páginas anteriores.
+    # CONCURRENTLY no bloquea escrituras y no puede ejecutarse dentro de una transacción.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            INDEX_NAME,
+            "HLP_PETICIONES",
+            ["USUSOLICITA", text('"FESOLICITA" DESC'), text('"CODPETICIONES" DESC')],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            INDEX_NAME,
+            table_name="HLP_PETICIONES",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,64 @@
+"""Composite and partial indexes for the agent's and API's hot queries
+
+Revision ID: 003_hot_query_indexes
+Revises: 002_list_keyset_index
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+from sqlalchemy import text
+
+# revision identifiers, used by Alembic.
+revision: str = "003_hot_query_indexes"
+down_revision: Union[str, None] = "002_list_keyset_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+RATE_LIMIT_INDEX = "ix_HLP_PETICIONES_RATE_LIMIT"
+OPEN_REQUESTS_INDEX = "ix_HLP_PETICIONES_OPEN"
+
+
+def upgrade() -> None:
+    # CONCURRENTLY no bloquea escrituras y no puede ejecutarse dentro de una transacción.
+    # El listado por usuario (USUSOLICITA ORDER BY FESOLICITA DESC) ya lo cubre
+    # ix_HLP_PETICIONES_USUSOLICITA_FESOLICITA_CODPETICIONES (002_list_keyset_index).
+    with op.get_context().autocommit_block():
+        # Rate limit del agente: USUSOLICITA = ? AND CODCATEGORIA IN (300, 400)
+        # AND CODESTADO IN (1, 2, 3) AND FESOLICITA >= ?.
+        # Columnas de igualdad primero y el rango al final; CODPETICIONES incluido
+        # para que el conteo sea un index-only scan.
+        op.create_index(
+            RATE_LIMIT_INDEX,
+            "HLP_PETICIONES",
+            ["USUSOLICITA", "CODCATEGORIA", "CODESTADO", "FESOLICITA"],
+            unique=False,
+            postgresql_include=["CODPETICIONES"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        # Solicitudes abiertas: PENDIENTE (1) y TRAMITE (2) son una fracción mínima
+        # de la tabla. Sirve al escaneo de pendientes (CODESTADO = 1) y al barrido
+        # de tickets interrumpidos (CODESTADO = 2 ORDER BY CODPETICIONES) sin
+        # indexar el histórico de solucionadas.
+        op.create_index(
+            OPEN_REQUESTS_INDEX,
+            "HLP_PETICIONES",
+            ["CODESTADO", "CODPETICIONES"],
+            unique=False,
+            postgresql_where=text('"CODESTADO" IN (1, 2)'),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for index_name in (OPEN_REQUESTS_INDEX, RATE_LIMIT_INDEX):
+            op.drop_index(
+                index_name,
+                table_name="HLP_PETICIONES",
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
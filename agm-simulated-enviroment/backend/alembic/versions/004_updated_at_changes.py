@@ -0,0 +1,83 @@
+"""UPDATED_AT column, trigger and index for the changes feed
+
+Revision ID: 004_updated_at_changes
+Revises: 003_hot_query_indexes
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "004_updated_at_changes"
+down_revision: Union[str, None] = "003_hot_query_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CHANGES_INDEX = "ix_HLP_PETICIONES_USUSOLICITA_UPDATED_AT_CODPETICIONES"
+TRIGGER_FUNCTION = "hlp_peticiones_set_updated_at"
+TRIGGER_NAME = "trg_HLP_PETICIONES_UPDATED_AT"
+
+
+def upgrade() -> None:
+    # DEFAULT now() no reescribe la tabla (Postgres 11+): las filas existentes
+    # quedan con la fecha de la migración, que es su marca inicial de cambios.
+    op.add_column(
+        "HLP_PETICIONES",
+        sa.Column(
+            "UPDATED_AT",
+            sa.TIMESTAMP(timezone=True),
+            nullable=False,
+            server_default=sa.text("now()"),
+        ),
+    )
+
+    # El trigger cubre todas las escrituras: API, agente (Supabase) y SQL manual.
+    # clock_timestamp() y no now(), para que la marca quede lo más cerca posible
+    # de la escritura. Aun así la fila es visible recién al confirmar: otra
+    # transacción puede confirmar antes un UPDATED_AT posterior. GET
+    # /api/requests/changes lo cubre volviendo a leer CHANGES_OVERLAP_SECONDS
+    # (ver cap_changes_cursor en pagination_service).
+    # Un UPDATE que no modifica ninguna columna no mueve la marca.
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION {TRIGGER_FUNCTION}() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' OR NEW IS DISTINCT FROM OLD THEN
+                NEW."UPDATED_AT" := clock_timestamp();
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute(f"""
+        CREATE TRIGGER "{TRIGGER_NAME}"
+        BEFORE INSERT OR UPDATE ON "HLP_PETICIONES"
+        FOR EACH ROW EXECUTE FUNCTION {TRIGGER_FUNCTION}()
+    """)
+
+    # GET /api/requests/changes: USUSOLICITA = ? AND (UPDATED_AT, CODPETICIONES) > cursor
+    # ORDER BY UPDATED_AT, CODPETICIONES
+    with op.get_context().autocommit_block():
+        op.create_index(
+            CHANGES_INDEX,
+            "HLP_PETICIONES",
+            ["USUSOLICITA", "UPDATED_AT", "CODPETICIONES"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            CHANGES_INDEX,
+            table_name="HLP_PETICIONES",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.execute(f'DROP TRIGGER IF EXISTS "{TRIGGER_NAME}" ON "HLP_PETICIONES"')
+    op.execute(f"DROP FUNCTION IF EXISTS {TRIGGER_FUNCTION}()")
+    op.drop_column("HLP_PETICIONES", "UPDATED_AT")
@@ -0,0 +1,58 @@
+"""NOTIFY trigger on HLP_PETICIONES for the backend change feed
+
+Revision ID: 005_change_notify_trigger
+Revises: 004_updated_at_changes
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "005_change_notify_trigger"
+down_revision: Union[str, None] = "004_updated_at_changes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Debe coincidir con CHANGE_FEED_CHANNEL en app/services/change_feed_service.py
+CHANNEL = "hlp_peticiones_changes"
+TRIGGER_FUNCTION = "hlp_peticiones_notify_change"
+TRIGGER_NAME = "trg_HLP_PETICIONES_NOTIFY"
+
+
+def upgrade() -> None:
+    # Payload mínimo (el límite de NOTIFY es 8000 bytes): quién, qué solicitud,
+    # estado y UPDATED_AT. El cliente trae la fila con GET /api/requests/changes.
+    # NOTIFY se entrega al confirmar la transacción; un UPDATE que no cambia la
+    # fila (UPDATED_AT igual) no notifica.
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION {TRIGGER_FUNCTION}() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'UPDATE' AND NEW."UPDATED_AT" IS NOT DISTINCT FROM OLD."UPDATED_AT" THEN
+                RETURN NULL;
+            END IF;
+            PERFORM pg_notify(
+                '{CHANNEL}',
+                json_build_object(
+                    'op', lower(TG_OP),
+                    'codpeticiones', NEW."CODPETICIONES",
+                    'ususolicita', NEW."USUSOLICITA",
+                    'codestado', NEW."CODESTADO",
+                    'updated_at', NEW."UPDATED_AT"
+                )::text
+            );
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute(f"""
+        CREATE TRIGGER "{TRIGGER_NAME}"
+        AFTER INSERT OR UPDATE ON "HLP_PETICIONES"
+        FOR EACH ROW EXECUTE FUNCTION {TRIGGER_FUNCTION}()
+    """)
+
+
+def downgrade() -> None:
+    op.execute(f'DROP TRIGGER IF EXISTS "{TRIGGER_NAME}" ON "HLP_PETICIONES"')
+    op.execute(f"DROP FUNCTION IF EXISTS {TRIGGER_FUNCTION}()")
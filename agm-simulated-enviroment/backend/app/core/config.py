@@ -20,12 +20,50 @@ class Settings(BaseSettings):
     SUPABASE_JWT_SECRET: str  # JWT Secret para validar tokens (obtener desde Dashboard > Settings > API > JWT Secret)
     SUPABASE_SERVICE_ROLE_KEY: Optional[str] = None
 
+    # Autenticación JWT (get_current_user)
+    AUTH_PRINCIPAL_CACHE_SIZE: int = 10000  # Principals verificados en cache (0 = deshabilitado)
+    SUPABASE_JWKS_URL: Optional[str] = None  # JWKS para tokens RS256/ES256 (default: {SUPABASE_URL}/auth/v1/.well-known/jwks.json)
+    JWKS_CACHE_TTL_SECONDS: int = 600  # Tiempo que se reutiliza el JWKS descargado
+    JWKS_FETCH_TIMEOUT_SECONDS: float = 5.0  # Timeout de la descarga del JWKS
+
     # Redis configuration (opcional - para cache)
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
     REDIS_DB: int = 0
     REDIS_ENABLED: bool = False  # Por defecto deshabilitado, habilitar si Redis está disponible
 
+    # Cache de respuestas de GET /api/requests y GET /api/requests/{id}
+    CACHE_ENABLED: bool = True
+    CACHE_TTL_SECONDS: int = 60  # Cota de desactualización ante cambios no notificados
+    CACHE_MAX_ENTRIES: int = 10000  # Máximo de respuestas en el cache en memoria (sin Redis)
+    CACHE_REDIS_TIMEOUT_SECONDS: float = 0.5  # Timeout de Redis (si falla, se consulta la BD)
+
+    # Async jobs configuration (execute-action?mode=async)
+    JOB_MAX_STORED: int = 10000  # Máximo de jobs conservados en memoria
+    JOB_RESULT_TTL_SECONDS: int = 600  # Tiempo que se conserva el resultado de un job terminado
+    JOB_MAX_WAIT_SECONDS: float = 30.0  # Espera máxima permitida en GET /jobs/{job_id}?wait=
+    JOB_CALLBACK_TIMEOUT_SECONDS: float = 10.0  # Timeout del POST al callback_url
+    JOB_CALLBACK_ALLOWED_ORIGINS: str = ""  # Orígenes aceptados como callback_url, separados por coma (https://host[:puerto]; vacío = callbacks deshabilitados)
+    JOB_CALLBACK_SIGNING_SECRET: Optional[str] = None  # Clave HMAC de la firma X-Signature del callback (default: API_SECRET_KEY; la clave nunca se envía)
+
+    # Feed de cambios en tiempo real (GET /api/requests/events, SSE)
+    CHANGE_FEED_ENABLED: bool = True
+    CHANGE_FEED_DATABASE_URL: Optional[str] = None  # Conexión LISTEN (default: DATABASE_URL; requiere modo sesión, no el pooler de transacciones)
+    CHANGE_FEED_QUEUE_SIZE: int = 100  # Eventos pendientes por conexión antes de reemplazarlos por un resync
+    CHANGE_FEED_MAX_CONNECTIONS: int = 1000  # Conexiones SSE simultáneas por proceso
+    CHANGE_FEED_HEARTBEAT_SECONDS: float = 15.0  # Heartbeat si no hay eventos
+    CHANGE_FEED_MAX_STREAM_SECONDS: int = 900  # Duración máxima de un stream (el cliente reconecta con token vigente)
+    CHANGE_FEED_RETRY_MS: int = 3000  # Espera sugerida al cliente antes de reconectar
+
+    # Listado de solicitudes (GET /api/requests)
+    LIST_COUNT_CAP: int = 1000  # Máximo que cuenta el modo count=capped
+    CHANGES_OVERLAP_SECONDS: int = 30  # GET /api/requests/changes vuelve a leer este margen (mayor que la transacción de escritura más larga)
+    EXPORT_BATCH_SIZE: int = 1000  # Filas por lote del cursor de GET /api/requests/export
+
+    # Idempotency configuration (header Idempotency-Key en endpoints de acción)
+    IDEMPOTENCY_MAX_KEYS: int = 50000  # Máximo de claves conservadas en memoria
+    IDEMPOTENCY_TTL_SECONDS: int = 86400  # Tiempo que se conserva la respuesta de una clave
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
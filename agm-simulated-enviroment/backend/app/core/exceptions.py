@@ -21,8 +21,25 @@ class ForbiddenError(Exception):
 
 
 class ValidationError(Exception):
-    """Excepción cuando hay un error de validación"""
-    pass
+    """
+    Excepción cuando hay un error de validación.
+    
+    Por defecto el handler responde con el error genérico `validation_error`;
+    error_code, message y action_suggestion permiten un error más específico
+    (ej: `category_not_found`).
+    """
+
+    def __init__(
+        self,
+        detail: str = "",
+        error_code: str = "validation_error",
+        message: Optional[str] = None,
+        action_suggestion: Optional[str] = None,
+    ):
+        super().__init__(detail)
+        self.error_code = error_code
+        self.message = message
+        self.action_suggestion = action_suggestion
 
 
 def create_error_response(
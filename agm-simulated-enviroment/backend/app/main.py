@@ -5,6 +5,9 @@ from fastapi.responses import JSONResponse
 from sqlalchemy import text
 from app.core.config import settings
 from app.db.base import engine
+from app.services.auth_cache_service import principal_cache
+from app.services.cache_service import response_cache
+from app.services.change_feed_service import change_feed_hub
 from app.routers import app_amerika, app_domain, service_desk
 from app.core.exceptions import (
     RequestNotFoundError,
@@ -75,6 +78,18 @@ async def validate_startup():
     
     logger.info("✅ Configuración de Supabase validada correctamente")
 
+
+@app.on_event("startup")
+async def start_change_feed():
+    """Inicia la conexión LISTEN del feed de cambios (GET /api/requests/events)"""
+    if settings.CHANGE_FEED_ENABLED:
+        change_feed_hub.start()
+
+
+@app.on_event("shutdown")
+async def stop_change_feed():
+    await change_feed_hub.stop()
+
 # Configurar CORS
 origins = [
     origin.strip() for origin in settings.CORS_ORIGINS.split(",") if origin.strip()
@@ -85,7 +100,8 @@ app.add_middleware(
     allow_origins=origins,
     allow_credentials=True,
     allow_methods=["GET", "POST", "PATCH", "OPTIONS"],
-    allow_headers=["Authorization", "Content-Type", "X-API-Key"],
+    allow_headers=["Authorization", "Content-Type", "X-API-Key", "If-None-Match"],
+    expose_headers=["ETag", "X-Cache", "Server-Timing"],
 )
 
 # Registrar routers
@@ -139,10 +155,10 @@ async def validation_handler(request, exc):
     return JSONResponse(
         status_code=422,
         content=create_error_response(
-            "validation_error",
-            "Algunos campos tienen errores. Revisa los campos marcados y corrige la información antes de enviar.",
+            exc.error_code,
+            exc.message or "Algunos campos tienen errores. Revisa los campos marcados y corrige la información antes de enviar.",
             detail=str(exc),
-            action_suggestion="Verifica que todos los campos requeridos estén completos y tengan el formato correcto.",
+            action_suggestion=exc.action_suggestion or "Verifica que todos los campos requeridos estén completos y tengan el formato correcto.",
         ),
     )
 
@@ -188,6 +204,12 @@ async def health():
     if db_error:
         response["database"]["error"] = db_error
     
+    response["cache"] = {
+        "responses": response_cache.stats(),
+        "principals": principal_cache.stats(),
+    }
+    response["change_feed"] = change_feed_hub.stats()
+    
     status_code = 200 if overall_status == "ok" else 503
     return JSONResponse(content=response, status_code=status_code)
 
@@ -87,6 +87,13 @@ class Request(Base):
     ai_classification_data: Mapped[Optional[dict]] = mapped_column(
         JSONB, name="AI_CLASSIFICATION_DATA", nullable=True
     )
+    # Mantenida por el trigger trg_HLP_PETICIONES_UPDATED_AT (004_updated_at_changes)
+    updated_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True),
+        name="UPDATED_AT",
+        nullable=False,
+        server_default=func.now(),
+    )
 
     # Relación con category
     category: Mapped["Category"] = relationship(
@@ -1,6 +1,6 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Optional, Literal, List, TypeVar, Generic
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 T = TypeVar("T")
 
@@ -76,6 +76,29 @@ class RequestResponse(BaseModel):
     feccierre: Optional[datetime] = None
     codmotcierre: Optional[int] = None
     ai_classification_data: Optional[dict] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class RequestSummary(BaseModel):
+    """
+    Esquema resumido de Request para el listado (view=summary).
+    
+    No incluye AI_CLASSIFICATION_DATA: solo app_type y confidence, que es lo
+    que muestra la tabla. El detalle completo está en GET /api/requests/{id}.
+    """
+
+    codpeticiones: int
+    codcategoria: int
+    codestado: Optional[int] = None
+    fesolicita: datetime
+    description: str
+    solucion: Optional[str] = None
+    fesolucion: Optional[datetime] = None
+    ai_app_type: Optional[str] = Field(None, description="Aplicación clasificada por la IA")
+    ai_confidence: Optional[float] = Field(None, description="Confianza de la clasificación de la IA")
 
     class Config:
         from_attributes = True
@@ -159,6 +182,111 @@ class DominioActionResponse(BaseModel):
     )
 
 
+# Esquemas de ejecución en lote (Amerika y Dominio)
+MAX_BATCH_ACTIONS = 50
+
+
+class BatchItemResultBase(BaseModel):
+    """Campos comunes del resultado de un item de un lote de acciones"""
+    index: int = Field(..., description="Posición del item en el lote")
+    user_id: str = Field(..., description="ID del usuario")
+    action_type: str = Field(..., description="Tipo de acción")
+    status_code: int = Field(..., description="Código HTTP que habría retornado /execute-action")
+    success: bool = Field(..., description="Indica si la acción fue exitosa")
+    error: Optional[dict] = Field(None, description="Error estándar (solo presente si la acción falló)")
+    replayed: bool = Field(False, description="Indica si el resultado es la respuesta almacenada de una ejecución anterior")
+
+
+class BatchResponseBase(BaseModel):
+    """Campos comunes de la respuesta de un lote de acciones"""
+    total: int = Field(..., description="Número de items del lote")
+    succeeded: int = Field(..., description="Número de items exitosos")
+    failed: int = Field(..., description="Número de items fallidos")
+
+
+class AmerikaBatchActionItem(AmerikaActionRequest):
+    """
+    Item de un lote de acciones de Amerika.
+    
+    action_type se valida por item al ejecutar (un item inválido no invalida el lote).
+    """
+    action_type: str = Field(..., description="Tipo de acción a ejecutar")
+    idempotency_key: Optional[str] = Field(
+        None, max_length=255, description="Clave de idempotencia del item (equivalente al header Idempotency-Key)"
+    )
+
+
+class AmerikaBatchActionRequest(BaseModel):
+    """Esquema para request de acciones de Amerika en lote"""
+    items: List[AmerikaBatchActionItem] = Field(
+        ..., min_length=1, max_length=MAX_BATCH_ACTIONS, description="Acciones a ejecutar"
+    )
+
+
+class AmerikaBatchItemResult(BatchItemResultBase):
+    """Resultado de un item de un lote de acciones de Amerika"""
+    response: Optional[AmerikaActionResponse] = Field(
+        None, description="Respuesta de la acción (solo presente si fue exitosa)"
+    )
+
+
+class AmerikaBatchActionResponse(BatchResponseBase):
+    """Esquema para respuesta de acciones de Amerika en lote"""
+    results: List[AmerikaBatchItemResult] = Field(..., description="Resultados en el orden de los items")
+
+
+class DominioBatchActionItem(DominioActionRequest):
+    """
+    Item de un lote de acciones de Dominio.
+    
+    action_type se valida por item al ejecutar (un item inválido no invalida el lote).
+    """
+    action_type: str = Field(..., description="Tipo de acción a ejecutar")
+    idempotency_key: Optional[str] = Field(
+        None, max_length=255, description="Clave de idempotencia del item (equivalente al header Idempotency-Key)"
+    )
+
+
+class DominioBatchActionRequest(BaseModel):
+    """Esquema para request de acciones de Dominio en lote"""
+    items: List[DominioBatchActionItem] = Field(
+        ..., min_length=1, max_length=MAX_BATCH_ACTIONS, description="Acciones a ejecutar"
+    )
+
+
+class DominioBatchItemResult(BatchItemResultBase):
+    """Resultado de un item de un lote de acciones de Dominio"""
+    response: Optional[DominioActionResponse] = Field(
+        None, description="Respuesta de la acción (solo presente si fue exitosa)"
+    )
+
+
+class DominioBatchActionResponse(BatchResponseBase):
+    """Esquema para respuesta de acciones de Dominio en lote"""
+    results: List[DominioBatchItemResult] = Field(..., description="Resultados en el orden de los items")
+
+
+# Esquemas de jobs asíncronos (mode=async)
+class JobAcceptedResponse(BaseModel):
+    """Respuesta 202 de un endpoint de acción ejecutado en modo asíncrono"""
+    job_id: str = Field(..., description="ID del job")
+    status: Literal["pending", "running", "succeeded", "failed"] = Field(..., description="Estado del job")
+    status_url: str = Field(..., description="URL para consultar el resultado (admite ?wait=<segundos>)")
+
+
+class JobStatusResponse(BaseModel):
+    """Estado y resultado de un job"""
+    job_id: str = Field(..., description="ID del job")
+    app_type: str = Field(..., description="Aplicación del job")
+    kind: Literal["action", "batch"] = Field(..., description="Tipo de trabajo (acción individual o lote)")
+    status: Literal["pending", "running", "succeeded", "failed"] = Field(..., description="Estado del job")
+    status_code: Optional[int] = Field(None, description="Código HTTP que habría retornado el endpoint síncrono")
+    response: Optional[dict] = Field(None, description="Respuesta del endpoint (solo si el job fue exitoso)")
+    error: Optional[dict] = Field(None, description="Error estándar (solo si el job falló)")
+    created_at: str = Field(..., description="Timestamp ISO8601 de creación")
+    finished_at: Optional[str] = Field(None, description="Timestamp ISO8601 de finalización")
+
+
 # ============================================================================
 # Esquemas para Mesa de Servicio (CRUD)
 # ============================================================================
@@ -175,17 +303,31 @@ class AIClassificationData(BaseModel):
 
 # Esquemas de Paginación
 class PaginationParams(BaseModel):
-    """Parámetros de paginación"""
+    """Parámetros de paginación (y vista) del listado"""
     limit: int = Field(default=50, ge=1, le=100, description="Número de items por página")
     offset: int = Field(default=0, ge=0, description="Número de items a saltar")
+    cursor: Optional[str] = Field(
+        default=None,
+        description="Cursor opaco (next_cursor de la página anterior); si se envía, se ignora offset",
+    )
+    count: Literal["exact", "capped", "none"] = Field(
+        default="exact",
+        description="Cálculo del total: exact (COUNT completo), capped (hasta LIST_COUNT_CAP) o none",
+    )
+    view: Literal["full", "summary"] = Field(
+        default="full",
+        description="full: solicitudes completas; summary: solo las columnas de la tabla, sin AI_CLASSIFICATION_DATA",
+    )
 
 
 class PaginationMeta(BaseModel):
     """Metadatos de paginación"""
-    total: int = Field(..., description="Total de items")
+    total: Optional[int] = Field(..., description="Total de items (None si count=none)")
     limit: int = Field(..., description="Número de items por página")
     offset: int = Field(..., description="Número de items saltados")
     has_more: bool = Field(..., description="Indica si hay más items disponibles")
+    total_capped: bool = Field(default=False, description="True si el total real es mayor que el informado (count=capped)")
+    next_cursor: Optional[str] = Field(default=None, description="Cursor para obtener la página siguiente")
 
 
 class PaginatedResponse(BaseModel, Generic[T]):
@@ -194,6 +336,45 @@ class PaginatedResponse(BaseModel, Generic[T]):
     pagination: PaginationMeta = Field(..., description="Metadatos de paginación")
 
 
+# Esquemas de sincronización incremental (GET /api/requests/changes)
+class ChangesParams(BaseModel):
+    """Parámetros de GET /api/requests/changes"""
+    since: Optional[str] = Field(
+        default=None,
+        description="Cursor de cambios (next_cursor de la respuesta anterior); sin since solo se retorna el cursor actual",
+    )
+    limit: int = Field(default=100, ge=1, le=500, description="Máximo de solicitudes cambiadas por respuesta")
+
+
+class ChangesResponse(BaseModel):
+    """Solicitudes cambiadas desde un cursor"""
+    items: List[RequestResponse] = Field(..., description="Solicitudes creadas o modificadas, de la más antigua a la más reciente (los cambios recientes pueden repetirse en la consulta siguiente: descartar por codpeticiones)")
+    next_cursor: str = Field(..., description="Cursor para la siguiente consulta de cambios")
+    has_more: bool = Field(..., description="Indica si hay más cambios pendientes (consultar de nuevo con next_cursor)")
+
+
+# Esquemas de exportación (GET /api/requests/export)
+class ExportParams(BaseModel):
+    """Parámetros de GET /api/requests/export"""
+    format: Literal["ndjson", "csv"] = Field(default="ndjson", description="Formato del archivo")
+    date_from: Optional[datetime] = Field(default=None, description="FESOLICITA desde (inclusive)")
+    date_to: Optional[datetime] = Field(default=None, description="FESOLICITA hasta (exclusive)")
+    codestado: Optional[List[int]] = Field(default=None, description="Estados a incluir (repetible: codestado=1&codestado=2)")
+    codcategoria: Optional[List[int]] = Field(default=None, description="Categorías a incluir (repetible)")
+    include_ai: bool = Field(default=False, description="Incluir campos de AI_CLASSIFICATION_DATA aplanados (ai_*)")
+
+    @model_validator(mode="after")
+    def validate_date_range(self):
+        # Fechas sin zona horaria se interpretan en UTC (FESOLICITA es timestamptz)
+        if self.date_from and self.date_from.tzinfo is None:
+            self.date_from = self.date_from.replace(tzinfo=timezone.utc)
+        if self.date_to and self.date_to.tzinfo is None:
+            self.date_to = self.date_to.replace(tzinfo=timezone.utc)
+        if self.date_from and self.date_to and self.date_from >= self.date_to:
+            raise ValueError("date_from debe ser anterior a date_to")
+        return self
+
+
 # Helper functions para conversión de estados
 def estado_to_text(codestado: Optional[int]) -> str:
     """
@@ -5,14 +5,24 @@ Simula las acciones que el Agente AI ejecutará.
 import asyncio
 import logging
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Literal, Optional, Tuple
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Query, Request, Response, status
 from app.models.schemas import (
     AmerikaActionRequest,
     AmerikaActionResponse,
+    AmerikaBatchActionItem,
+    AmerikaBatchActionRequest,
+    AmerikaBatchActionResponse,
+    AmerikaBatchItemResult,
+    JobAcceptedResponse,
+    JobStatusResponse,
     AmerikaPasswordResult,
     AmerikaAccountResult,
 )
 from app.services.auth_service import get_api_key
+from app.services.deadline_service import get_request_deadline, run_within_deadline
+from app.services.idempotency_service import IDEMPOTENCY_HEADER, REPLAYED_HEADER, execute_idempotent
+from app.services.job_service import accept_job, get_callback_url, get_job_status, job_store, run_job
 from app.services.password_service import generate_password_amerika
 from app.core.exceptions import create_error_response
 
@@ -20,31 +30,14 @@ router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
-@router.post(
-    "/execute-action",
-    response_model=AmerikaActionResponse,
-    status_code=status.HTTP_200_OK,
-    summary="Ejecutar acción de Amerika",
-    description="Ejecuta una acción simulada de la aplicación Amerika (generar contraseña, desbloquear/bloquear cuenta)",
-    responses={
-        200: {"description": "Acción ejecutada exitosamente"},
-        400: {"description": "Request inválido (action_type no reconocido)"},
-        401: {"description": "API Key inválida o faltante"},
-        422: {"description": "Validación de datos fallida"},
-        500: {"description": "Error interno del servidor"},
-    },
-)
-async def execute_action(
-    request: AmerikaActionRequest,
-    api_key: str = Depends(get_api_key),
-) -> AmerikaActionResponse:
+async def _run_action(request: AmerikaActionRequest) -> AmerikaActionResponse:
     """
     Ejecuta una acción de Amerika.
     
-    Acciones soportadas:
-    - generate_password: Genera nueva contraseña alfanumérica (10-25 caracteres)
-    - unlock_account: Desbloquea cuenta de usuario
-    - lock_account: Bloquea cuenta de usuario
+    Compartido por el endpoint individual y el de lote.
+    
+    Raises:
+        HTTPException: Si la acción no es válida o falla
     """
     try:
         # Validar action_type
@@ -134,3 +127,191 @@ async def execute_action(
             ),
         )
 
+
+async def _run_action_once(
+    request: AmerikaActionRequest,
+    idempotency_key: Optional[str],
+) -> Tuple[AmerikaActionResponse, bool]:
+    """
+    Ejecuta una acción una sola vez por clave de idempotencia.
+    
+    Returns:
+        Tupla (respuesta, replayed). replayed indica que la respuesta es la
+        almacenada de una ejecución anterior con la misma clave.
+    """
+    payload = request.model_dump(exclude={"idempotency_key"})
+    return await execute_idempotent(idempotency_key, "amerika", payload, lambda: _run_action(request))
+
+
+@router.post(
+    "/execute-action",
+    response_model=AmerikaActionResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Ejecutar acción de Amerika",
+    description="Ejecuta una acción simulada de la aplicación Amerika (generar contraseña, desbloquear/bloquear cuenta)",
+    responses={
+        200: {"description": "Acción ejecutada exitosamente"},
+        202: {"model": JobAcceptedResponse, "description": "Acción aceptada para ejecución asíncrona (mode=async)"},
+        400: {"description": "Request inválido (action_type no reconocido)"},
+        401: {"description": "API Key inválida o faltante"},
+        422: {"description": "Validación de datos fallida"},
+        500: {"description": "Error interno del servidor"},
+        504: {"description": "La acción no terminó dentro del tiempo indicado en X-Request-Deadline"},
+    },
+)
+async def execute_action(
+    request: AmerikaActionRequest,
+    http_request: Request,
+    http_response: Response,
+    background_tasks: BackgroundTasks,
+    mode: Literal["sync", "async"] = Query("sync", description="sync: espera el resultado; async: retorna 202 con un job_id"),
+    callback_url: Optional[str] = Depends(get_callback_url),
+    idempotency_key: Optional[str] = Header(
+        None,
+        alias=IDEMPOTENCY_HEADER,
+        max_length=255,
+        description="Clave de idempotencia: los reintentos con la misma clave retornan la respuesta original sin repetir la acción",
+    ),
+    deadline: Optional[float] = Depends(get_request_deadline),
+    api_key: str = Depends(get_api_key),
+) -> AmerikaActionResponse:
+    """
+    Ejecuta una acción de Amerika.
+    
+    Acciones soportadas:
+    - generate_password: Genera nueva contraseña alfanumérica (10-25 caracteres)
+    - unlock_account: Desbloquea cuenta de usuario
+    - lock_account: Bloquea cuenta de usuario
+    
+    Con el header Idempotency-Key la acción se ejecuta una sola vez: los
+    reintentos con la misma clave reciben la respuesta original con el
+    header Idempotent-Replayed: true.
+    
+    Con el header X-Request-Deadline (milisegundos) la acción se abandona
+    con 504 si no termina dentro del tiempo que el cliente esperará.
+    """
+    if mode == "async":
+        async def work() -> AmerikaActionResponse:
+            response, _ = await run_within_deadline(deadline, lambda: _run_action_once(request, idempotency_key))
+            return response
+        
+        job = job_store.create("amerika", "action", callback_url)
+        background_tasks.add_task(run_job, job, work)
+        return accept_job(job, http_request)
+    
+    response, replayed = await run_within_deadline(deadline, lambda: _run_action_once(request, idempotency_key))
+    if replayed:
+        http_response.headers[REPLAYED_HEADER] = "true"
+    return response
+
+
+async def _run_batch_item(
+    index: int,
+    item: AmerikaBatchActionItem,
+    deadline: Optional[float] = None,
+) -> AmerikaBatchItemResult:
+    """Ejecuta un item del lote y convierte errores en un resultado por item"""
+    try:
+        response, replayed = await run_within_deadline(
+            deadline, lambda: _run_action_once(item, item.idempotency_key)
+        )
+        return AmerikaBatchItemResult(
+            index=index,
+            user_id=item.user_id,
+            action_type=item.action_type,
+            status_code=status.HTTP_200_OK,
+            success=response.success,
+            response=response,
+            replayed=replayed,
+        )
+    except HTTPException as e:
+        return AmerikaBatchItemResult(
+            index=index,
+            user_id=item.user_id,
+            action_type=item.action_type,
+            status_code=e.status_code,
+            success=False,
+            error=e.detail if isinstance(e.detail, dict) else {"message": str(e.detail)},
+        )
+
+
+@router.post(
+    "/execute-actions",
+    response_model=AmerikaBatchActionResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Ejecutar acciones de Amerika en lote",
+    description="Ejecuta una lista de acciones simuladas de Amerika de forma concurrente y retorna el resultado de cada una",
+    responses={
+        200: {"description": "Lote procesado (revisar el resultado de cada item)"},
+        202: {"model": JobAcceptedResponse, "description": "Lote aceptado para ejecución asíncrona (mode=async)"},
+        401: {"description": "API Key inválida o faltante"},
+        422: {"description": "Validación de datos fallida (lote vacío o con más items de los permitidos)"},
+    },
+)
+async def execute_actions(
+    request: AmerikaBatchActionRequest,
+    http_request: Request,
+    background_tasks: BackgroundTasks,
+    mode: Literal["sync", "async"] = Query("sync", description="sync: espera el resultado; async: retorna 202 con un job_id"),
+    callback_url: Optional[str] = Depends(get_callback_url),
+    deadline: Optional[float] = Depends(get_request_deadline),
+    api_key: str = Depends(get_api_key),
+) -> AmerikaBatchActionResponse:
+    """
+    Ejecuta varias acciones (del mismo o de distintos usuarios) en una sola llamada.
+    
+    Los items se ejecutan concurrentemente. El error de un item no afecta a
+    los demás: cada resultado incluye el código HTTP y la respuesta o el
+    error que habría retornado /execute-action. Los resultados se retornan
+    en el mismo orden de los items. X-Request-Deadline aplica a cada item.
+    """
+    if mode == "async":
+        job = job_store.create("amerika", "batch", callback_url)
+        background_tasks.add_task(run_job, job, lambda: _run_batch(request, deadline))
+        return accept_job(job, http_request)
+    
+    return await _run_batch(request, deadline)
+
+
+async def _run_batch(
+    request: AmerikaBatchActionRequest,
+    deadline: Optional[float] = None,
+) -> AmerikaBatchActionResponse:
+    """Ejecuta todos los items del lote concurrentemente"""
+    results = await asyncio.gather(
+        *(_run_batch_item(index, item, deadline) for index, item in enumerate(request.items))
+    )
+    succeeded = sum(1 for result in results if result.success)
+    
+    return AmerikaBatchActionResponse(
+        results=list(results),
+        total=len(results),
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+    )
+
+
+@router.get(
+    "/jobs/{job_id}",
+    response_model=JobStatusResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Consultar job de Amerika",
+    description="Retorna el estado y resultado de una acción ejecutada con mode=async. Con ?wait=<segundos> espera a que termine (long-poll)",
+    responses={
+        200: {"description": "Estado del job"},
+        401: {"description": "API Key inválida o faltante"},
+        404: {"description": "Job no encontrado o expirado"},
+    },
+)
+async def get_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, description="Segundos máximos de espera a que el job termine"),
+    api_key: str = Depends(get_api_key),
+) -> JobStatusResponse:
+    """
+    Consulta un job asíncrono.
+    
+    Si el job no ha terminado y se indica `wait`, la respuesta se retiene
+    hasta que termine o se cumpla el tiempo (acotado a JOB_MAX_WAIT_SECONDS).
+    """
+    return await get_job_status("amerika", job_id, wait)
@@ -5,15 +5,25 @@ Simula las acciones que el Agente AI ejecutará.
 import asyncio
 import logging
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Literal, Optional, Tuple
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Query, Request, Response, status
 from app.models.schemas import (
     DominioActionRequest,
     DominioActionResponse,
+    DominioBatchActionItem,
+    DominioBatchActionRequest,
+    DominioBatchActionResponse,
+    DominioBatchItemResult,
+    JobAcceptedResponse,
+    JobStatusResponse,
     DominioFindUserResult,
     DominioPasswordResult,
     DominioAccountResult,
 )
 from app.services.auth_service import get_api_key
+from app.services.deadline_service import get_request_deadline, run_within_deadline
+from app.services.idempotency_service import IDEMPOTENCY_HEADER, REPLAYED_HEADER, execute_idempotent
+from app.services.job_service import accept_job, get_callback_url, get_job_status, job_store, run_job
 from app.services.password_service import generate_password_dominio
 from app.core.exceptions import create_error_response
 
@@ -21,31 +31,14 @@ router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
-@router.post(
-    "/execute-action",
-    response_model=DominioActionResponse,
-    status_code=status.HTTP_200_OK,
-    summary="Ejecutar acción de Dominio",
-    description="Ejecuta una acción simulada del dominio corporativo (buscar usuario, cambiar contraseña, desbloquear cuenta)",
-    responses={
-        200: {"description": "Acción ejecutada exitosamente"},
-        400: {"description": "Request inválido (action_type no reconocido, user_name faltante para find_user)"},
-        401: {"description": "API Key inválida o faltante"},
-        422: {"description": "Validación de datos fallida"},
-        500: {"description": "Error interno del servidor"},
-    },
-)
-async def execute_action(
-    request: DominioActionRequest,
-    api_key: str = Depends(get_api_key),
-) -> DominioActionResponse:
+async def _run_action(request: DominioActionRequest) -> DominioActionResponse:
     """
     Ejecuta una acción del dominio corporativo.
     
-    Acciones soportadas:
-    - find_user: Consulta usuario por nombre de funcionario
-    - change_password: Cambia contraseña (mínimo 10 caracteres, mayúsculas, minúsculas, números, símbolos opcionales)
-    - unlock_account: Desbloquea cuenta de usuario
+    Compartido por el endpoint individual y el de lote.
+    
+    Raises:
+        HTTPException: Si la acción no es válida o falla
     """
     try:
         # Validar action_type
@@ -174,3 +167,191 @@ async def execute_action(
             ),
         )
 
+
+async def _run_action_once(
+    request: DominioActionRequest,
+    idempotency_key: Optional[str],
+) -> Tuple[DominioActionResponse, bool]:
+    """
+    Ejecuta una acción una sola vez por clave de idempotencia.
+    
+    Returns:
+        Tupla (respuesta, replayed). replayed indica que la respuesta es la
+        almacenada de una ejecución anterior con la misma clave.
+    """
+    payload = request.model_dump(exclude={"idempotency_key"})
+    return await execute_idempotent(idempotency_key, "dominio", payload, lambda: _run_action(request))
+
+
+@router.post(
+    "/execute-action",
+    response_model=DominioActionResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Ejecutar acción de Dominio",
+    description="Ejecuta una acción simulada del dominio corporativo (buscar usuario, cambiar contraseña, desbloquear cuenta)",
+    responses={
+        200: {"description": "Acción ejecutada exitosamente"},
+        202: {"model": JobAcceptedResponse, "description": "Acción aceptada para ejecución asíncrona (mode=async)"},
+        400: {"description": "Request inválido (action_type no reconocido, user_name faltante para find_user)"},
+        401: {"description": "API Key inválida o faltante"},
+        422: {"description": "Validación de datos fallida"},
+        500: {"description": "Error interno del servidor"},
+        504: {"description": "La acción no terminó dentro del tiempo indicado en X-Request-Deadline"},
+    },
+)
+async def execute_action(
+    request: DominioActionRequest,
+    http_request: Request,
+    http_response: Response,
+    background_tasks: BackgroundTasks,
+    mode: Literal["sync", "async"] = Query("sync", description="sync: espera el resultado; async: retorna 202 con un job_id"),
+    callback_url: Optional[str] = Depends(get_callback_url),
+    idempotency_key: Optional[str] = Header(
+        None,
+        alias=IDEMPOTENCY_HEADER,
+        max_length=255,
+        description="Clave de idempotencia: los reintentos con la misma clave retornan la respuesta original sin repetir la acción",
+    ),
+    deadline: Optional[float] = Depends(get_request_deadline),
+    api_key: str = Depends(get_api_key),
+) -> DominioActionResponse:
+    """
+    Ejecuta una acción del dominio corporativo.
+    
+    Acciones soportadas:
+    - find_user: Consulta usuario por nombre de funcionario
+    - change_password: Cambia contraseña (mínimo 10 caracteres, mayúsculas, minúsculas, números, símbolos opcionales)
+    - unlock_account: Desbloquea cuenta de usuario
+    
+    Con el header Idempotency-Key la acción se ejecuta una sola vez: los
+    reintentos con la misma clave reciben la respuesta original con el
+    header Idempotent-Replayed: true.
+    
+    Con el header X-Request-Deadline (milisegundos) la acción se abandona
+    con 504 si no termina dentro del tiempo que el cliente esperará.
+    """
+    if mode == "async":
+        async def work() -> DominioActionResponse:
+            response, _ = await run_within_deadline(deadline, lambda: _run_action_once(request, idempotency_key))
+            return response
+        
+        job = job_store.create("dominio", "action", callback_url)
+        background_tasks.add_task(run_job, job, work)
+        return accept_job(job, http_request)
+    
+    response, replayed = await run_within_deadline(deadline, lambda: _run_action_once(request, idempotency_key))
+    if replayed:
+        http_response.headers[REPLAYED_HEADER] = "true"
+    return response
+
+
+async def _run_batch_item(
+    index: int,
+    item: DominioBatchActionItem,
+    deadline: Optional[float] = None,
+) -> DominioBatchItemResult:
+    """Ejecuta un item del lote y convierte errores en un resultado por item"""
+    try:
+        response, replayed = await run_within_deadline(
+            deadline, lambda: _run_action_once(item, item.idempotency_key)
+        )
+        return DominioBatchItemResult(
+            index=index,
+            user_id=item.user_id,
+            action_type=item.action_type,
+            status_code=status.HTTP_200_OK,
+            success=response.success,
+            response=response,
+            replayed=replayed,
+        )
+    except HTTPException as e:
+        return DominioBatchItemResult(
+            index=index,
+            user_id=item.user_id,
+            action_type=item.action_type,
+            status_code=e.status_code,
+            success=False,
+            error=e.detail if isinstance(e.detail, dict) else {"message": str(e.detail)},
+        )
+
+
+@router.post(
+    "/execute-actions",
+    response_model=DominioBatchActionResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Ejecutar acciones de Dominio en lote",
+    description="Ejecuta una lista de acciones simuladas del dominio corporativo de forma concurrente y retorna el resultado de cada una",
+    responses={
+        200: {"description": "Lote procesado (revisar el resultado de cada item)"},
+        202: {"model": JobAcceptedResponse, "description": "Lote aceptado para ejecución asíncrona (mode=async)"},
+        401: {"description": "API Key inválida o faltante"},
+        422: {"description": "Validación de datos fallida (lote vacío o con más items de los permitidos)"},
+    },
+)
+async def execute_actions(
+    request: DominioBatchActionRequest,
+    http_request: Request,
+    background_tasks: BackgroundTasks,
+    mode: Literal["sync", "async"] = Query("sync", description="sync: espera el resultado; async: retorna 202 con un job_id"),
+    callback_url: Optional[str] = Depends(get_callback_url),
+    deadline: Optional[float] = Depends(get_request_deadline),
+    api_key: str = Depends(get_api_key),
+) -> DominioBatchActionResponse:
+    """
+    Ejecuta varias acciones (del mismo o de distintos usuarios) en una sola llamada.
+    
+    Los items se ejecutan concurrentemente. El error de un item no afecta a
+    los demás: cada resultado incluye el código HTTP y la respuesta o el
+    error que habría retornado /execute-action. Los resultados se retornan
+    en el mismo orden de los items. X-Request-Deadline aplica a cada item.
+    """
+    if mode == "async":
+        job = job_store.create("dominio", "batch", callback_url)
+        background_tasks.add_task(run_job, job, lambda: _run_batch(request, deadline))
+        return accept_job(job, http_request)
+    
+    return await _run_batch(request, deadline)
+
+
+async def _run_batch(
+    request: DominioBatchActionRequest,
+    deadline: Optional[float] = None,
+) -> DominioBatchActionResponse:
+    """Ejecuta todos los items del lote concurrentemente"""
+    results = await asyncio.gather(
+        *(_run_batch_item(index, item, deadline) for index, item in enumerate(request.items))
+    )
+    succeeded = sum(1 for result in results if result.success)
+    
+    return DominioBatchActionResponse(
+        results=list(results),
+        total=len(results),
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+    )
+
+
+@router.get(
+    "/jobs/{job_id}",
+    response_model=JobStatusResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Consultar job de Dominio",
+    description="Retorna el estado y resultado de una acción ejecutada con mode=async. Con ?wait=<segundos> espera a que termine (long-poll)",
+    responses={
+        200: {"description": "Estado del job"},
+        401: {"description": "API Key inválida o faltante"},
+        404: {"description": "Job no encontrado o expirado"},
+    },
+)
+async def get_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, description="Segundos máximos de espera a que el job termine"),
+    api_key: str = Depends(get_api_key),
+) -> JobStatusResponse:
+    """
+    Consulta un job asíncrono.
+    
+    Si el job no ha terminado y se indica `wait`, la respuesta se retiene
+    hasta que termine o se cumpla el tiempo (acotado a JOB_MAX_WAIT_SECONDS).
+    """
+    return await get_job_status("dominio", job_id, wait)
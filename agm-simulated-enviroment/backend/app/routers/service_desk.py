@@ -2,25 +2,48 @@
 Router para endpoints CRUD de Mesa de Servicio.
 """
 import logging
+import time
 from datetime import datetime
-from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import select, func
+from typing import Annotated, Optional, Union
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.exc import OperationalError, DatabaseError
+from sqlalchemy.exc import OperationalError, DatabaseError, IntegrityError
 import asyncpg
 from app.db.base import get_db
-from app.models.entities import Request, Category
+from app.models.entities import Request
 from app.models.schemas import (
+    ChangesParams,
+    ChangesResponse,
+    ExportParams,
     RequestCreate,
     RequestResponse,
+    RequestSummary,
     RequestUpdate,
     PaginationParams,
     PaginatedResponse,
     PaginationMeta,
 )
-from app.services.auth_service import get_current_user
-from app.services.validation_service import validate_state_transition
+from app.services.auth_service import get_api_key, get_current_user
+from app.services.cache_service import response_cache
+from app.services.change_feed_service import change_feed_hub, stream_events
+from app.services.etag_service import CACHE_CONTROL, compute_etag, etag_matches, not_modified, row_version
+from app.services.export_service import MEDIA_TYPES, build_export_query, stream_export
+from app.services.validation_service import allowed_previous_states
+from app.services.pagination_service import (
+    CHANGES_START,
+    COUNT_CAPPED,
+    VIEW_SUMMARY,
+    build_changes_query,
+    build_changes_watermark_query,
+    build_count_query,
+    build_list_query,
+    cap_changes_cursor,
+    decode_cursor,
+    encode_cursor,
+)
+from app.core.config import settings
 from app.core.exceptions import (
     RequestNotFoundError,
     ForbiddenError,
@@ -30,90 +53,170 @@ from app.core.exceptions import (
 
 router = APIRouter()
 
-# Cache simple en memoria para categorías válidas
-_valid_categories_cache: dict[int, bool] = {}
-
 
-async def verify_category_exists(
-    session: AsyncSession,
-    codcategoria: int,
-) -> bool:
+def _cached_response(kind: str, cached: str, started: float, if_none_match: Optional[str]) -> Response:
     """
-    Verifica si una categoría existe en la BD.
-    Usa cache en memoria para optimizar.
+    Respuesta servida desde el cache (registra el acierto y su latencia).
+
+    El cache guarda "<ETag>\n<cuerpo>": si If-None-Match coincide se responde
+    304 sin cuerpo.
     """
-    # Verificar cache primero
-    if codcategoria in _valid_categories_cache:
-        return _valid_categories_cache[codcategoria]
-    
-    # Consultar BD
-    result = await session.execute(
-        select(Category).where(Category.codcategoria == codcategoria)
+    etag, _, body = cached.partition("\n")
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    response_cache.record(kind, True, elapsed_ms)
+    headers = {"Server-Timing": f"cache;desc=hit;dur={elapsed_ms:.1f}", "X-Cache": "HIT"}
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, headers)
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={**headers, "ETag": etag, "Cache-Control": CACHE_CONTROL},
     )
-    category = result.scalar_one_or_none()
-    
-    exists = category is not None
-    _valid_categories_cache[codcategoria] = exists
-    
-    return exists
 
 
 @router.get(
     "",
-    response_model=PaginatedResponse[RequestResponse],
+    response_model=Union[PaginatedResponse[RequestResponse], PaginatedResponse[RequestSummary]],
     status_code=status.HTTP_200_OK,
     summary="Listar solicitudes",
-    description="Lista las solicitudes del usuario autenticado con paginación",
+    description="Lista las solicitudes del usuario autenticado con paginación por offset o por cursor (view=summary omite AI_CLASSIFICATION_DATA)",
     responses={
         200: {"description": "Lista de solicitudes obtenida exitosamente"},
+        304: {"description": "La página no cambió desde el ETag enviado en If-None-Match"},
         401: {"description": "Token JWT inválido, expirado o faltante"},
+        422: {"description": "Cursor inválido"},
     },
 )
 async def list_requests(
     pagination: Annotated[PaginationParams, Query()] = PaginationParams(),
+    if_none_match: Optional[str] = Header(None),
     current_user: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
-) -> PaginatedResponse[RequestResponse]:
+) -> Response:
     """
     Lista las solicitudes del usuario autenticado con paginación.
+    
+    - Modo offset (compatibilidad): `limit` + `offset`.
+    - Modo cursor: `cursor` = `next_cursor` de la página anterior. El costo
+      no crece con la profundidad de la página.
+    
+    `count` controla el total: `exact` (default), `capped` (cuenta hasta
+    LIST_COUNT_CAP; `total_capped` indica si hay más) o `none`.
+    
+    `view=summary` selecciona solo las columnas de la tabla (RequestSummary);
+    el detalle completo se obtiene de GET /api/requests/{id}. El header
+    Server-Timing informa el tiempo de consultas (db) y de serialización.
+    
+    La respuesta se cachea por usuario y parámetros (ver cache_service);
+    X-Cache indica HIT o MISS.
+    
+    Incluye ETag (ver etag_service). Con If-None-Match solo se consultan el
+    total y el último cambio del usuario y, si no cambiaron, se responde 304
+    sin cuerpo.
     """
     try:
+        started = time.perf_counter()
         ususolicita = current_user["ususolicita"]
+        view = pagination.view
+        scope = f"list:{pagination.model_dump_json()}"
         
-        # Calcular total antes de aplicar limit/offset
-        count_result = await db.execute(
-            select(func.count()).select_from(Request).where(
-                Request.ususolicita == ususolicita
-            )
-        )
-        total = count_result.scalar() or 0
+        cache_key = await response_cache.key(ususolicita, scope)
+        cached = await response_cache.get(cache_key)
+        if cached is not None:
+            return _cached_response("list", cached, started, if_none_match)
         
         # Aplicar limit máximo de 100
         limit = min(pagination.limit, 100)
         offset = pagination.offset
         
-        # Obtener solicitudes
-        result = await db.execute(
-            select(Request)
-            .where(Request.ususolicita == ususolicita)
-            .order_by(Request.fesolicita.desc())
-            .limit(limit)
-            .offset(offset)
+        cursor = None
+        if pagination.cursor:
+            try:
+                cursor = decode_cursor(pagination.cursor)
+            except ValueError as e:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail=create_error_response(
+                        error_code="invalid_cursor",
+                        message="El cursor de paginación no es válido.",
+                        detail=str(e),
+                        action_suggestion="Vuelve a cargar la primera página.",
+                    ),
+                )
+            offset = 0
+        
+        # Calcular total según el modo solicitado
+        total = None
+        total_capped = False
+        count_query = build_count_query(ususolicita, pagination.count, settings.LIST_COUNT_CAP)
+        if count_query is not None:
+            count_result = await db.execute(count_query)
+            total = count_result.scalar() or 0
+            if pagination.count == COUNT_CAPPED and total > settings.LIST_COUNT_CAP:
+                total = settings.LIST_COUNT_CAP
+                total_capped = True
+        
+        # Versión del listado: último cambio del usuario (antes de leer la página,
+        # así un cambio concurrente nunca queda oculto tras un ETag más nuevo)
+        version_result = await db.execute(build_changes_watermark_query(ususolicita))
+        last_change = version_result.one_or_none()
+        etag = compute_etag(
+            scope,
+            [row_version(last_change.updated_at, last_change.codpeticiones) if last_change else ""],
+            total,
+            total_capped,
         )
-        requests = result.scalars().all()
+        if etag_matches(if_none_match, etag):
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            response_cache.record("list", False, elapsed_ms)
+            return not_modified(etag, {"Server-Timing": f"db;dur={elapsed_ms:.1f}", "X-Cache": "MISS"})
+        
+        # Obtener solicitudes (una fila extra indica si hay más páginas)
+        list_query = build_list_query(ususolicita, limit, offset, cursor, view)
+        result = await db.execute(list_query)
+        requests = result.all() if view == VIEW_SUMMARY else result.scalars().all()
+        has_more = len(requests) > limit
+        requests = requests[:limit]
+        
+        next_cursor = None
+        if has_more:
+            last = requests[-1]
+            next_cursor = encode_cursor(last.fesolicita, last.codpeticiones)
         
-        # Calcular has_more
-        has_more = (offset + limit) < total
+        db_ms = (time.perf_counter() - started) * 1000
         
-        # Si no hay solicitudes, devolver una respuesta vacía exitosa
-        return PaginatedResponse(
-            items=[RequestResponse.model_validate(req) for req in requests],
+        # Serializar aquí (y no en FastAPI) para medir el costo de la página.
+        # Si no hay solicitudes, se devuelve una respuesta vacía exitosa
+        serialize_started = time.perf_counter()
+        item_schema = RequestSummary if view == VIEW_SUMMARY else RequestResponse
+        body = PaginatedResponse[item_schema](
+            items=[item_schema.model_validate(req) for req in requests],
             pagination=PaginationMeta(
                 total=total,
                 limit=limit,
                 offset=offset,
                 has_more=has_more,
+                total_capped=total_capped,
+                next_cursor=next_cursor,
             ),
+        ).model_dump_json()
+        serialize_ms = (time.perf_counter() - serialize_started) * 1000
+        
+        logging.getLogger(__name__).debug(
+            f"Listado view={view}: {len(requests)} solicitudes, {len(body)} bytes, "
+            f"db {db_ms:.1f} ms, serialización {serialize_ms:.1f} ms"
+        )
+        await response_cache.set(cache_key, f"{etag}\n{body}")
+        response_cache.record("list", False, (time.perf_counter() - started) * 1000)
+        return Response(
+            content=body,
+            media_type="application/json",
+            headers={
+                "Server-Timing": f"db;dur={db_ms:.1f}, serialize;dur={serialize_ms:.1f}",
+                "X-Cache": "MISS",
+                "ETag": etag,
+                "Cache-Control": CACHE_CONTROL,
+            },
         )
     except Exception as e:
         # Log del error para debugging
@@ -170,6 +273,180 @@ async def list_requests(
         )
 
 
+@router.get(
+    "/changes",
+    response_model=ChangesResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Cambios desde un cursor",
+    description="Retorna solo las solicitudes del usuario creadas o modificadas desde el cursor `since` y el cursor siguiente",
+    responses={
+        200: {"description": "Cambios obtenidos exitosamente (items vacío si no hubo cambios)"},
+        401: {"description": "Token JWT inválido, expirado o faltante"},
+        422: {"description": "Cursor inválido"},
+    },
+)
+async def list_request_changes(
+    params: Annotated[ChangesParams, Query()] = ChangesParams(),
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> ChangesResponse:
+    """
+    Sincronización incremental del listado.
+    
+    El cliente carga el listado una vez y, ante cada notificación de
+    Realtime, pide solo las filas cambiadas desde su último cursor en lugar
+    de volver a pedir la página completa. UPDATED_AT lo mantiene un trigger
+    (migración 004), así que incluye los cambios del agente.
+    
+    - Sin `since`: no retorna solicitudes, solo el cursor del último cambio
+      (pedirlo antes de cargar el listado para no perder cambios intermedios).
+    - Con `since`: solicitudes con (UPDATED_AT, CODPETICIONES) posterior al
+      cursor, de la más antigua a la más reciente. Si `has_more`, consultar
+      de nuevo con `next_cursor`.
+    
+    El cursor no avanza más allá de now() - CHANGES_OVERLAP_SECONDS: una
+    escritura confirmada después de otra más reciente no se pierde, pero
+    los cambios de ese margen se repiten en la consulta siguiente. El
+    cliente debe descartar repetidos por codpeticiones (conservar el de
+    mayor updated_at).
+    
+    Las eliminaciones no se informan (las solicitudes no se eliminan desde la API).
+    """
+    try:
+        ususolicita = current_user["ususolicita"]
+        
+        if params.since is None:
+            result = await db.execute(build_changes_watermark_query(ususolicita))
+            last = result.one_or_none()
+            watermark = CHANGES_START
+            if last is not None:
+                watermark = cap_changes_cursor((last.updated_at, last.codpeticiones), last.db_now)
+            return ChangesResponse(items=[], next_cursor=encode_cursor(*watermark), has_more=False)
+        
+        try:
+            since = decode_cursor(params.since)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=create_error_response(
+                    error_code="invalid_cursor",
+                    message="El cursor de cambios no es válido.",
+                    detail=str(e),
+                    action_suggestion="Vuelve a cargar el listado de solicitudes.",
+                ),
+            )
+        
+        result = await db.execute(build_changes_query(ususolicita, params.limit, since))
+        rows = result.all()
+        has_more = len(rows) > params.limit
+        changed = [row.Request for row in rows[:params.limit]]
+        
+        # Sin cambios el cursor no avanza. Entre páginas (has_more) avanza a
+        # la última fila; en la última página se limita al margen de
+        # CHANGES_OVERLAP_SECONDS, que la consulta siguiente vuelve a leer
+        next_cursor = params.since
+        if changed:
+            position = (changed[-1].updated_at, changed[-1].codpeticiones)
+            if not has_more:
+                position = cap_changes_cursor(position, rows[0].db_now)
+            next_cursor = encode_cursor(*position)
+        
+        return ChangesResponse(
+            items=[RequestResponse.model_validate(req) for req in changed],
+            next_cursor=next_cursor,
+            has_more=has_more,
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger = logging.getLogger(__name__)
+        logger.error(f"Error al obtener cambios de solicitudes: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=create_error_response(
+                error_code="internal_server_error",
+                message="Ocurrió un error al obtener los cambios de las solicitudes.",
+                detail=f"Error técnico: {str(e)}",
+                action_suggestion="Intenta nuevamente en unos minutos. Si el problema persiste, contacta al soporte.",
+            ),
+        )
+
+
+@router.get(
+    "/events",
+    status_code=status.HTTP_200_OK,
+    summary="Stream de cambios (SSE)",
+    description="Server-Sent Events con los cambios de las solicitudes del usuario autenticado",
+    response_class=StreamingResponse,
+    responses={
+        200: {"description": "Stream text/event-stream (eventos request_changed y resync)"},
+        401: {"description": "Token JWT inválido, expirado o faltante"},
+        503: {"description": "Feed de cambios deshabilitado o sin capacidad"},
+    },
+)
+async def stream_request_events(
+    current_user: dict = Depends(get_current_user),
+) -> StreamingResponse:
+    """
+    Stream SSE de cambios de las solicitudes del usuario.
+    
+    Reemplaza la suscripción de cada dashboard a Supabase Realtime: el backend
+    escucha una sola vez los cambios (ver change_feed_service) y envía a cada
+    conexión solo los de su usuario.
+    
+    - `request_changed`: {op, codpeticiones, codestado, updated_at}; la fila
+      completa se obtiene con GET /api/requests/changes.
+    - `resync`: se perdieron eventos (cliente lento o reconexión del feed);
+      sincronizar con GET /api/requests/changes desde el último cursor.
+    
+    Como EventSource no permite el header Authorization, el cliente lee el
+    stream con fetch.
+    """
+    change_feed_hub.ensure_available()
+    return StreamingResponse(
+        stream_events(change_feed_hub, current_user["ususolicita"]),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get(
+    "/export",
+    status_code=status.HTTP_200_OK,
+    summary="Exportar solicitudes",
+    description="Exporta en streaming las solicitudes del usuario autenticado como NDJSON o CSV, con filtros por fecha, estado y categoría",
+    response_class=StreamingResponse,
+    responses={
+        200: {"description": "Archivo NDJSON (application/x-ndjson) o CSV (text/csv)"},
+        401: {"description": "Token JWT inválido, expirado o faltante"},
+        422: {"description": "Parámetros inválidos (formato, fechas)"},
+    },
+)
+async def export_requests(
+    params: Annotated[ExportParams, Query()] = ExportParams(),
+    current_user: dict = Depends(get_current_user),
+) -> StreamingResponse:
+    """
+    Exporta las solicitudes del usuario para auditoría.
+    
+    A diferencia del listado, no pagina ni cuenta: las filas se leen con un
+    cursor del servidor en lotes de EXPORT_BATCH_SIZE y se envían a medida
+    que se leen, con memoria constante (ver export_service). Orden:
+    FESOLICITA ascendente.
+    
+    `include_ai=true` agrega ai_app_type, ai_confidence,
+    ai_classification_timestamp y ai_detected_actions (en CSV, separadas por ';').
+    """
+    query = build_export_query(current_user["ususolicita"], params)
+    filename = f"solicitudes_{datetime.utcnow():%Y%m%d_%H%M%S}.{params.format}"
+    return StreamingResponse(
+        stream_export(query, params.format),
+        media_type=MEDIA_TYPES[params.format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 @router.post(
     "",
     response_model=RequestResponse,
@@ -189,39 +466,42 @@ async def create_request(
 ) -> RequestResponse:
     """
     Crea una nueva solicitud de mesa de servicio.
+    
+    Un único INSERT ... RETURNING: la existencia de la categoría la valida la
+    FK de CODCATEGORIA (una violación se responde como 422 category_not_found).
     """
     ususolicita = current_user["ususolicita"]
     
     try:
-        # Verificar que la categoría existe
-        category_exists = await verify_category_exists(db, request_data.codcategoria)
-        if not category_exists:
-            raise HTTPException(
-                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-                detail=create_error_response(
+        try:
+            result = await db.execute(
+                insert(Request)
+                .values(
+                    codcategoria=request_data.codcategoria,
+                    description=request_data.description,
+                    ususolicita=ususolicita,
+                    codestado=1,  # PENDIENTE por defecto
+                    fesolicita=datetime.utcnow(),
+                )
+                .returning(Request)
+            )
+            new_request = result.scalar_one()
+            await db.commit()
+            await response_cache.invalidate_user(ususolicita)
+        except IntegrityError as e:
+            await db.rollback()
+            if isinstance(e.orig.__cause__, asyncpg.exceptions.ForeignKeyViolationError):
+                raise ValidationError(
+                    f"Categoría {request_data.codcategoria} no existe",
                     error_code="category_not_found",
-                    message=f"La categoría seleccionada no existe.",
-                    detail=f"Categoría {request_data.codcategoria} no existe",
+                    message="La categoría seleccionada no existe.",
                     action_suggestion="Selecciona una categoría válida de la lista disponible.",
-                ),
-            )
-        
-        # Crear nueva solicitud
-        new_request = Request(
-            codcategoria=request_data.codcategoria,
-            description=request_data.description,
-            ususolicita=ususolicita,
-            codestado=1,  # PENDIENTE por defecto
-            fesolicita=datetime.utcnow(),
-        )
-        
-        db.add(new_request)
-        await db.commit()
-        await db.refresh(new_request)
+                ) from e
+            raise
         
         return RequestResponse.model_validate(new_request)
         
-    except HTTPException:
+    except (HTTPException, ValidationError):
         raise
     except Exception as e:
         logger = logging.getLogger(__name__)
@@ -245,6 +525,7 @@ async def create_request(
     description="Obtiene una solicitud específica (solo si pertenece al usuario)",
     responses={
         200: {"description": "Solicitud obtenida exitosamente"},
+        304: {"description": "La solicitud no cambió desde el ETag enviado en If-None-Match"},
         401: {"description": "Token JWT inválido, expirado o faltante"},
         403: {"description": "Acceso denegado (solicitud no pertenece al usuario)"},
         404: {"description": "Solicitud no encontrada"},
@@ -252,19 +533,42 @@ async def create_request(
 )
 async def get_request(
     request_id: int,
+    if_none_match: Optional[str] = Header(None),
     current_user: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
-) -> RequestResponse:
+) -> Response:
     """
     Obtiene una solicitud específica.
     Solo permite acceso si la solicitud pertenece al usuario autenticado.
+    
+    La respuesta se cachea por usuario (ver cache_service); X-Cache indica HIT o MISS.
+    
+    Incluye ETag; con If-None-Match se consulta solo la versión de la fila
+    (UPDATED_AT) y, si no cambió, se responde 304 sin cuerpo.
     """
     try:
+        started = time.perf_counter()
         ususolicita = current_user["ususolicita"]
+        scope = f"detail:{request_id}"
         
-        result = await db.execute(
-            select(Request).where(Request.codpeticiones == request_id)
-        )
+        cache_key = await response_cache.key(ususolicita, scope)
+        cached = await response_cache.get(cache_key)
+        if cached is not None:
+            return _cached_response("detail", cached, started, if_none_match)
+        
+        # Revalidación: solo la versión de la fila (404/403 los resuelve la lectura completa)
+        if if_none_match:
+            result = await db.execute(
+                select(Request.ususolicita, Request.updated_at).where(Request.codpeticiones == request_id)
+            )
+            current = result.one_or_none()
+            if current is not None and current.ususolicita == ususolicita:
+                etag = compute_etag(scope, [row_version(current.updated_at, request_id)])
+                if etag_matches(if_none_match, etag):
+                    response_cache.record("detail", False, (time.perf_counter() - started) * 1000)
+                    return not_modified(etag, {"X-Cache": "MISS"})
+        
+        result = await db.execute(select(Request).where(Request.codpeticiones == request_id))
         request = result.scalar_one_or_none()
         
         if not request:
@@ -289,7 +593,15 @@ async def get_request(
                 ),
             )
         
-        return RequestResponse.model_validate(request)
+        etag = compute_etag(scope, [row_version(request.updated_at, request.codpeticiones)])
+        body = RequestResponse.model_validate(request).model_dump_json()
+        await response_cache.set(cache_key, f"{etag}\n{body}")
+        response_cache.record("detail", False, (time.perf_counter() - started) * 1000)
+        return Response(
+            content=body,
+            media_type="application/json",
+            headers={"X-Cache": "MISS", "ETag": etag, "Cache-Control": CACHE_CONTROL},
+        )
         
     except HTTPException:
         raise
@@ -330,16 +642,46 @@ async def update_request(
     """
     Actualiza una solicitud.
     Solo permite actualizar campos específicos y solo si la solicitud pertenece al usuario.
+    
+    Un único UPDATE ... WHERE dueño AND transición permitida ... RETURNING.
+    Solo si no actualiza ninguna fila se lee la solicitud para distinguir
+    404, 403 y 422.
     """
     try:
         ususolicita = current_user["ususolicita"]
         
-        result = await db.execute(
-            select(Request).where(Request.codpeticiones == request_id)
+        # Campos permitidos (codmotcierre no se actualiza desde la API)
+        values = request_data.model_dump(
+            include={"codestado", "solucion", "fesolucion", "codusolucion", "feccierre", "ai_classification_data"},
+            exclude_none=True,
         )
+        conditions = [Request.codpeticiones == request_id, Request.ususolicita == ususolicita]
+        if request_data.codestado is not None:
+            allowed = allowed_previous_states(request_data.codestado)
+            conditions.append(func.coalesce(Request.codestado, 1).in_(allowed))
+        
+        if values:
+            result = await db.execute(
+                update(Request).where(*conditions).values(**values).returning(Request)
+            )
+        else:
+            result = await db.execute(select(Request).where(*conditions))
         request = result.scalar_one_or_none()
         
-        if not request:
+        if request is not None:
+            await db.commit()
+            if values:
+                await response_cache.invalidate_user(ususolicita)
+            return RequestResponse.model_validate(request)
+        
+        # Ninguna fila actualizada: determinar la causa
+        await db.rollback()
+        result = await db.execute(
+            select(Request.ususolicita, Request.codestado).where(Request.codpeticiones == request_id)
+        )
+        current = result.one_or_none()
+        
+        if current is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=create_error_response(
@@ -350,7 +692,7 @@ async def update_request(
                 ),
             )
         
-        if request.ususolicita != ususolicita:
+        if current.ususolicita != ususolicita:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=create_error_response(
@@ -361,41 +703,16 @@ async def update_request(
                 ),
             )
         
-        # Validar transición de estado si se actualiza codestado
-        if request_data.codestado is not None:
-            current_state = request.codestado or 1
-            if not validate_state_transition(current_state, request_data.codestado):
-                raise HTTPException(
-                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-                    detail=create_error_response(
-                        error_code="invalid_state_transition",
-                        message="La transición de estado solicitada no está permitida.",
-                        detail=f"Transición de estado no permitida: {current_state} → {request_data.codestado}",
-                        action_suggestion="Verifica que la transición de estado sea válida. Los estados solo pueden avanzar de Pendiente → En Trámite → Solucionado.",
-                    ),
-                )
-            request.codestado = request_data.codestado
-        
-        # Actualizar otros campos permitidos
-        if request_data.solucion is not None:
-            request.solucion = request_data.solucion
-        
-        if request_data.fesolucion is not None:
-            request.fesolucion = request_data.fesolucion
-        
-        if request_data.codusolucion is not None:
-            request.codusolucion = request_data.codusolucion
-        
-        if request_data.feccierre is not None:
-            request.feccierre = request_data.feccierre
-        
-        if request_data.ai_classification_data is not None:
-            request.ai_classification_data = request_data.ai_classification_data
-        
-        await db.commit()
-        await db.refresh(request)
-        
-        return RequestResponse.model_validate(request)
+        current_state = current.codestado or 1
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=create_error_response(
+                error_code="invalid_state_transition",
+                message="La transición de estado solicitada no está permitida.",
+                detail=f"Transición de estado no permitida: {current_state} → {request_data.codestado}",
+                action_suggestion="Verifica que la transición de estado sea válida. Los estados solo pueden avanzar de Pendiente → En Trámite → Solucionado.",
+            ),
+        )
         
     except HTTPException:
         raise
@@ -412,3 +729,33 @@ async def update_request(
             ),
         )
 
+
+@router.post(
+    "/{request_id}/cache/invalidate",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Invalidar cache de una solicitud",
+    description="Hook para el agente: invalida las respuestas cacheadas del dueño de la solicitud tras actualizarla fuera de la API (requiere API Key)",
+    responses={
+        204: {"description": "Cache invalidado (o no había nada que invalidar)"},
+        401: {"description": "API Key inválida o faltante"},
+    },
+)
+async def invalidate_request_cache(
+    request_id: int,
+    api_key: str = Depends(get_api_key),
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    """
+    Invalida el cache del dueño de la solicitud.
+    
+    El agente actualiza HLP_PETICIONES directamente en Supabase, sin pasar por
+    PATCH /api/requests/{id}; llama a este endpoint después de cada
+    actualización para que el listado y el detalle no sirvan datos viejos.
+    """
+    result = await db.execute(
+        select(Request.ususolicita).where(Request.codpeticiones == request_id)
+    )
+    ususolicita = result.scalar_one_or_none()
+    if ususolicita is not None:
+        await response_cache.invalidate_user(ususolicita)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,152 @@
+"""
+Caches de autenticación para get_current_user.
+
+- PrincipalCache: LRU acotado de principals ya verificados, indexado por el
+  hash del token y vigente hasta el `exp` del propio token. Un token conocido
+  no se vuelve a decodificar ni a validar.
+- JWKSCache: conjunto de llaves públicas (JWKS) de Supabase para tokens
+  firmados con algoritmos asimétricos (RS256/ES256). Se descarga una vez y se
+  refresca por TTL o cuando llega un `kid` desconocido (rotación de llaves).
+"""
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import httpx
+from fastapi import HTTPException, status
+from app.core.config import settings
+from app.core.exceptions import create_error_response
+
+logger = logging.getLogger(__name__)
+
+# Intervalo mínimo entre descargas del JWKS provocadas por un kid desconocido
+JWKS_MIN_REFRESH_SECONDS = 30
+
+
+def token_cache_key(token: str) -> str:
+    """Clave del cache: hash del token (el token no se guarda en memoria)"""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class PrincipalCache:
+    """LRU en memoria de principals verificados, con expiración por token"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, principal = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return dict(principal)
+
+    def put(self, key: str, principal: dict, expires_at: Optional[float]):
+        """Guarda el principal hasta `expires_at` (epoch); sin exp no se guarda"""
+        if self.max_entries <= 0 or not expires_at or expires_at <= time.time():
+            return
+        self._entries[key] = (float(expires_at), dict(principal))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class JWKSCache:
+    """JWKS de Supabase descargado bajo demanda y cacheado por TTL"""
+
+    def __init__(self, url: str, ttl_seconds: float):
+        self.url = url
+        self.ttl_seconds = ttl_seconds
+        self._keys: Dict[str, dict] = {}
+        self._fetched_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def _is_fresh(self) -> bool:
+        return bool(self._keys) and (time.monotonic() - self._fetched_at) < self.ttl_seconds
+
+    async def _refresh(self):
+        async with httpx.AsyncClient(timeout=settings.JWKS_FETCH_TIMEOUT_SECONDS) as client:
+            response = await client.get(self.url)
+            response.raise_for_status()
+        keys = response.json().get("keys", [])
+        self._keys = {key["kid"]: key for key in keys if key.get("kid")}
+        self._fetched_at = time.monotonic()
+        logger.info(f"JWKS actualizado desde {self.url}: {len(self._keys)} llaves")
+
+    async def get_key(self, kid: Optional[str]) -> dict:
+        """
+        Retorna la llave pública (JWK) para `kid`.
+
+        Raises:
+            HTTPException: 401 si el kid no existe en el JWKS, 503 si el JWKS no se pudo descargar
+        """
+        if self._is_fresh() and kid in self._keys:
+            return self._keys[kid]
+
+        async with self._lock:
+            # Otra corrutina pudo haber refrescado mientras se esperaba el lock
+            stale = not self._is_fresh()
+            unknown_kid = kid not in self._keys
+            recently_fetched = (time.monotonic() - self._fetched_at) < JWKS_MIN_REFRESH_SECONDS
+            if stale or (unknown_kid and not recently_fetched):
+                try:
+                    await self._refresh()
+                except (httpx.HTTPError, ValueError) as e:
+                    logger.error(f"No se pudo descargar el JWKS desde {self.url}: {e}")
+                    if not self._keys:
+                        raise HTTPException(
+                            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            detail=create_error_response(
+                                error_code="auth_keys_unavailable",
+                                message="No fue posible validar tu sesión en este momento.",
+                                detail=f"Error al descargar JWKS: {str(e)}",
+                                action_suggestion="Intenta nuevamente en unos minutos.",
+                            ),
+                        )
+
+        key = self._keys.get(kid)
+        if key is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail=create_error_response(
+                    error_code="invalid_token",
+                    message="Tu sesión ha expirado o el token es inválido. Por favor, inicia sesión nuevamente.",
+                    detail=f"Llave de firma desconocida (kid={kid})",
+                    action_suggestion="Haz clic en 'Iniciar Sesión' para autenticarte nuevamente.",
+                ),
+            )
+        return key
+
+
+principal_cache = PrincipalCache(max_entries=settings.AUTH_PRINCIPAL_CACHE_SIZE)
+
+jwks_cache = JWKSCache(
+    url=settings.SUPABASE_JWKS_URL or f"{settings.SUPABASE_URL.rstrip('/')}/auth/v1/.well-known/jwks.json",
+    ttl_seconds=settings.JWKS_CACHE_TTL_SECONDS,
+)
@@ -5,9 +5,13 @@ from jose import jwt, JWTError
 from email_validator import validate_email, EmailNotValidError
 from app.core.config import settings
 from app.core.exceptions import create_error_response
+from app.services.auth_cache_service import jwks_cache, principal_cache, token_cache_key
 
 security = HTTPBearer(auto_error=False)
 
+# Algoritmos asimétricos: se validan con las llaves públicas del JWKS de Supabase
+ASYMMETRIC_ALGORITHMS = ("RS256", "ES256")
+
 
 async def get_api_key(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
@@ -66,9 +70,9 @@ def extract_username_from_email(email: str) -> str:
     Raises:
         ValueError: Si el formato de email es inválido o el username excede 25 caracteres
     """
-    # Validar formato de email
+    # Validar formato de email (solo sintaxis, sin consultas DNS)
     try:
-        validate_email(email)
+        validate_email(email, check_deliverability=False)
     except EmailNotValidError:
         raise ValueError("Formato de email inválido")
     
@@ -122,15 +126,56 @@ def verify_supabase_jwt(token: str) -> dict:
         )
         return payload
     except JWTError as e:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=create_error_response(
-                error_code="invalid_token",
-                message="Tu sesión ha expirado o el token es inválido. Por favor, inicia sesión nuevamente.",
-                detail=f"Error de validación JWT: {str(e)}",
-                action_suggestion="Haz clic en 'Iniciar Sesión' para autenticarte nuevamente.",
-            ),
+        raise _invalid_token_error(e)
+
+
+def _invalid_token_error(error: JWTError) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=create_error_response(
+            error_code="invalid_token",
+            message="Tu sesión ha expirado o el token es inválido. Por favor, inicia sesión nuevamente.",
+            detail=f"Error de validación JWT: {str(error)}",
+            action_suggestion="Haz clic en 'Iniciar Sesión' para autenticarte nuevamente.",
+        ),
+    )
+
+
+async def verify_token(token: str) -> dict:
+    """
+    Valida un token JWT de Supabase según el algoritmo de su header.
+    
+    - HS256: verify_supabase_jwt (SUPABASE_JWT_SECRET).
+    - RS256/ES256: llave pública del JWKS de Supabase (cacheado, ver JWKSCache).
+    
+    Args:
+        token: Token JWT a validar
+        
+    Returns:
+        dict: Payload del token decodificado
+        
+    Raises:
+        HTTPException: Si el token es inválido o expirado
+    """
+    try:
+        header = jwt.get_unverified_header(token)
+    except JWTError as e:
+        raise _invalid_token_error(e)
+    
+    algorithm = header.get("alg")
+    if algorithm not in ASYMMETRIC_ALGORITHMS:
+        return verify_supabase_jwt(token)
+    
+    key = await jwks_cache.get_key(header.get("kid"))
+    try:
+        return jwt.decode(
+            token,
+            key,
+            algorithms=[algorithm],
+            audience="authenticated",
         )
+    except JWTError as e:
+        raise _invalid_token_error(e)
 
 
 async def get_current_user(
@@ -140,6 +185,9 @@ async def get_current_user(
     Dependency para obtener el usuario autenticado desde JWT de Supabase.
     Extrae el username del email y valida que no exceda 25 caracteres.
     
+    Los principals verificados se guardan en principal_cache hasta el `exp`
+    del token: un token ya visto no se vuelve a decodificar ni validar.
+    
     Returns:
         dict: Información del usuario con 'ususolicita' (username extraído del email)
         
@@ -158,9 +206,14 @@ async def get_current_user(
         )
     
     token = credentials.credentials
+    cache_key = token_cache_key(token)
+    
+    principal = principal_cache.get(cache_key)
+    if principal is not None:
+        return principal
     
     # Validar JWT
-    payload = verify_supabase_jwt(token)
+    payload = await verify_token(token)
     
     # Extraer email del token
     email = payload.get("email")
@@ -175,9 +228,9 @@ async def get_current_user(
             ),
         )
     
-    # Validar formato de email
+    # Validar formato de email (solo sintaxis: la verificación DNS agrega latencia)
     try:
-        validate_email(email)
+        validate_email(email, check_deliverability=False)
     except EmailNotValidError:
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
@@ -216,9 +269,11 @@ async def get_current_user(
             )
     
     # Retornar información del usuario
-    return {
+    principal = {
         "sub": payload.get("sub"),  # User ID (UUID)
         "email": email,
         "ususolicita": ususolicita,  # Username extraído del email
     }
+    principal_cache.put(cache_key, principal, payload.get("exp"))
+    return principal
 
@@ -0,0 +1,234 @@
+"""
+Cache de respuestas de la Mesa de Servicio (GET /api/requests y GET /api/requests/{id}).
+
+Las respuestas se guardan ya serializadas (JSON). La clave combina el
+usuario, una "generación" del usuario y la consulta (parámetros del listado
+o CODPETICIONES del detalle). Invalidar es incrementar la generación del
+dueño de la solicitud: sus claves anteriores dejan de consultarse y expiran
+por TTL, sin tocar las de otros usuarios.
+
+Se invalida en create_request, update_request y cuando el agente notifica
+que actualizó una solicitud (POST /api/requests/{id}/cache/invalidate). El
+TTL acota la desactualización ante cambios que no se notifiquen.
+
+Usa Redis si REDIS_ENABLED=true (compartido entre workers; requiere
+pip install redis) y, si no, un LRU en memoria del proceso.
+"""
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "sd"
+
+
+class InMemoryCacheBackend:
+    """LRU en memoria con TTL por entrada (un proceso)"""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+        self._generations: dict[str, int] = {}
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str, ttl_seconds: int):
+        self._entries[key] = (time.monotonic() + ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_generation(self, key: str) -> int:
+        return self._generations.get(key, 0)
+
+    async def incr_generation(self, key: str):
+        self._generations[key] = self._generations.get(key, 0) + 1
+
+
+class RedisCacheBackend:
+    """Redis (redis.asyncio), compartido entre workers e instancias"""
+
+    name = "redis"
+
+    def __init__(self, client):
+        self._client = client
+
+    async def get(self, key: str) -> Optional[str]:
+        value = await self._client.get(key)
+        return value.decode("utf-8") if isinstance(value, bytes) else value
+
+    async def set(self, key: str, value: str, ttl_seconds: int):
+        await self._client.set(key, value, ex=ttl_seconds)
+
+    async def get_generation(self, key: str) -> int:
+        value = await self._client.get(key)
+        return int(value) if value is not None else 0
+
+    async def incr_generation(self, key: str):
+        await self._client.incr(key)
+
+
+def build_cache_backend():
+    """Redis si está habilitado e instalado; si no, LRU en memoria"""
+    if settings.REDIS_ENABLED:
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            logger.warning("REDIS_ENABLED=true pero el paquete 'redis' no está instalado; se usará cache en memoria")
+        else:
+            client = redis.Redis(
+                host=settings.REDIS_HOST,
+                port=settings.REDIS_PORT,
+                db=settings.REDIS_DB,
+                socket_timeout=settings.CACHE_REDIS_TIMEOUT_SECONDS,
+                socket_connect_timeout=settings.CACHE_REDIS_TIMEOUT_SECONDS,
+            )
+            return RedisCacheBackend(client)
+    return InMemoryCacheBackend(max_entries=settings.CACHE_MAX_ENTRIES)
+
+
+class _KindStats:
+    """Aciertos, fallos y latencia media por tipo de respuesta"""
+
+    __slots__ = ("hits", "misses", "hit_ms", "miss_ms")
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.hit_ms = 0.0
+        self.miss_ms = 0.0
+
+    def to_dict(self) -> dict:
+        lookups = self.hits + self.misses
+        avg_hit_ms = self.hit_ms / self.hits if self.hits else 0.0
+        avg_miss_ms = self.miss_ms / self.misses if self.misses else 0.0
+        saved_ms = self.hits * max(0.0, avg_miss_ms - avg_hit_ms) if self.misses else 0.0
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "avg_hit_ms": round(avg_hit_ms, 3),
+            "avg_miss_ms": round(avg_miss_ms, 3),
+            "estimated_saved_ms": round(saved_ms, 1),
+        }
+
+
+class ResponseCache:
+    """Cache de respuestas serializadas con invalidación por usuario"""
+
+    def __init__(self, backend, ttl_seconds: int, enabled: bool = True):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self.errors = 0
+        self.invalidations = 0
+        self._stats = {"list": _KindStats(), "detail": _KindStats()}
+
+    @staticmethod
+    def _generation_key(ususolicita: str) -> str:
+        return f"{KEY_PREFIX}:gen:{ususolicita}"
+
+    async def key(self, ususolicita: str, scope: str) -> Optional[str]:
+        """
+        Clave de una respuesta en la generación actual del usuario.
+
+        Se obtiene una vez por request y se usa tanto para leer como para
+        guardar: una respuesta calculada antes de una invalidación queda en la
+        generación anterior y nunca se sirve.
+
+        Args:
+            ususolicita: Usuario dueño de la respuesta
+            scope: "list:<parámetros>" o "detail:<CODPETICIONES>"
+
+        Returns:
+            Optional[str]: Clave, o None si el cache está deshabilitado o no responde
+        """
+        if not self.enabled:
+            return None
+        try:
+            generation = await self.backend.get_generation(self._generation_key(ususolicita))
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Error al leer del cache ({self.backend.name}): {e}")
+            return None
+        digest = hashlib.sha256(scope.encode("utf-8")).hexdigest()[:32]
+        return f"{KEY_PREFIX}:{ususolicita}:g{generation}:{digest}"
+
+    async def get(self, key: Optional[str]) -> Optional[str]:
+        if not self.enabled or key is None:
+            return None
+        try:
+            return await self.backend.get(key)
+        except Exception as e:
+            # Un cache caído no debe fallar el request: se trata como fallo de cache
+            self.errors += 1
+            logger.warning(f"Error al leer del cache ({self.backend.name}): {e}")
+            return None
+
+    async def set(self, key: Optional[str], body: str):
+        if not self.enabled or key is None:
+            return
+        try:
+            await self.backend.set(key, body, self.ttl_seconds)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Error al escribir en el cache ({self.backend.name}): {e}")
+
+    async def invalidate_user(self, ususolicita: str):
+        """
+        Invalida el listado y los detalles cacheados de un usuario.
+
+        Se llama al crear o actualizar una de sus solicitudes; las respuestas
+        de otros usuarios no se ven afectadas.
+        """
+        if not self.enabled:
+            return
+        self.invalidations += 1
+        try:
+            await self.backend.incr_generation(self._generation_key(ususolicita))
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Error al invalidar el cache ({self.backend.name}) de {ususolicita}: {e}")
+
+    def record(self, kind: str, hit: bool, elapsed_ms: float):
+        """Registra un acierto o fallo y su latencia (para hit ratio y ahorro estimado)"""
+        stats = self._stats[kind]
+        if hit:
+            stats.hits += 1
+            stats.hit_ms += elapsed_ms
+        else:
+            stats.misses += 1
+            stats.miss_ms += elapsed_ms
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "backend": self.backend.name,
+            "ttl_seconds": self.ttl_seconds,
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+            **{kind: stats.to_dict() for kind, stats in self._stats.items()},
+        }
+
+
+response_cache = ResponseCache(
+    backend=build_cache_backend(),
+    ttl_seconds=settings.CACHE_TTL_SECONDS,
+    enabled=settings.CACHE_ENABLED,
+)
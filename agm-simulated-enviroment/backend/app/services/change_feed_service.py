@@ -0,0 +1,266 @@
+"""
+Feed de cambios de HLP_PETICIONES con fan-out por usuario (SSE).
+
+En lugar de que cada dashboard mantenga su propia suscripción a Supabase
+Realtime, el backend mantiene una única conexión LISTEN al canal
+CHANGE_FEED_CHANNEL (trigger de la migración 005) y reparte cada
+notificación en memoria solo a las conexiones del dueño de la solicitud.
+
+Cada conexión tiene una cola acotada (CHANGE_FEED_QUEUE_SIZE). Si un cliente
+lento la llena, se descartan sus eventos pendientes y se le envía un único
+evento `resync`: como los eventos solo indican "qué cambió", el cliente se
+pone al día con GET /api/requests/changes desde su cursor. Lo mismo ocurre
+al reconectar el LISTEN (pudieron perderse notificaciones).
+
+Cada notificación invalida también el cache de respuestas del usuario
+(cache_service), incluidos los cambios que el agente hace directamente en
+Supabase.
+
+LISTEN requiere una conexión de sesión: con el pooler de Supabase usar el
+puerto de sesión (5432), no el de transacciones (6543). Ver
+CHANGE_FEED_DATABASE_URL.
+"""
+import asyncio
+import json
+import logging
+import time
+from typing import AsyncIterator, Dict, Optional, Set
+
+import asyncpg
+from fastapi import HTTPException, status
+from app.core.config import settings
+from app.core.exceptions import create_error_response
+from app.services.cache_service import response_cache
+
+logger = logging.getLogger(__name__)
+
+# Debe coincidir con CHANNEL en alembic/versions/005_change_notify_trigger.py
+CHANGE_FEED_CHANNEL = "hlp_peticiones_changes"
+
+EVENT_CHANGED = "request_changed"
+EVENT_RESYNC = "resync"
+
+# Intervalo del SELECT 1 que detecta una conexión LISTEN caída sin aviso
+LISTEN_KEEPALIVE_SECONDS = 30
+MAX_RECONNECT_DELAY_SECONDS = 30
+
+
+class Subscription:
+    """Conexión de un usuario al feed: cola acotada de eventos"""
+
+    __slots__ = ("ususolicita", "queue", "dropped")
+
+    def __init__(self, ususolicita: str, max_queue: int):
+        self.ususolicita = ususolicita
+        self.queue: "asyncio.Queue[tuple[str, dict]]" = asyncio.Queue(maxsize=max(1, max_queue))
+        self.dropped = 0
+
+    def push(self, event: str, data: dict) -> bool:
+        """
+        Encola un evento sin bloquear.
+
+        Returns:
+            bool: False si la cola estaba llena (se reemplazó por un resync)
+        """
+        try:
+            self.queue.put_nowait((event, data))
+            return True
+        except asyncio.QueueFull:
+            # Cliente lento: los eventos pendientes se reemplazan por un resync
+            while not self.queue.empty():
+                self.queue.get_nowait()
+                self.dropped += 1
+            self.queue.put_nowait((EVENT_RESYNC, {}))
+            return False
+
+
+class ChangeFeedHub:
+    """Una conexión LISTEN compartida y las suscripciones por usuario"""
+
+    def __init__(self, dsn: str, channel: str, max_queue: int, max_connections: int):
+        self.dsn = dsn
+        self.channel = channel
+        self.max_queue = max_queue
+        self.max_connections = max_connections
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._pending: Set[asyncio.Task] = set()
+        self.connected = False
+        self.notifications = 0
+        self.delivered = 0
+        self.overflows = 0
+        self.reconnects = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def connections(self) -> int:
+        return sum(len(subs) for subs in self._subscribers.values())
+
+    def ensure_available(self):
+        """
+        Verifica que se pueda abrir una conexión nueva.
+
+        Raises:
+            HTTPException: 503 si el feed no está activo o se alcanzó CHANGE_FEED_MAX_CONNECTIONS
+        """
+        if not self.running or self.connections >= self.max_connections:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=create_error_response(
+                    error_code="change_feed_unavailable",
+                    message="Las actualizaciones en tiempo real no están disponibles en este momento.",
+                    detail="Feed de cambios deshabilitado" if not self.running else "Máximo de conexiones alcanzado",
+                    action_suggestion="La lista se actualizará al recargar la página.",
+                ),
+            )
+
+    def subscribe(self, ususolicita: str) -> Subscription:
+        """Registra una conexión del usuario"""
+        subscription = Subscription(ususolicita, self.max_queue)
+        self._subscribers.setdefault(ususolicita, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subs = self._subscribers.get(subscription.ususolicita)
+        if subs is None:
+            return
+        subs.discard(subscription)
+        if not subs:
+            del self._subscribers[subscription.ususolicita]
+
+    def _schedule(self, coro):
+        """Ejecuta una corrutina desde el callback (síncrono) de asyncpg"""
+        task = asyncio.get_running_loop().create_task(coro)
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    def _on_notify(self, connection, pid, channel, payload: str):
+        try:
+            data = json.loads(payload)
+            ususolicita = data.pop("ususolicita")
+        except (ValueError, KeyError) as e:
+            logger.warning(f"Notificación inválida en {channel}: {e}")
+            return
+        self.notifications += 1
+        self._schedule(response_cache.invalidate_user(ususolicita))
+        for subscription in self._subscribers.get(ususolicita, ()):
+            if subscription.push(EVENT_CHANGED, data):
+                self.delivered += 1
+            else:
+                self.overflows += 1
+
+    def _broadcast_resync(self):
+        for subs in self._subscribers.values():
+            for subscription in subs:
+                subscription.push(EVENT_RESYNC, {})
+
+    async def _listen(self):
+        """Mantiene la conexión LISTEN, reconectando con backoff exponencial"""
+        delay = 1
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(
+                    self.dsn,
+                    server_settings={"application_name": "agm_desk_ai_change_feed"},
+                )
+                lost = asyncio.Event()
+                connection.add_termination_listener(lambda _: lost.set())
+                await connection.add_listener(self.channel, self._on_notify)
+                self.connected = True
+                delay = 1
+                logger.info(f"Feed de cambios escuchando el canal {self.channel}")
+                if self.reconnects:
+                    # Pudieron perderse notificaciones mientras no había conexión
+                    self._broadcast_resync()
+
+                while not lost.is_set():
+                    try:
+                        await asyncio.wait_for(lost.wait(), timeout=LISTEN_KEEPALIVE_SECONDS)
+                    except asyncio.TimeoutError:
+                        await connection.execute("SELECT 1")
+                logger.warning("Conexión LISTEN del feed de cambios terminada")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Error en la conexión LISTEN del feed de cambios: {e}")
+            finally:
+                self.connected = False
+                if connection is not None and not connection.is_closed():
+                    connection.terminate()
+
+            self.reconnects += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_RECONNECT_DELAY_SECONDS)
+
+    def start(self):
+        if not self.running:
+            self._task = asyncio.get_running_loop().create_task(self._listen())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "enabled": settings.CHANGE_FEED_ENABLED,
+            "connected": self.connected,
+            "connections": self.connections,
+            "users": len(self._subscribers),
+            "notifications": self.notifications,
+            "delivered": self.delivered,
+            "overflows": self.overflows,
+            "reconnects": self.reconnects,
+        }
+
+
+def format_sse(event: str, data: dict) -> str:
+    """Serializa un evento en formato text/event-stream"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def stream_events(hub: ChangeFeedHub, ususolicita: str) -> AsyncIterator[str]:
+    """
+    Genera el stream SSE de un usuario.
+
+    La suscripción se registra al iniciar el stream y se elimina al cerrarlo
+    (incluida la desconexión del cliente). Envía un comentario de heartbeat si no hay eventos (mantiene la conexión
+    viva en proxies) y cierra el stream tras CHANGE_FEED_MAX_STREAM_SECONDS
+    para que el cliente reconecte con un token vigente.
+    """
+    deadline = time.monotonic() + settings.CHANGE_FEED_MAX_STREAM_SECONDS
+    subscription = hub.subscribe(ususolicita)
+    try:
+        yield f"retry: {settings.CHANGE_FEED_RETRY_MS}\n\n"
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            try:
+                event, data = await asyncio.wait_for(
+                    subscription.queue.get(),
+                    timeout=min(settings.CHANGE_FEED_HEARTBEAT_SECONDS, remaining),
+                )
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            yield format_sse(event, data)
+    finally:
+        hub.unsubscribe(subscription)
+
+
+change_feed_hub = ChangeFeedHub(
+    dsn=(settings.CHANGE_FEED_DATABASE_URL or settings.DATABASE_URL).replace("postgresql+asyncpg://", "postgresql://"),
+    channel=CHANGE_FEED_CHANNEL,
+    max_queue=settings.CHANGE_FEED_QUEUE_SIZE,
+    max_connections=settings.CHANGE_FEED_MAX_CONNECTIONS,
+)
@@ -0,0 +1,70 @@
+"""
+Deadline propagado por el cliente en el header X-Request-Deadline.
+
+El header indica los milisegundos que le quedan al cliente para esperar la
+respuesta. Si la acción no alcanza a terminar en ese tiempo, el backend la
+abandona y responde 504 en lugar de seguir trabajando para un cliente que
+ya no espera el resultado.
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi import Header, HTTPException, status
+from app.core.exceptions import create_error_response
+
+DEADLINE_HEADER = "X-Request-Deadline"
+
+
+def get_request_deadline(
+    x_request_deadline: Optional[int] = Header(
+        None,
+        alias=DEADLINE_HEADER,
+        ge=0,
+        description="Milisegundos que el cliente esperará la respuesta; pasado ese tiempo la acción se abandona (504)",
+    ),
+) -> Optional[float]:
+    """
+    Dependencia que convierte el header X-Request-Deadline en un instante
+    límite (time.monotonic()) local al servidor.
+
+    Returns:
+        Instante límite, o None si el cliente no envió el header
+    """
+    if x_request_deadline is None:
+        return None
+    return time.monotonic() + x_request_deadline / 1000
+
+
+def _deadline_exceeded() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+        detail=create_error_response(
+            error_code="deadline_exceeded",
+            message="La acción no alcanzó a completarse en el tiempo disponible.",
+            detail=f"Deadline indicado en {DEADLINE_HEADER} agotado",
+            action_suggestion="Reintenta la acción con un plazo mayor.",
+        ),
+    )
+
+
+async def run_within_deadline(deadline: Optional[float], work: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Ejecuta `work` cancelándolo si se alcanza el deadline.
+
+    Args:
+        deadline: Instante límite retornado por get_request_deadline (None = sin límite)
+        work: Corrutina sin argumentos que ejecuta la acción
+
+    Raises:
+        HTTPException: 504 si el deadline ya venció o vence durante la acción
+    """
+    if deadline is None:
+        return await work()
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise _deadline_exceeded()
+    try:
+        return await asyncio.wait_for(work(), timeout=remaining)
+    except asyncio.TimeoutError:
+        raise _deadline_exceeded()
@@ -0,0 +1,82 @@
+"""
+ETags y respuestas condicionales (If-None-Match) del listado y el detalle.
+
+La versión de una fila es (UPDATED_AT, CODPETICIONES): el trigger de la
+migración 004 mueve UPDATED_AT con cualquier cambio de la fila, incluidos
+los del agente.
+
+- Detalle: la versión de la fila, leída por la clave primaria.
+- Listado: la versión de la última fila modificada del usuario (un acceso
+  al índice (USUSOLICITA, UPDATED_AT, CODPETICIONES)) más el total. Un
+  cambio en cualquier solicitud del usuario cambia el ETag de todas sus
+  páginas; una inserción o eliminación cambia además el total (con
+  count=none, una eliminación fuera de la API no cambia el ETag hasta el
+  siguiente cambio).
+
+Revalidar no lee AI_CLASSIFICATION_DATA ni la página: si el ETag coincide
+se responde 304 sin serializar nada.
+"""
+import hashlib
+from datetime import datetime
+from typing import Iterable, Optional
+
+from fastapi import Response, status
+
+# El navegador guarda la respuesta pero la revalida siempre con If-None-Match
+CACHE_CONTROL = "private, no-cache"
+
+
+def compute_etag(scope: str, versions: Iterable[str], total: Optional[int] = None, total_capped: bool = False) -> str:
+    """
+    Calcula el ETag (fuerte) de una respuesta.
+
+    Args:
+        scope: "list:<parámetros>" o "detail:<CODPETICIONES>"
+        versions: Versiones (row_version) que determinan la respuesta
+        total: Total del listado (None si no se cuenta)
+        total_capped: Si el total está acotado
+
+    Returns:
+        str: ETag entre comillas, listo para el header
+    """
+    digest = hashlib.sha256()
+    digest.update(scope.encode("utf-8"))
+    for version in versions:
+        digest.update(b"|")
+        digest.update(version.encode("ascii"))
+    digest.update(f"|total={total}:{total_capped}".encode("ascii"))
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def row_version(updated_at: Optional[datetime], codpeticiones: Optional[int]) -> str:
+    """Versión de una fila a partir de (UPDATED_AT, CODPETICIONES); vacía si no hay fila"""
+    if codpeticiones is None:
+        return ""
+    return f"{updated_at.isoformat() if updated_at else ''}:{codpeticiones}"
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Compara If-None-Match con el ETag actual (comparación débil, RFC 9110).
+
+    Acepta una lista separada por comas, "*" y ETags con prefijo W/.
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def not_modified(etag: str, headers: Optional[dict] = None) -> Response:
+    """Respuesta 304 sin cuerpo con el ETag vigente"""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL, **(headers or {})},
+    )
@@ -0,0 +1,148 @@
+"""
+Exportación de solicitudes en streaming (NDJSON o CSV).
+
+Las filas se leen con un cursor del lado del servidor (AsyncSession.stream
+con yield_per): el backend mantiene en memoria un lote de EXPORT_BATCH_SIZE
+filas a la vez, sin importar el tamaño del historial, y cada lote se
+serializa y se envía al cliente antes de leer el siguiente. No se cuenta el
+total ni se pagina.
+
+Con include_ai se agregan columnas ai_* extraídas de AI_CLASSIFICATION_DATA
+en la consulta (sin transferir raw_classification ni actions_executed).
+"""
+import csv
+import io
+import json
+import logging
+from datetime import datetime
+from typing import AsyncIterator, List, Optional
+
+from sqlalchemy import Select, select
+
+from app.core.config import settings
+from app.db.base import AsyncSessionLocal
+from app.models.entities import Request
+from app.models.schemas import ExportParams
+
+logger = logging.getLogger(__name__)
+
+FORMAT_NDJSON = "ndjson"
+FORMAT_CSV = "csv"
+
+MEDIA_TYPES = {
+    FORMAT_NDJSON: "application/x-ndjson",
+    FORMAT_CSV: "text/csv; charset=utf-8",
+}
+
+# Con los nombres de la API (RequestResponse), no los de las columnas legacy
+EXPORT_COLUMNS = tuple(
+    column.label(column.key)
+    for column in (
+        Request.codpeticiones,
+        Request.codcategoria,
+        Request.codestado,
+        Request.ususolicita,
+        Request.fesolicita,
+        Request.description,
+        Request.solucion,
+        Request.fesolucion,
+        Request.codusolucion,
+        Request.feccierre,
+        Request.updated_at,
+    )
+)
+
+# AI_CLASSIFICATION_DATA aplanado (include_ai=true)
+AI_COLUMNS = (
+    Request.ai_classification_data["app_type"].astext.label("ai_app_type"),
+    Request.ai_classification_data["confidence"].as_float().label("ai_confidence"),
+    Request.ai_classification_data["classification_timestamp"].astext.label("ai_classification_timestamp"),
+    Request.ai_classification_data["detected_actions"].label("ai_detected_actions"),
+)
+
+
+def build_export_query(ususolicita: str, params: ExportParams) -> Select:
+    """
+    Construye la consulta de exportación con los filtros de `params`.
+
+    Ordena por (FESOLICITA, CODPETICIONES) ascendente: el índice
+    (USUSOLICITA, FESOLICITA DESC, CODPETICIONES DESC) la resuelve recorrido
+    hacia atrás, sin ordenar en memoria.
+    """
+    columns = EXPORT_COLUMNS + AI_COLUMNS if params.include_ai else EXPORT_COLUMNS
+    query = (
+        select(*columns)
+        .where(Request.ususolicita == ususolicita)
+        .order_by(Request.fesolicita, Request.codpeticiones)
+    )
+    if params.date_from:
+        query = query.where(Request.fesolicita >= params.date_from)
+    if params.date_to:
+        query = query.where(Request.fesolicita < params.date_to)
+    if params.codestado:
+        query = query.where(Request.codestado.in_(params.codestado))
+    if params.codcategoria:
+        query = query.where(Request.codcategoria.in_(params.codcategoria))
+    return query
+
+
+def _csv_value(value):
+    """Valor de una celda CSV: fechas en ISO 8601 y listas separadas por ';'"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, list):
+        return ";".join(str(item) for item in value)
+    return value
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Tipo no serializable: {type(value).__name__}")
+
+
+def _format_ndjson(fields: List[str], rows) -> str:
+    """Un objeto JSON por línea"""
+    return "".join(
+        json.dumps(dict(zip(fields, row)), default=_json_default, ensure_ascii=False) + "\n"
+        for row in rows
+    )
+
+
+def _format_csv(rows, header: Optional[List[str]] = None) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(header)
+    writer.writerows([_csv_value(value) for value in row] for row in rows)
+    return buffer.getvalue()
+
+
+async def stream_export(query: Select, export_format: str) -> AsyncIterator[str]:
+    """
+    Genera el archivo por lotes desde un cursor del servidor.
+
+    Usa su propia sesión: el stream se consume después de que el endpoint
+    retorna, cuando la sesión de get_db ya puede estar cerrada. Si la
+    consulta falla a mitad del stream, el archivo queda truncado (el status
+    200 ya fue enviado) y el error se registra en el log.
+    """
+    exported = 0
+    async with AsyncSessionLocal() as session:
+        try:
+            result = await session.stream(
+                query.execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+            )
+            fields = list(result.keys())
+            if export_format == FORMAT_CSV:
+                yield _format_csv([], header=fields)
+            async for rows in result.partitions():
+                exported += len(rows)
+                if export_format == FORMAT_CSV:
+                    yield _format_csv(rows)
+                else:
+                    yield _format_ndjson(fields, rows)
+        except Exception as e:
+            logger.error(f"Error al exportar solicitudes (exportadas {exported}): {str(e)}", exc_info=True)
+            raise
+    logger.info(f"Exportación {export_format} completada: {exported} solicitudes")
@@ -0,0 +1,164 @@
+"""
+Servicio de idempotencia para los endpoints de acción.
+
+Una acción enviada con el header Idempotency-Key se ejecuta una sola vez:
+los reintentos y solicitudes duplicadas (incluidas las concurrentes)
+reciben la respuesta almacenada de la primera ejecución. El almacén vive en
+memoria del proceso, acotado por número de claves y con expiración.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+from fastapi import HTTPException, status
+from app.core.config import settings
+from app.core.exceptions import create_error_response
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+class _Entry:
+    """Resultado (o ejecución en curso) asociado a una clave"""
+
+    __slots__ = ("fingerprint", "future", "stored_at")
+
+    def __init__(self, fingerprint: str, future: asyncio.Future):
+        self.fingerprint = fingerprint
+        self.future = future
+        self.stored_at = time.monotonic()
+
+
+class IdempotencyStore:
+    """Almacén en memoria de resultados por clave de idempotencia"""
+
+    def __init__(self, max_keys: int, ttl_seconds: float):
+        self.max_keys = max(1, max_keys)
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self.replays = 0
+
+    def _evict(self):
+        now = time.monotonic()
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            expired = entry.future.done() and (now - entry.stored_at) > self.ttl_seconds
+            if len(self._entries) < self.max_keys and not expired:
+                break
+            self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[_Entry]:
+        entry = self._entries.get(key)
+        if entry is not None and entry.future.done() and (time.monotonic() - entry.stored_at) > self.ttl_seconds:
+            del self._entries[key]
+            return None
+        return entry
+
+    def reserve(self, key: str, fingerprint: str) -> _Entry:
+        self._evict()
+        entry = _Entry(fingerprint, asyncio.get_running_loop().create_future())
+        self._entries[key] = entry
+        return entry
+
+    def discard(self, key: str, entry: _Entry):
+        if self._entries.get(key) is entry:
+            del self._entries[key]
+
+
+idempotency_store = IdempotencyStore(
+    max_keys=settings.IDEMPOTENCY_MAX_KEYS,
+    ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+)
+
+
+def request_fingerprint(scope: str, payload: dict) -> str:
+    """Huella del request: la misma clave con otro contenido es un error del cliente"""
+    body = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(f"{scope}:{body}".encode("utf-8")).hexdigest()
+
+
+async def execute_idempotent(
+    key: Optional[str],
+    scope: str,
+    payload: dict,
+    work: Callable[[], Awaitable[Any]],
+) -> Tuple[Any, bool]:
+    """
+    Ejecuta `work` una sola vez por clave de idempotencia.
+
+    - Sin clave: ejecuta normalmente.
+    - Clave ya usada con el mismo request: retorna (o relanza) el resultado
+      almacenado. Si la primera ejecución sigue en curso, la espera.
+    - Clave ya usada con otro request: 422.
+
+    Los errores 5xx no se almacenan, para que un reintento posterior pueda
+    ejecutar la acción de nuevo.
+
+    Args:
+        key: Valor del header Idempotency-Key (opcional)
+        scope: Ámbito de la clave (aplicación)
+        payload: Request de la acción (para detectar reutilización de la clave)
+        work: Corrutina sin argumentos que ejecuta la acción
+
+    Returns:
+        Tupla (resultado, replayed)
+
+    Raises:
+        HTTPException: El error de la acción (almacenado o nuevo) o 422 si la clave se reutilizó
+    """
+    if not key:
+        return await work(), False
+
+    scoped_key = f"{scope}:{key}"
+    fingerprint = request_fingerprint(scope, payload)
+    entry = idempotency_store.get(scoped_key)
+
+    if entry is not None:
+        if entry.fingerprint != fingerprint:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=create_error_response(
+                    error_code="idempotency_key_reused",
+                    message="La clave de idempotencia ya fue usada con una solicitud diferente.",
+                    detail=f"{IDEMPOTENCY_HEADER} '{key}' reutilizada con otro contenido",
+                    action_suggestion="Usa una clave de idempotencia distinta para cada acción.",
+                ),
+            )
+        idempotency_store.replays += 1
+        logger.info(f"Respuesta idempotente reutilizada para la clave {scoped_key}")
+        result = await asyncio.shield(entry.future)
+        if isinstance(result, HTTPException):
+            raise HTTPException(status_code=result.status_code, detail=result.detail)
+        return result, True
+
+    entry = idempotency_store.reserve(scoped_key, fingerprint)
+    try:
+        result = await work()
+    except HTTPException as e:
+        entry.future.set_result(e)
+        if e.status_code >= 500:
+            idempotency_store.discard(scoped_key, entry)
+        raise
+    except BaseException as e:
+        # Error inesperado o cancelación: no almacenar, liberar a quienes esperan
+        entry.future.set_result(HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=create_error_response(
+                error_code="internal_server_error",
+                message="Ocurrió un error inesperado al procesar tu solicitud.",
+                detail=f"Error técnico: {str(e)}",
+                action_suggestion="Intenta nuevamente en unos minutos. Si el problema persiste, contacta al soporte.",
+            ),
+        ))
+        idempotency_store.discard(scoped_key, entry)
+        raise
+
+    entry.stored_at = time.monotonic()
+    entry.future.set_result(result)
+    return result, False
@@ -0,0 +1,277 @@
+"""
+Servicio de jobs asíncronos para los endpoints de acción (mode=async).
+
+Los jobs viven en memoria del proceso: el almacén está acotado por número
+de jobs y los resultados expiran después de JOB_RESULT_TTL_SECONDS.
+
+El callback_url solo puede apuntar a un origen de JOB_CALLBACK_ALLOWED_ORIGINS.
+El resultado se envía firmado con HMAC-SHA256 (headers X-Signature y
+X-Signature-Timestamp); la API key nunca sale del backend.
+"""
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+from fastapi import HTTPException, Query, Request, status
+from fastapi.responses import JSONResponse
+from app.core.config import settings
+from app.core.exceptions import create_error_response
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE_HEADER = "X-Signature"
+SIGNATURE_TIMESTAMP_HEADER = "X-Signature-Timestamp"
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def _origin(url: str) -> Optional[Tuple[str, str, int]]:
+    """(esquema, host, puerto) de una URL http(s), o None si no es válida o trae credenciales"""
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return None
+    scheme = parts.scheme.lower()
+    if scheme not in _DEFAULT_PORTS or not parts.hostname or parts.username or parts.password:
+        return None
+    return scheme, parts.hostname.lower(), port or _DEFAULT_PORTS[scheme]
+
+
+def _allowed_origins() -> FrozenSet[Tuple[str, str, int]]:
+    origins = (_origin(origin) for origin in settings.JOB_CALLBACK_ALLOWED_ORIGINS.split(",") if origin.strip())
+    return frozenset(origin for origin in origins if origin is not None)
+
+
+ALLOWED_CALLBACK_ORIGINS = _allowed_origins()
+
+
+def get_callback_url(
+    callback_url: Optional[str] = Query(
+        None,
+        max_length=2048,
+        description="URL a la que se envía el resultado del job (solo mode=async; origen permitido en JOB_CALLBACK_ALLOWED_ORIGINS)",
+    ),
+) -> Optional[str]:
+    """
+    Dependencia que valida el callback_url contra JOB_CALLBACK_ALLOWED_ORIGINS.
+
+    Raises:
+        HTTPException: 422 si la URL no es http(s) o su origen no está permitido
+    """
+    if callback_url is None:
+        return None
+    if _origin(callback_url) not in ALLOWED_CALLBACK_ORIGINS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=create_error_response(
+                error_code="callback_url_not_allowed",
+                message="La URL de callback no está permitida.",
+                detail="El origen de callback_url no está en JOB_CALLBACK_ALLOWED_ORIGINS",
+                action_suggestion="Usa un callback_url de un origen autorizado o consulta el resultado en /jobs/{job_id}.",
+            ),
+        )
+    return callback_url
+
+
+def sign_callback(body: bytes, timestamp: str) -> str:
+    """
+    Firma HMAC-SHA256 de un callback: hex de HMAC(clave, "{timestamp}.{body}").
+
+    El receptor recalcula la firma con la misma clave y rechaza timestamps
+    antiguos para evitar reenvíos.
+    """
+    key = (settings.JOB_CALLBACK_SIGNING_SECRET or settings.API_SECRET_KEY).encode()
+    digest = hmac.new(key, timestamp.encode() + b"." + body, hashlib.sha256).hexdigest()
+    return f"sha256={digest}"
+
+
+class Job:
+    """Estado de un job de acción"""
+
+    __slots__ = (
+        "job_id", "app_type", "kind", "status", "status_code", "response", "error",
+        "callback_url", "created_at", "finished_at", "_done", "_created_monotonic",
+    )
+
+    def __init__(self, app_type: str, kind: str, callback_url: Optional[str] = None):
+        self.job_id = uuid.uuid4().hex
+        self.app_type = app_type
+        self.kind = kind
+        self.status = "pending"
+        self.status_code: Optional[int] = None
+        self.response: Optional[dict] = None
+        self.error: Optional[dict] = None
+        self.callback_url = callback_url
+        self.created_at = datetime.utcnow().isoformat() + "Z"
+        self.finished_at: Optional[str] = None
+        self._done = asyncio.Event()
+        self._created_monotonic = time.monotonic()
+
+    @property
+    def is_finished(self) -> bool:
+        return self._done.is_set()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "app_type": self.app_type,
+            "kind": self.kind,
+            "status": self.status,
+            "status_code": self.status_code,
+            "response": self.response,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobStore:
+    """Almacén en memoria de jobs, acotado por tamaño y con expiración"""
+
+    def __init__(self, max_jobs: int, ttl_seconds: float):
+        self.max_jobs = max(1, max_jobs)
+        self.ttl_seconds = ttl_seconds
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+
+    def _evict(self):
+        now = time.monotonic()
+        while self._jobs:
+            job = next(iter(self._jobs.values()))
+            expired = job.is_finished and (now - job._created_monotonic) > self.ttl_seconds
+            if len(self._jobs) < self.max_jobs and not expired:
+                break
+            self._jobs.popitem(last=False)
+
+    def create(self, app_type: str, kind: str, callback_url: Optional[str] = None) -> Job:
+        self._evict()
+        job = Job(app_type, kind, callback_url)
+        self._jobs[job.job_id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+
+job_store = JobStore(max_jobs=settings.JOB_MAX_STORED, ttl_seconds=settings.JOB_RESULT_TTL_SECONDS)
+
+
+def accept_job(job: Job, request: Request) -> JSONResponse:
+    """
+    Construye la respuesta 202 Accepted de un job recién creado.
+
+    La URL de consulta se deriva de la ruta del endpoint de acción
+    (/api/apps/{app}/execute-action → /api/apps/{app}/jobs/{job_id}).
+    """
+    status_url = f"{request.url.path.rsplit('/', 1)[0]}/jobs/{job.job_id}"
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={"job_id": job.job_id, "status": job.status, "status_url": status_url},
+        headers={"Location": status_url},
+    )
+
+
+async def run_job(job: Job, work: Callable[[], Awaitable[Any]]):
+    """
+    Ejecuta el trabajo de un job y registra su resultado.
+
+    Los errores se registran como lo habría hecho el endpoint síncrono
+    (código HTTP y respuesta de error estándar).
+
+    Args:
+        job: Job a ejecutar
+        work: Corrutina sin argumentos que retorna el modelo de respuesta
+    """
+    job.status = "running"
+    try:
+        result = await work()
+        job.response = result.model_dump() if hasattr(result, "model_dump") else result
+        job.status_code = status.HTTP_200_OK
+        job.status = "succeeded"
+    except HTTPException as e:
+        job.status_code = e.status_code
+        job.error = e.detail if isinstance(e.detail, dict) else {"message": str(e.detail)}
+        job.status = "failed"
+    except Exception as e:
+        logger.error(f"Error inesperado en job {job.job_id}: {str(e)}", exc_info=True)
+        job.status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+        job.error = create_error_response(
+            error_code="internal_server_error",
+            message="Ocurrió un error inesperado al procesar tu solicitud.",
+            detail=f"Error técnico: {str(e)}",
+            action_suggestion="Intenta nuevamente en unos minutos. Si el problema persiste, contacta al soporte.",
+        )
+        job.status = "failed"
+    finally:
+        job.finished_at = datetime.utcnow().isoformat() + "Z"
+        job._done.set()
+
+    if job.callback_url:
+        await _send_callback(job)
+
+
+async def _send_callback(job: Job):
+    """Envía el resultado firmado del job al callback_url (validado por get_callback_url)"""
+    body = json.dumps(job.to_dict()).encode()
+    timestamp = str(int(time.time()))
+    try:
+        # Sin seguir redirecciones: el destino queda fijo en el origen permitido
+        async with httpx.AsyncClient(timeout=settings.JOB_CALLBACK_TIMEOUT_SECONDS, follow_redirects=False) as client:
+            response = await client.post(
+                job.callback_url,
+                content=body,
+                headers={
+                    "Content-Type": "application/json",
+                    SIGNATURE_TIMESTAMP_HEADER: timestamp,
+                    SIGNATURE_HEADER: sign_callback(body, timestamp),
+                },
+            )
+            response.raise_for_status()
+    except Exception as e:
+        # El resultado sigue disponible en GET /jobs/{job_id}
+        logger.warning(f"No se pudo enviar el callback del job {job.job_id}: {str(e)}")
+
+
+async def get_job_status(app_type: str, job_id: str, wait: float = 0) -> Dict[str, Any]:
+    """
+    Retorna el estado de un job, esperando hasta `wait` segundos a que termine (long-poll).
+
+    Args:
+        app_type: Aplicación del endpoint consultado
+        job_id: ID del job
+        wait: Segundos máximos de espera (acotado a JOB_MAX_WAIT_SECONDS)
+
+    Returns:
+        dict: Estado del job
+
+    Raises:
+        HTTPException: 404 si el job no existe, expiró o pertenece a otra aplicación
+    """
+    job = job_store.get(job_id)
+    if job is None or job.app_type != app_type:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=create_error_response(
+                error_code="job_not_found",
+                message="El trabajo solicitado no existe o ya expiró.",
+                detail=f"Job '{job_id}' no encontrado",
+                action_suggestion="Vuelve a ejecutar la acción.",
+            ),
+        )
+
+    wait = min(max(wait, 0), settings.JOB_MAX_WAIT_SECONDS)
+    if wait and not job.is_finished:
+        try:
+            await asyncio.wait_for(job._done.wait(), timeout=wait)
+        except asyncio.TimeoutError:
+            pass
+    return job.to_dict()
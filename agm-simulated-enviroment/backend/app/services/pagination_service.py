@@ -0,0 +1,201 @@
+"""
+Paginación del listado de solicitudes.
+
+Además del modo offset (compatibilidad), el listado admite paginación por
+cursor (keyset): el cursor es el par (FESOLICITA, CODPETICIONES) de la
+última fila de la página, codificado de forma opaca. La página siguiente se
+obtiene con `(FESOLICITA, CODPETICIONES) < cursor`, que el índice compuesto
+(USUSOLICITA, FESOLICITA DESC, CODPETICIONES DESC) resuelve sin recorrer las
+páginas anteriores, a diferencia de OFFSET.
+
+El total también es configurable: exacto, acotado (cuenta hasta un máximo)
+o ninguno.
+
+La vista `summary` selecciona solo las columnas que muestra la tabla del
+frontend y extrae de AI_CLASSIFICATION_DATA únicamente app_type y confidence,
+sin transferir el JSONB completo (raw_classification, actions_executed). El
+detalle completo se obtiene de GET /api/requests/{id}.
+
+GET /api/requests/changes usa el mismo formato de cursor sobre
+(UPDATED_AT, CODPETICIONES): retorna las solicitudes creadas o modificadas
+después del cursor, en orden ascendente, por el índice
+(USUSOLICITA, UPDATED_AT, CODPETICIONES).
+
+UPDATED_AT se asigna al escribir la fila, pero la fila es visible recién al
+confirmar la transacción: un cambio puede aparecer con un UPDATED_AT
+anterior a otro ya entregado. Por eso el cursor de cambios nunca avanza más
+allá de now() - CHANGES_OVERLAP_SECONDS (ver cap_changes_cursor): la
+consulta siguiente vuelve a leer ese margen y el cliente descarta por
+CODPETICIONES las filas repetidas.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+from sqlalchemy import Select, func, select, tuple_
+
+from app.core.config import settings
+from app.models.entities import Request
+
+COUNT_EXACT = "exact"
+COUNT_CAPPED = "capped"
+COUNT_NONE = "none"
+
+# Cursor de cambios inicial (antes de cualquier solicitud)
+CHANGES_START = (datetime(1970, 1, 1, tzinfo=timezone.utc), 0)
+
+VIEW_FULL = "full"
+VIEW_SUMMARY = "summary"
+
+# Columnas de la vista summary (las que muestra la tabla de solicitudes)
+SUMMARY_COLUMNS = (
+    Request.codpeticiones,
+    Request.codcategoria,
+    Request.codestado,
+    Request.fesolicita,
+    Request.description,
+    Request.solucion,
+    Request.fesolucion,
+    Request.ai_classification_data["app_type"].astext.label("ai_app_type"),
+    Request.ai_classification_data["confidence"].as_float().label("ai_confidence"),
+)
+
+
+def encode_cursor(fesolicita: datetime, codpeticiones: int) -> str:
+    """
+    Codifica la posición de una fila como cursor opaco.
+
+    Args:
+        fesolicita: FESOLICITA de la última fila de la página (o UPDATED_AT en el cursor de cambios)
+        codpeticiones: CODPETICIONES de la última fila de la página
+
+    Returns:
+        str: Cursor en base64 URL-safe
+    """
+    raw = json.dumps([fesolicita.isoformat(), codpeticiones], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decodifica un cursor generado por encode_cursor.
+
+    Returns:
+        Tuple[datetime, int]: (FESOLICITA, CODPETICIONES)
+
+    Raises:
+        ValueError: Si el cursor no es válido
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        fesolicita, codpeticiones = json.loads(raw)
+        return datetime.fromisoformat(fesolicita), int(codpeticiones)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as e:
+        raise ValueError(f"Cursor inválido: {cursor}") from e
+
+
+def build_list_query(
+    ususolicita: str,
+    limit: int,
+    offset: int = 0,
+    cursor: Optional[Tuple[datetime, int]] = None,
+    view: str = VIEW_FULL,
+) -> Select:
+    """
+    Construye la consulta de una página del listado.
+
+    Se pide una fila más que `limit` para saber si hay más páginas sin contar.
+
+    Args:
+        ususolicita: Usuario dueño de las solicitudes
+        limit: Tamaño de la página
+        offset: Filas a saltar (solo modo offset)
+        cursor: Posición decodificada (modo cursor; ignora offset)
+        view: full (entidades Request) o summary (filas con SUMMARY_COLUMNS)
+    """
+    query = (
+        (select(*SUMMARY_COLUMNS) if view == VIEW_SUMMARY else select(Request))
+        .where(Request.ususolicita == ususolicita)
+        .order_by(Request.fesolicita.desc(), Request.codpeticiones.desc())
+        .limit(limit + 1)
+    )
+    if cursor is not None:
+        query = query.where(tuple_(Request.fesolicita, Request.codpeticiones) < tuple_(*cursor))
+    elif offset:
+        query = query.offset(offset)
+    return query
+
+
+def build_count_query(ususolicita: str, mode: str, cap: int) -> Optional[Select]:
+    """
+    Construye la consulta del total según el modo.
+
+    - exact: COUNT(*) de todas las solicitudes del usuario.
+    - capped: cuenta como máximo `cap` + 1 filas (el costo no crece con el historial).
+    - none: no se cuenta.
+
+    Returns:
+        Optional[Select]: Consulta del total, o None en modo none
+    """
+    if mode == COUNT_NONE:
+        return None
+    if mode == COUNT_CAPPED:
+        limited = (
+            select(Request.codpeticiones)
+            .where(Request.ususolicita == ususolicita)
+            .limit(cap + 1)
+            .subquery()
+        )
+        return select(func.count()).select_from(limited)
+    return select(func.count()).select_from(Request).where(Request.ususolicita == ususolicita)
+
+
+def build_changes_query(ususolicita: str, limit: int, since: Tuple[datetime, int]) -> Select:
+    """
+    Construye la consulta de solicitudes cambiadas después de `since`.
+
+    Se pide una fila más que `limit` para saber si quedan cambios pendientes.
+    Cada fila trae además now() de la base de datos (para cap_changes_cursor).
+
+    Args:
+        ususolicita: Usuario dueño de las solicitudes
+        limit: Máximo de solicitudes
+        since: Cursor decodificado (UPDATED_AT, CODPETICIONES)
+    """
+    return (
+        select(Request, func.now().label("db_now"))
+        .where(
+            Request.ususolicita == ususolicita,
+            tuple_(Request.updated_at, Request.codpeticiones) > tuple_(*since),
+        )
+        .order_by(Request.updated_at, Request.codpeticiones)
+        .limit(limit + 1)
+    )
+
+
+def build_changes_watermark_query(ususolicita: str) -> Select:
+    """Consulta de la posición (UPDATED_AT, CODPETICIONES) del último cambio del usuario y now()"""
+    return (
+        select(Request.updated_at, Request.codpeticiones, func.now().label("db_now"))
+        .where(Request.ususolicita == ususolicita)
+        .order_by(Request.updated_at.desc(), Request.codpeticiones.desc())
+        .limit(1)
+    )
+
+
+def cap_changes_cursor(position: Tuple[datetime, int], db_now: datetime) -> Tuple[datetime, int]:
+    """
+    Limita un cursor de cambios a now() - CHANGES_OVERLAP_SECONDS.
+
+    Una transacción que escribió una fila antes de ese instante y aún no
+    confirma no queda detrás del cursor: la siguiente consulta la encuentra
+    mientras confirme dentro del margen.
+
+    Args:
+        position: (UPDATED_AT, CODPETICIONES) de la última fila entregada
+        db_now: now() de la base de datos en la consulta
+    """
+    horizon = (db_now - timedelta(seconds=settings.CHANGES_OVERLAP_SECONDS), 0)
+    return min(tuple(position), horizon)
@@ -1,7 +1,9 @@
 """
 Servicio de validaciones de negocio.
 """
-from typing import Literal
+from typing import Literal, Set
+
+VALID_STATES = (1, 2, 3)
 
 
 def validate_state_transition(current: int, new: int) -> bool:
@@ -47,3 +49,21 @@ def validate_state_transition(current: int, new: int) -> bool:
     
     return (current, new) in allowed_transitions
 
+
+
+def allowed_previous_states(new: int) -> Set[int]:
+    """
+    Estados desde los que se puede pasar a `new` según validate_state_transition.
+    
+    Permite expresar la validación de la transición como condición del UPDATE
+    (CODESTADO IN (...)) en lugar de leer la fila antes de actualizarla.
+    
+    Args:
+        new: Estado nuevo
+        
+    Returns:
+        Set[int]: Estados actuales permitidos (vacío si `new` no es válido)
+    """
+    if new not in VALID_STATES:
+        return set()
+    return {current for current in VALID_STATES if validate_state_transition(current, new)}
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark del costo de autenticación por request (get_current_user).
+
+Genera un token HS256 firmado con SUPABASE_JWT_SECRET y mide:
+- validate_email solo sintaxis vs con verificación de entregabilidad (DNS, con --dns)
+- get_current_user sin cache (decodificación JWT + validación de email en cada request)
+- get_current_user con el principal en cache (token ya visto)
+
+Uso (desde agm-simulated-enviroment/backend, con .env configurado):
+    python scripts/benchmark_auth.py --iterations 5000
+    python scripts/benchmark_auth.py --dns   # incluye validate_email con DNS (requiere red)
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from email_validator import validate_email  # noqa: E402
+from fastapi.security import HTTPAuthorizationCredentials  # noqa: E402
+from jose import jwt  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.services.auth_cache_service import principal_cache  # noqa: E402
+from app.services.auth_service import get_current_user  # noqa: E402
+
+BENCH_EMAIL = "bench.auth@example.com"
+
+
+def report(name: str, timings: list):
+    timings.sort()
+    p95 = timings[max(0, int(len(timings) * 0.95) - 1)]
+    print(f"{name:<40}{statistics.median(timings):>12.1f}{p95:>12.1f}")
+
+
+def measure_sync(fn, iterations: int) -> list:
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1_000_000)
+    return timings
+
+
+async def measure_auth(credentials, iterations: int, cached: bool) -> list:
+    timings = []
+    for _ in range(iterations):
+        if not cached:
+            principal_cache.clear()
+        started = time.perf_counter()
+        await get_current_user(credentials)
+        timings.append((time.perf_counter() - started) * 1_000_000)
+    return timings
+
+
+async def run(args):
+    token = jwt.encode(
+        {
+            "sub": "00000000-0000-0000-0000-000000000000",
+            "email": BENCH_EMAIL,
+            "aud": "authenticated",
+            "exp": int(time.time()) + 3600,
+        },
+        settings.SUPABASE_JWT_SECRET,
+        algorithm="HS256",
+    )
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    print(f"\n=== Autenticación por request ({args.iterations} iteraciones) ===\n")
+    print(f"{'medición':<40}{'mediana µs':>12}{'p95 µs':>12}")
+
+    report(
+        "validate_email (solo sintaxis)",
+        measure_sync(lambda: validate_email(BENCH_EMAIL, check_deliverability=False), args.iterations),
+    )
+    if args.dns:
+        report(
+            "validate_email (con DNS)",
+            measure_sync(lambda: validate_email(BENCH_EMAIL), min(args.iterations, 50)),
+        )
+
+    report("get_current_user sin cache", await measure_auth(credentials, args.iterations, cached=False))
+    principal_cache.clear()
+    await get_current_user(credentials)
+    report("get_current_user con principal en cache", await measure_auth(credentials, args.iterations, cached=True))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de autenticación JWT")
+    parser.add_argument("--iterations", type=int, default=5000, help="Iteraciones por medición")
+    parser.add_argument("--dns", action="store_true", help="Medir también validate_email con verificación DNS")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
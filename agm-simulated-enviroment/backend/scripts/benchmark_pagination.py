@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Benchmark de paginación de GET /api/requests: OFFSET vs cursor (keyset).
+
+Inserta un historial sintético para un usuario de prueba, ejecuta las mismas
+consultas que el endpoint (pagination_service) para la página 1 y una página
+profunda, y mide también el costo del total en modo exact y capped, y el
+tamaño y tiempo de serialización de una página en view=full vs view=summary.
+
+Uso (desde agm-simulated-enviroment/backend, con .env configurado):
+    python scripts/benchmark_pagination.py --rows 100000 --pages 1,1000
+    python scripts/benchmark_pagination.py --keep      # conserva los datos sembrados
+    python scripts/benchmark_pagination.py --cleanup   # solo elimina los datos sembrados
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.db.base import AsyncSessionLocal, engine  # noqa: E402
+from app.models.entities import Request  # noqa: E402
+from app.models.schemas import PaginatedResponse, PaginationMeta, RequestResponse, RequestSummary  # noqa: E402
+from app.services.pagination_service import (  # noqa: E402
+    COUNT_CAPPED,
+    COUNT_EXACT,
+    VIEW_FULL,
+    VIEW_SUMMARY,
+    build_count_query,
+    build_list_query,
+)
+
+BENCH_USER = "bench_pagination"
+
+
+async def seed(session, rows: int):
+    """Inserta `rows` solicitudes del usuario de prueba (una por minuto hacia atrás)"""
+    await session.execute(
+        text("""
+        INSERT INTO "HLP_PETICIONES" ("CODCATEGORIA", "CODESTADO", "USUSOLICITA", "FESOLICITA", "DESCRIPTION", "SOLUCION", "AI_CLASSIFICATION_DATA")
+        SELECT 300, 3, :user, now() - (i * interval '1 minute'),
+               'Solicitud de prueba ' || i, 'Solución de prueba ' || i,
+               jsonb_build_object(
+                   'app_type', 'dominio',
+                   'confidence', 0.95,
+                   'detected_actions', jsonb_build_array('find_user', 'change_password'),
+                   'raw_classification', repeat('Clasificación de prueba. ', 80),
+                   'actions_executed', jsonb_build_array(
+                       jsonb_build_object('action_type', 'find_user', 'success', true, 'result', jsonb_build_object('found', true)),
+                       jsonb_build_object('action_type', 'change_password', 'success', true, 'result', jsonb_build_object('password_length', 16))
+                   )
+               )
+        FROM generate_series(1, :rows) AS i
+        """),
+        {"user": BENCH_USER, "rows": rows},
+    )
+    await session.commit()
+    await session.execute(text('ANALYZE "HLP_PETICIONES"'))
+
+
+async def cleanup(session):
+    result = await session.execute(
+        text('DELETE FROM "HLP_PETICIONES" WHERE "USUSOLICITA" = :user'),
+        {"user": BENCH_USER},
+    )
+    await session.commit()
+    print(f"🧹 Eliminadas {result.rowcount} filas de {BENCH_USER}")
+
+
+async def measure(session, query, repeat: int) -> tuple[float, float]:
+    """Ejecuta la consulta `repeat` veces y retorna (mediana, p95) en milisegundos"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = await session.execute(query)
+        result.all()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[max(0, int(len(timings) * 0.95) - 1)]
+
+
+async def run(args):
+    async with AsyncSessionLocal() as session:
+        if args.cleanup:
+            await cleanup(session)
+            return
+
+        existing = (await session.execute(build_count_query(BENCH_USER, COUNT_EXACT, 0))).scalar() or 0
+        if existing < args.rows:
+            print(f"🌱 Sembrando {args.rows - existing} filas para {BENCH_USER}...")
+            await seed(session, args.rows - existing)
+
+        print(f"\n=== Paginación ({args.rows} filas, página de {args.page_size}, {args.repeat} repeticiones) ===\n")
+        print(f"{'consulta':<32}{'mediana ms':>12}{'p95 ms':>12}")
+
+        for page in args.pages:
+            offset = (page - 1) * args.page_size
+            median, p95 = await measure(session, build_list_query(BENCH_USER, args.page_size, offset), args.repeat)
+            print(f"{f'offset  página {page}':<32}{median:>12.2f}{p95:>12.2f}")
+
+            # Cursor de la página: la última fila de la página anterior (no se mide)
+            cursor = None
+            if offset:
+                boundary = await session.execute(
+                    build_list_query(BENCH_USER, 0, offset - 1).with_only_columns(
+                        Request.fesolicita, Request.codpeticiones
+                    )
+                )
+                cursor = tuple(boundary.one())
+            median, p95 = await measure(session, build_list_query(BENCH_USER, args.page_size, cursor=cursor), args.repeat)
+            print(f"{f'cursor  página {page}':<32}{median:>12.2f}{p95:>12.2f}")
+
+        for mode in (COUNT_EXACT, COUNT_CAPPED):
+            median, p95 = await measure(
+                session, build_count_query(BENCH_USER, mode, settings.LIST_COUNT_CAP), args.repeat
+            )
+            print(f"{f'count={mode}':<32}{median:>12.2f}{p95:>12.2f}")
+
+        print(f"\n{'vista':<32}{'bytes':>12}{'serial. ms':>12}")
+        for view, schema in ((VIEW_FULL, RequestResponse), (VIEW_SUMMARY, RequestSummary)):
+            result = await session.execute(build_list_query(BENCH_USER, args.page_size, view=view))
+            rows = result.all() if view == VIEW_SUMMARY else result.scalars().all()
+            timings = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                body = PaginatedResponse[schema](
+                    items=[schema.model_validate(row) for row in rows[:args.page_size]],
+                    pagination=PaginationMeta(total=None, limit=args.page_size, offset=0, has_more=True),
+                ).model_dump_json()
+                timings.append((time.perf_counter() - started) * 1000)
+            print(f"{f'view={view}':<32}{len(body):>12}{statistics.median(timings):>12.2f}")
+
+        if not args.keep:
+            print()
+            await cleanup(session)
+
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de paginación OFFSET vs cursor")
+    parser.add_argument("--rows", type=int, default=100000, help="Filas del historial sintético")
+    parser.add_argument("--page-size", type=int, default=50, help="Tamaño de página")
+    parser.add_argument("--pages", type=lambda v: [int(p) for p in v.split(",")], default=[1, 1000],
+                        help="Páginas a medir (ej: 1,100,1000)")
+    parser.add_argument("--repeat", type=int, default=20, help="Repeticiones por consulta")
+    parser.add_argument("--keep", action="store_true", help="No eliminar los datos sembrados al terminar")
+    parser.add_argument("--cleanup", action="store_true", help="Solo eliminar los datos sembrados")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
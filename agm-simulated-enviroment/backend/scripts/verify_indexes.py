@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Verifica con EXPLAIN que cada consulta caliente de HLP_PETICIONES usa su índice.
+
+Consultas verificadas (mismos filtros que el código que las ejecuta):
+- Listado por usuario, primera página y página por cursor (pagination_service)
+- Cambios desde un cursor (GET /api/requests/changes)
+- Rate limit del agente (request_validator.check_rate_limit)
+- Escaneo de pendientes (CODESTADO = 1)
+- Barrido de tickets interrumpidos del agente (CODESTADO = 2)
+
+Siembra un historial sintético (mayoría de solicitudes solucionadas, pocas
+abiertas), ejecuta ANALYZE y revisa el plan de cada consulta. Retorna código
+de salida 1 si alguna no usa el índice esperado.
+
+Uso (desde agm-simulated-enviroment/backend, con migraciones aplicadas):
+    python scripts/verify_indexes.py
+    python scripts/verify_indexes.py --rows 50000 --keep
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, select, text  # noqa: E402
+from sqlalchemy.dialects import postgresql  # noqa: E402
+
+from app.db.base import AsyncSessionLocal, engine  # noqa: E402
+from app.models.entities import Request  # noqa: E402
+from app.services.pagination_service import build_changes_query, build_list_query  # noqa: E402
+
+BENCH_PREFIX = "bench_idx_"
+BENCH_USERS = 50
+
+LIST_INDEX = "ix_HLP_PETICIONES_USUSOLICITA_FESOLICITA_CODPETICIONES"
+CHANGES_INDEX = "ix_HLP_PETICIONES_USUSOLICITA_UPDATED_AT_CODPETICIONES"
+RATE_LIMIT_INDEX = "ix_HLP_PETICIONES_RATE_LIMIT"
+OPEN_REQUESTS_INDEX = "ix_HLP_PETICIONES_OPEN"
+
+
+def hot_queries():
+    """Consultas calientes con el índice que deben usar"""
+    user = f"{BENCH_PREFIX}0"
+    now = datetime.now(timezone.utc)
+    return [
+        ("listado primera página", build_list_query(user, 50), LIST_INDEX),
+        ("listado por cursor", build_list_query(user, 50, cursor=(now - timedelta(days=30), 0)), LIST_INDEX),
+        ("cambios desde cursor", build_changes_query(user, 100, (now - timedelta(minutes=5), 0)), CHANGES_INDEX),
+        (
+            "rate limit",
+            select(func.count(Request.codpeticiones)).where(
+                Request.ususolicita == user,
+                Request.codcategoria.in_([300, 400]),
+                Request.fesolicita >= now - timedelta(hours=24),
+                Request.codestado.in_([1, 2, 3]),
+            ),
+            RATE_LIMIT_INDEX,
+        ),
+        (
+            "pendientes",
+            select(Request).where(Request.codestado == 1).order_by(Request.codpeticiones),
+            OPEN_REQUESTS_INDEX,
+        ),
+        (
+            "tickets interrumpidos",
+            select(Request).where(Request.codestado == 2).order_by(Request.codpeticiones).limit(500),
+            OPEN_REQUESTS_INDEX,
+        ),
+    ]
+
+
+def plan_indexes(node: dict) -> set:
+    """Recorre el plan de EXPLAIN (FORMAT JSON) y retorna los índices usados"""
+    indexes = {node["Index Name"]} if "Index Name" in node else set()
+    for child in node.get("Plans", []):
+        indexes |= plan_indexes(child)
+    return indexes
+
+
+async def seed(session, rows: int):
+    """Siembra historial: ~95% solucionadas, ~3% en trámite, ~2% pendientes"""
+    await session.execute(
+        text("""
+        INSERT INTO "HLP_PETICIONES" ("CODCATEGORIA", "CODESTADO", "USUSOLICITA", "FESOLICITA", "DESCRIPTION")
+        SELECT CASE WHEN i % 2 = 0 THEN 300 ELSE 400 END,
+               CASE WHEN i % 50 = 0 THEN 1 WHEN i % 33 = 0 THEN 2 ELSE 3 END,
+               :prefix || (i % :users),
+               now() - (i * interval '5 minutes'),
+               'Solicitud de prueba ' || i
+        FROM generate_series(1, :rows) AS i
+        """),
+        {"prefix": BENCH_PREFIX, "users": BENCH_USERS, "rows": rows},
+    )
+    await session.commit()
+    await session.execute(text('ANALYZE "HLP_PETICIONES"'))
+
+
+async def cleanup(session):
+    await session.execute(
+        text('DELETE FROM "HLP_PETICIONES" WHERE "USUSOLICITA" LIKE :prefix'),
+        {"prefix": f"{BENCH_PREFIX}%"},
+    )
+    await session.commit()
+
+
+async def run(args) -> bool:
+    all_ok = True
+    async with AsyncSessionLocal() as session:
+        await seed(session, args.rows)
+        try:
+            print(f"\n=== Verificación de índices ({args.rows} filas sembradas) ===\n")
+            for name, query, expected in hot_queries():
+                sql = str(query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+                result = await session.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+                plan = result.scalar()
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                used = plan_indexes(plan[0]["Plan"])
+                ok = expected in used
+                all_ok = all_ok and ok
+                print(f"{'✅' if ok else '❌'} {name}: esperado {expected}, usados {sorted(used) or 'ninguno (seq scan)'}")
+                if not ok and args.verbose:
+                    print(json.dumps(plan, indent=2))
+        finally:
+            if not args.keep:
+                await cleanup(session)
+    await engine.dispose()
+    return all_ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verifica con EXPLAIN los índices de las consultas calientes")
+    parser.add_argument("--rows", type=int, default=20000, help="Filas del historial sintético")
+    parser.add_argument("--keep", action="store_true", help="No eliminar los datos sembrados al terminar")
+    parser.add_argument("--verbose", action="store_true", help="Mostrar el plan completo de las consultas que fallan")
+    ok = asyncio.run(run(parser.parse_args()))
+    print()
+    print("✅ Todas las consultas usan su índice" if ok else "❌ Hay consultas sin su índice esperado")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
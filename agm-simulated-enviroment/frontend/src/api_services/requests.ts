@@ -1,5 +1,5 @@
 import { getBackendUrl } from '../lib/constants'
-import type { Request, RequestCreate, PaginatedResponse } from '../lib/types'
+import type { Request, RequestCreate, PaginatedResponse, ChangesResponse } from '../lib/types'
 import { supabase } from './supabase_client'
 import { extractErrorInfo } from '../lib/error-handler'
 
@@ -122,3 +122,85 @@ export async function getRequestById(id: number): Promise<Request> {
   return response.json()
 }
 
+/**
+ * Obtiene las solicitudes creadas o modificadas desde un cursor.
+ * Sin `since` retorna solo el cursor actual (sin solicitudes).
+ */
+export async function getRequestChanges(
+  since?: string,
+  limit: number = 100
+): Promise<ChangesResponse> {
+  const headers = await getAuthHeaders()
+  const params = new URLSearchParams({ limit: String(limit) })
+  if (since) {
+    params.set('since', since)
+  }
+  const response = await fetch(getBackendUrl(`/api/requests/changes?${params}`), {
+    method: 'GET',
+    headers,
+  })
+
+  if (!response.ok) {
+    const errorData = await response.json().catch(() => ({}))
+    const errorInfo = extractErrorInfo({ response: { data: errorData } })
+    throw new Error(errorInfo.message)
+  }
+
+  return response.json()
+}
+
+/**
+ * El stream de cambios del backend no está disponible (deshabilitado, sin
+ * capacidad o endpoint inexistente): usar Supabase Realtime.
+ */
+export class RequestEventsUnavailableError extends Error {}
+
+/**
+ * Lee el stream SSE de cambios (GET /api/requests/events) hasta que el
+ * servidor lo cierre. Se usa fetch porque EventSource no permite enviar el
+ * header Authorization.
+ */
+export async function streamRequestEvents(
+  onEvent: (event: string, data: unknown) => void,
+  signal: AbortSignal
+): Promise<void> {
+  const headers = await getAuthHeaders()
+  const response = await fetch(getBackendUrl('/api/requests/events'), {
+    method: 'GET',
+    headers,
+    signal,
+  })
+
+  if (!response.ok || !response.body) {
+    throw new RequestEventsUnavailableError(`Error ${response.status}: ${response.statusText}`)
+  }
+
+  const reader = response.body.pipeThrough(new TextDecoderStream()).getReader()
+  let buffer = ''
+  for (;;) {
+    const { value, done } = await reader.read()
+    if (done) return
+    buffer += value
+
+    // Cada evento termina en una línea vacía; las líneas ":" son heartbeats
+    let boundary = buffer.indexOf('\n\n')
+    while (boundary !== -1) {
+      const block = buffer.slice(0, boundary)
+      buffer = buffer.slice(boundary + 2)
+      boundary = buffer.indexOf('\n\n')
+
+      let event = 'message'
+      const data: string[] = []
+      for (const line of block.split('\n')) {
+        if (line.startsWith('event:')) {
+          event = line.slice(6).trim()
+        } else if (line.startsWith('data:')) {
+          data.push(line.slice(5).trim())
+        }
+      }
+      if (data.length > 0) {
+        onEvent(event, JSON.parse(data.join('\n')))
+      }
+    }
+  }
+}
@@ -1,9 +1,17 @@
-import { useState, useEffect, useCallback } from 'react'
-import { getRequests } from '../api_services/requests'
+import { useState, useEffect, useCallback, useRef } from 'react'
+import {
+  RequestEventsUnavailableError,
+  getRequestChanges,
+  getRequests,
+  streamRequestEvents,
+} from '../api_services/requests'
 import { supabase } from '../api_services/supabase_client'
 import type { Request } from '../lib/types'
 import { useSupabaseAuth } from './useSupabaseAuth'
 
+// Espera antes de reabrir el stream de cambios tras un error de red
+const EVENTS_RETRY_MS = 3000
+
 interface UseFetchRequestsReturn {
   requests: Request[]
   loading: boolean
@@ -31,6 +39,13 @@ export function useFetchRequests(
     has_more: false,
   })
   const { username, isAuthenticated } = useSupabaseAuth()
+  // Cursor de GET /api/requests/changes (null: sincronizar con el payload de Realtime)
+  const changesCursor = useRef<string | null>(null)
+  const syncQueue = useRef<Promise<boolean>>(Promise.resolve(true))
+  const requestsRef = useRef<Request[]>([])
+  requestsRef.current = requests
+  // true si el stream del backend no está disponible y se usa Supabase Realtime
+  const [realtimeFallback, setRealtimeFallback] = useState(false)
 
   const fetchRequests = useCallback(async () => {
     if (!isAuthenticated) {
@@ -42,6 +57,10 @@ export function useFetchRequests(
     setError(null)
 
     try {
+      // El cursor se pide antes del listado para no perder cambios intermedios
+      changesCursor.current = await getRequestChanges()
+        .then((changes) => changes.next_cursor)
+        .catch(() => null)
       const response = await getRequests(limit, offset)
       // Normalizar la respuesta: siempre debe tener items (array) y pagination
       setRequests(Array.isArray(response.items) ? response.items : [])
@@ -60,14 +79,117 @@ export function useFetchRequests(
     }
   }, [limit, offset, isAuthenticated])
 
+  // Trae solo las solicitudes cambiadas desde el último cursor y las combina
+  // con las actuales. Retorna false si no hay cursor o la consulta falla.
+  const runSyncChanges = useCallback(async (): Promise<boolean> => {
+    if (!changesCursor.current) {
+      return false
+    }
+
+    try {
+      // El backend repite los cambios de los últimos segundos (escrituras que
+      // confirman fuera de orden): se conserva la versión más reciente de cada una
+      const latest = new Map<number, Request>()
+      let cursor = changesCursor.current
+      let hasMore = true
+      while (hasMore) {
+        const response = await getRequestChanges(cursor)
+        for (const req of response.items) {
+          const previous = latest.get(req.codpeticiones)
+          if (!previous || (req.updated_at ?? '') >= (previous.updated_at ?? '')) {
+            latest.set(req.codpeticiones, req)
+          }
+        }
+        cursor = response.next_cursor
+        hasMore = response.has_more
+      }
+      changesCursor.current = cursor
+      const changed = [...latest.values()]
+
+      if (changed.length > 0) {
+        // Solo son nuevas para esta vista las desconocidas más recientes que la
+        // primera fila de la primera página; el resto pertenece a otras páginas
+        const known = new Set(requestsRef.current.map((req) => req.codpeticiones))
+        const newest = requestsRef.current[0]
+        const created = changed.filter(
+          (req) =>
+            offset === 0 &&
+            !known.has(req.codpeticiones) &&
+            (!newest || new Date(req.fesolicita).getTime() >= new Date(newest.fesolicita).getTime())
+        )
+        const updated = new Map(changed.map((req) => [req.codpeticiones, req]))
+        setRequests((prev) => {
+          const present = new Set(prev.map((req) => req.codpeticiones))
+          return [
+            ...created.filter((req) => !present.has(req.codpeticiones)).reverse(),
+            ...prev.map((req) => updated.get(req.codpeticiones) ?? req),
+          ]
+        })
+        if (created.length > 0) {
+          setPagination((prev) => ({ ...prev, total: prev.total + created.length }))
+        }
+      }
+      return true
+    } catch (err) {
+      console.warn('Error al sincronizar cambios, se usa el payload de Realtime:', err)
+      return false
+    }
+  }, [offset])
+
+  // Las notificaciones seguidas se sincronizan en orden, una a la vez
+  const syncChanges = useCallback((): Promise<boolean> => {
+    const next = syncQueue.current.then(runSyncChanges)
+    syncQueue.current = next
+    return next
+  }, [runSyncChanges])
+
   // Cargar solicitudes iniciales
   useEffect(() => {
     fetchRequests()
   }, [fetchRequests])
 
-  // Suscripción a Realtime
+  // Stream de cambios del backend (SSE): una sola suscripción a la BD en el
+  // backend en lugar de una suscripción a Realtime por dashboard
+  useEffect(() => {
+    if (!isAuthenticated || !username || realtimeFallback) {
+      return
+    }
+
+    const controller = new AbortController()
+    // request_changed y resync: traer las filas cambiadas desde el cursor
+    const onChange = () => {
+      syncChanges().then((synced) => {
+        if (!synced) setRealtimeFallback(true)
+      })
+    }
+
+    const run = async () => {
+      while (!controller.signal.aborted) {
+        try {
+          await streamRequestEvents(onChange, controller.signal)
+          // El servidor cierra el stream periódicamente: reconectar y ponerse al día
+          onChange()
+        } catch (err) {
+          if (controller.signal.aborted) return
+          if (err instanceof RequestEventsUnavailableError) {
+            console.warn('Stream de cambios no disponible, se usa Supabase Realtime:', err.message)
+            setRealtimeFallback(true)
+            return
+          }
+          await new Promise((resolve) => setTimeout(resolve, EVENTS_RETRY_MS))
+        }
+      }
+    }
+    run()
+
+    return () => {
+      controller.abort()
+    }
+  }, [isAuthenticated, username, realtimeFallback, syncChanges])
+
+  // Suscripción a Realtime (solo si el stream del backend no está disponible)
   useEffect(() => {
-    if (!isAuthenticated || !username) {
+    if (!isAuthenticated || !username || !realtimeFallback) {
       return
     }
 
@@ -106,6 +228,7 @@ export function useFetchRequests(
               FECCIERRE: 'feccierre',
               CODMOTCIERRE: 'codmotcierre',
               AI_CLASSIFICATION_DATA: 'ai_classification_data',
+              UPDATED_AT: 'updated_at',
             }
             
             // Mapear campos a minúsculas
@@ -126,25 +249,33 @@ export function useFetchRequests(
             return normalized as Request
           }
 
-          if (payload.eventType === 'INSERT') {
-            // Agregar nueva solicitud
-            const newRequest = normalizeRequest(payload.new)
-            if (newRequest) {
-              setRequests((prev) => [newRequest, ...prev])
-              setPagination((prev) => ({ ...prev, total: prev.total + 1 }))
-            }
-          } else if (payload.eventType === 'UPDATE') {
-            // Actualizar solicitud existente
-            const updatedRequest = normalizeRequest(payload.new)
-            if (updatedRequest) {
-              setRequests((prev) =>
-                prev.map((req) =>
-                  req.codpeticiones === updatedRequest.codpeticiones
-                    ? updatedRequest
-                    : req
-                )
-              )
-            }
+          if (payload.eventType === 'INSERT' || payload.eventType === 'UPDATE') {
+            // Pedir al backend solo las filas cambiadas; sin cursor de cambios,
+            // aplicar el payload de Realtime
+            syncChanges().then((synced) => {
+              if (synced) return
+
+              if (payload.eventType === 'INSERT') {
+                // Agregar nueva solicitud
+                const newRequest = normalizeRequest(payload.new)
+                if (newRequest) {
+                  setRequests((prev) => [newRequest, ...prev])
+                  setPagination((prev) => ({ ...prev, total: prev.total + 1 }))
+                }
+              } else {
+                // Actualizar solicitud existente
+                const updatedRequest = normalizeRequest(payload.new)
+                if (updatedRequest) {
+                  setRequests((prev) =>
+                    prev.map((req) =>
+                      req.codpeticiones === updatedRequest.codpeticiones
+                        ? updatedRequest
+                        : req
+                    )
+                  )
+                }
+              }
+            })
           } else if (payload.eventType === 'DELETE') {
             // Remover solicitud
             const deletedRequest = normalizeRequest(payload.old)
@@ -162,7 +293,7 @@ export function useFetchRequests(
     return () => {
       supabase.removeChannel(channel)
     }
-  }, [isAuthenticated, username])
+  }, [isAuthenticated, username, realtimeFallback, syncChanges])
 
   return {
     requests,
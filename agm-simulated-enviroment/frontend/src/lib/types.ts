@@ -32,6 +32,7 @@ export interface Request {
   feccierre: string | null // ISO datetime string
   codmotcierre: number | null
   ai_classification_data: AIClassificationData | null
+  updated_at?: string | null // ISO datetime string (último cambio)
 }
 
 export interface RequestCreate {
@@ -39,6 +40,12 @@ export interface RequestCreate {
   description: string
 }
 
+export interface ChangesResponse {
+  items: Request[]
+  next_cursor: string
+  has_more: boolean
+}
+
 export interface PaginatedResponse<T> {
   items: T[]
   pagination: {